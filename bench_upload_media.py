@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MediaFileUpload vs MmapMediaUpload through the real upload path.
+
+Each source is uploaded with videos().insert(...).next_chunk() on a client
+built like authenticate_youtube() builds it (PooledHttp → requests → urllib3),
+against a local endpoint that speaks the resumable upload protocol (session
+POST, then PUT chunks answered with 308 until the last one). The endpoint runs
+in a separate process over TLS, with a throw-away self-signed certificate made
+by the openssl command, so the numbers include request building, urllib3 and
+encryption. Reported per source: throughput and CPU time per GB of the
+uploading thread.
+
+Sources:
+- baseline: MediaFileUpload with chunksize=-1, as the uploader used to send
+- MediaFileUpload chunked: --chunk-mb per request, as UPLOAD_MEDIA_SOURCE="file"
+- MmapMediaUpload: --chunk-mb per request, as UPLOAD_MEDIA_SOURCE="mmap"
+
+Usage:
+    python bench_upload_media.py [--size-mb 1024] [--chunk-mb 8] [--rounds 3] [--file PATH]
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import ssl
+import subprocess
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+import googleapiclient.discovery
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.http import MediaFileUpload
+
+from media import MmapMediaUpload
+from transport import PooledHttp
+
+GB = 1024 ** 3
+READ_BUFFER_BYTES = 1024 * 1024
+
+
+class _ResumableHandler(BaseHTTPRequestHandler):
+    """Just enough of the resumable upload protocol for next_chunk()."""
+
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real endpoint
+    sessions = itertools.count()
+    buffer = bytearray(READ_BUFFER_BYTES)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _drain_body(self) -> None:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                self._drain(size)
+                self.rfile.readline()
+                if size == 0:
+                    return
+        self._drain(int(self.headers.get("Content-Length") or 0))
+
+    def _drain(self, remaining: int) -> None:
+        view = memoryview(self.buffer)
+        while remaining > 0:
+            n = self.rfile.readinto(view[:min(remaining, len(view))])
+            if not n:
+                return
+            remaining -= n
+
+    def _reply(self, status: int, headers: Dict[str, str], body: bytes = b"") -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        self._drain_body()
+        host, port = self.server.server_address[:2]
+        location = f"https://{host}:{port}/upload/session/{next(self.sessions)}"
+        self._reply(200, {"Location": location})
+
+    def do_PUT(self) -> None:
+        self._drain_body()
+        found = re.match(r"bytes (\d+)-(\d+)/(\d+)", self.headers.get("Content-Range", ""))
+        if found and int(found.group(2)) + 1 < int(found.group(3)):
+            self._reply(308, {"Range": f"bytes=0-{found.group(2)}"})
+            return
+        body = json.dumps({"kind": "youtube#video", "id": "bench"}).encode("utf-8")
+        self._reply(200, {"Content-Type": "application/json"}, body)
+
+
+def _serve(ready: "multiprocessing.Queue", cert: str, key: str) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ResumableHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _self_signed_cert(directory: str) -> Tuple[str, str]:
+    """(cert, key) files for 127.0.0.1, made with the openssl command."""
+    if shutil.which("openssl") is None:
+        raise SystemExit("bench_upload_media.py needs the openssl command for its TLS endpoint")
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+         "-keyout", key, "-out", cert],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+def _build_client(endpoint: str, ca_file: str):
+    http = PooledHttp(AnonymousCredentials())
+    http.session.verify = ca_file
+    http.session.trust_env = False   # no proxy or CA bundle from the environment for a local endpoint
+    return googleapiclient.discovery.build(
+        "youtube", "v3", http=http, static_discovery=True,
+        client_options={"api_endpoint": endpoint},
+    )
+
+
+def _upload(youtube, make_media: Callable[[], object]) -> Dict[str, float]:
+    """Upload one file with next_chunk(); return wall/CPU seconds and size."""
+    media = make_media()
+    size = media.size()
+    request = youtube.videos().insert(
+        part="snippet,status",
+        body={"snippet": {"title": "bench"}, "status": {"privacyStatus": "private"}},
+        media_body=media,
+    )
+
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    response = None
+    while response is None:
+        _, response = request.next_chunk()
+    cpu = time.thread_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    if hasattr(media, "close"):
+        media.close()
+    return {"bytes": float(size), "wall": wall, "cpu": cpu}
+
+
+def run(path: str, chunk_size: int, rounds: int) -> None:
+    sources = {
+        "baseline (file, -1)": lambda: MediaFileUpload(path, chunksize=-1, resumable=True),
+        "MediaFileUpload (chunked)": lambda: MediaFileUpload(path, chunksize=chunk_size, resumable=True),
+        "MmapMediaUpload (mmap)": lambda: MmapMediaUpload(path, chunksize=chunk_size, resumable=True),
+    }
+
+    with tempfile.TemporaryDirectory() as certs_dir:
+        cert, key = _self_signed_cert(certs_dir)
+        ready: "multiprocessing.Queue" = multiprocessing.Queue()
+        server = multiprocessing.Process(target=_serve, args=(ready, cert, key), daemon=True)
+        server.start()
+        try:
+            endpoint = f"https://127.0.0.1:{ready.get(timeout=10)}/"
+            youtube = _build_client(endpoint, cert)
+
+            print(f"File: {path} ({os.path.getsize(path) / GB:.2f} GB), chunk {chunk_size // (1024 * 1024)} MB, "
+                  f"{rounds} rounds (best of), TLS to {endpoint}")
+            print(f"{'source':<28}{'MB/s':>10}{'CPU s/GB':>12}{'vs baseline':>13}")
+            baseline = None
+            for name, make_media in sources.items():
+                _upload(youtube, make_media)  # warm the page cache and the connection
+                results = [_upload(youtube, make_media) for _ in range(rounds)]
+                best = min(results, key=lambda r: r["wall"])
+                mb_per_s = best["bytes"] / best["wall"] / (1024 * 1024)
+                cpu_per_gb = best["cpu"] / (best["bytes"] / GB)
+                baseline = baseline or mb_per_s
+                print(f"{name:<28}{mb_per_s:>10.1f}{cpu_per_gb:>12.3f}{mb_per_s / baseline:>12.2f}x")
+        finally:
+            server.terminate()
+            server.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024, help="size of the generated test file")
+    parser.add_argument("--chunk-mb", type=int, default=8, help="upload chunk size (multiple of 0.25)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--file", help="use an existing video instead of a generated file")
+    args = parser.parse_args()
+
+    chunk_size = args.chunk_mb * 1024 * 1024
+    if args.file:
+        run(args.file, chunk_size, args.rounds)
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".mp4") as tmp:
+        block = os.urandom(1024 * 1024)
+        for _ in range(args.size_mb):
+            tmp.write(block)
+        tmp.flush()
+        run(tmp.name, chunk_size, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
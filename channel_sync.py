@@ -0,0 +1,115 @@
+"""
+Sync publish slots from the live channel.
+
+The calendar used to assume every earlier upload landed where state says.
+Videos deleted, failed or rescheduled by hand in Studio break that. This
+module asks YouTube for the real status of every known video id, 50 ids per
+videos.list call (1 quota unit per call), and turns the answers into the
+channel's actual occupancy:
+- scheduled (status.publishAt)      → occupies that slot
+- already public (snippet.publishedAt) → occupies the day it went out
+- private without schedule, or gone → occupies nothing
+"""
+
+from datetime import datetime
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import googleapiclient.errors
+
+from metrics import METRICS, QUOTA_UNITS_TOTAL
+
+log = logging.getLogger(__name__)
+
+BATCH_SIZE = 50  # videos.list accepts at most 50 ids per call
+
+STATUS_FIELDS = "items(id,status(privacyStatus,uploadStatus,publishAt),snippet(publishedAt))"
+
+
+def chunked(items: List[str], size: int = BATCH_SIZE) -> Iterator[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def is_fake_video_id(video_id: str) -> bool:
+    """Ids written by DRY_RUN ("dry_<challenge id>") never existed on YouTube."""
+    return str(video_id).startswith("dry_")
+
+
+def fetch_video_statuses(
+    youtube,
+    video_ids: Iterable[str],
+    fields: str = STATUS_FIELDS,
+) -> Dict[str, Dict[str, Any]]:
+    """videos.list in batches of 50; returns video_id -> item for ids that exist.
+
+    Each call is counted in METRICS, so sync, mirror and reconcile spend shows
+    up in the run summaries quota_spent_since() adds up.
+    """
+    ids = [v for v in dict.fromkeys(video_ids) if v and not is_fake_video_id(v)]
+    found: Dict[str, Dict[str, Any]] = {}
+    for batch in chunked(ids):
+        response = youtube.videos().list(
+            part="status,snippet",
+            id=",".join(batch),
+            maxResults=BATCH_SIZE,
+            fields=fields,
+        ).execute()
+        METRICS.inc(QUOTA_UNITS_TOTAL, 1, method="videos.list")
+        for item in response.get("items", []):
+            found[item["id"]] = item
+    return found
+
+
+def _parse_rfc3339(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def occupied_slot(item: Optional[Dict[str, Any]]) -> Optional[datetime]:
+    """The publish time a live video holds in the calendar, if any."""
+    if not item:
+        return None
+    status = item.get("status", {})
+    if status.get("publishAt"):
+        return _parse_rfc3339(status["publishAt"])
+    if status.get("privacyStatus") == "public" and item.get("snippet", {}).get("publishedAt"):
+        return _parse_rfc3339(item["snippet"]["publishedAt"])
+    return None
+
+
+def sync_publish_times(youtube, channel_state: Dict[str, Any], tz) -> Dict[str, int]:
+    """
+    Replace channel_state["publish_at"] with what the channel really holds.
+
+    Every uploaded challenge gets an entry: an ISO time in the channel's
+    timezone, or None when its video holds no slot (deleted, unscheduled).
+    Returns counts for the run log; on API errors state is left untouched.
+    """
+    uploaded: Dict[str, str] = channel_state.get("uploaded", {})
+    try:
+        items = fetch_video_statuses(youtube, uploaded.values())
+    except googleapiclient.errors.HttpError as e:
+        log.error(f"Failed to sync publish times from channel: {e}")
+        return {}
+
+    publish_at: Dict[str, Optional[str]] = {}
+    counts = {"scheduled": 0, "published": 0, "free": 0, "moved": 0}
+    previous = channel_state.get("publish_at", {})
+
+    for cid, video_id in uploaded.items():
+        item = items.get(video_id)
+        slot = occupied_slot(item)
+        if slot is None:
+            publish_at[cid] = None
+            counts["free"] += 1
+            continue
+
+        iso = slot.astimezone(tz).isoformat()
+        publish_at[cid] = iso
+        counts["scheduled" if item["status"].get("publishAt") else "published"] += 1
+        old = previous.get(cid)
+        if old and _parse_rfc3339(old) != slot:
+            counts["moved"] += 1
+
+    channel_state["publish_at"] = publish_at
+    return counts
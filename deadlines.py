@@ -0,0 +1,158 @@
+"""
+Deadline-aware ordering of pending uploads.
+
+Every pending upload gets its publish slot before it starts; that slot's
+publishAt is its deadline. DeadlineQueue hands out work:
+- earliest deadline first (EDF) in normal operation
+- a job whose slack (deadline - now - expected upload time - safety margin)
+  falls under `escalation_seconds` is escalated: it jumps ahead of every normal
+  job, and urgent jobs run least-slack first
+- expected upload time follows the measured throughput (update_throughput)
+
+select_on_time() optionally packs a run into the remaining bandwidth and quota
+window with the Moore–Hodgson rule, which maximizes how many jobs finish
+before their deadlines; the rest are deferred to a later run.
+"""
+
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+Job = Dict[str, Any]  # {"challenge": ..., "deadline": datetime, "size": bytes, ...}
+
+
+class DeadlineQueue:
+    """EDF priority queue with slack-based urgency escalation."""
+
+    def __init__(
+        self,
+        throughput_bps: float,
+        escalation_seconds: float = 6 * 3600,
+        safety_margin_seconds: float = 600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.throughput_bps = max(throughput_bps, 1.0)
+        self.escalation_seconds = escalation_seconds
+        self.safety_margin_seconds = safety_margin_seconds
+        self._clock = clock
+
+        self._seq = itertools.count()
+        self._jobs: Dict[int, Job] = {}                             # live jobs by seq
+        self._by_deadline: List[Tuple[float, int]] = []
+        self._by_start: List[Tuple[float, int]] = []                # latest start time
+        self._urgent: List[Tuple[float, int]] = []
+        self._escalated: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def latest_start(self, job: Job) -> float:
+        """Last moment the upload can start and still finish before its deadline."""
+        duration = job.get("size", 0) / self.throughput_bps
+        return job["deadline"].timestamp() - duration - self.safety_margin_seconds
+
+    def push(self, job: Job) -> None:
+        seq = next(self._seq)
+        self._jobs[seq] = job
+        heapq.heappush(self._by_deadline, (job["deadline"].timestamp(), seq))
+        heapq.heappush(self._by_start, (self.latest_start(job), seq))
+
+    def pop(self) -> Optional[Job]:
+        self._escalate()
+        while self._urgent:
+            _, seq = heapq.heappop(self._urgent)
+            if seq in self._jobs:
+                return self._take(seq)
+        while self._by_deadline:
+            _, seq = heapq.heappop(self._by_deadline)
+            if seq in self._jobs and seq not in self._escalated:
+                return self._take(seq)
+        return None
+
+    def upcoming(self, limit: int) -> List[Job]:
+        """The next `limit` jobs in the order pop() would hand them out, left queued."""
+        self._escalate()
+        seen: Set[int] = set()
+        order: List[Job] = []
+        for _, seq in sorted(self._urgent):
+            if seq in self._jobs and seq not in seen:
+                seen.add(seq)
+                order.append(self._jobs[seq])
+        for _, seq in sorted(self._by_deadline):
+            if seq in self._jobs and seq not in self._escalated and seq not in seen:
+                seen.add(seq)
+                order.append(self._jobs[seq])
+        return order[:limit]
+
+    def update_throughput(self, throughput_bps: float) -> None:
+        """Re-rank by the new expected upload durations."""
+        self.throughput_bps = max(throughput_bps, 1.0)
+        self._by_start = [(self.latest_start(self._jobs[s]), s) for s in self._jobs if s not in self._escalated]
+        heapq.heapify(self._by_start)
+        self._urgent = [(self.latest_start(self._jobs[s]), s) for s in self._escalated if s in self._jobs]
+        heapq.heapify(self._urgent)
+
+    def _escalate(self) -> None:
+        horizon = self._clock() + self.escalation_seconds
+        while self._by_start and self._by_start[0][0] < horizon:
+            start, seq = heapq.heappop(self._by_start)
+            if seq not in self._jobs or seq in self._escalated:
+                continue
+            self._escalated.add(seq)
+            self._jobs[seq]["urgent"] = True
+            heapq.heappush(self._urgent, (start, seq))
+            slack_min = (start - self._clock()) / 60
+            log.info(
+                f"⏰ Escalating challenge id={self._jobs[seq]['challenge']['id']} "
+                f"(deadline {self._jobs[seq]['deadline']}, slack {slack_min:.0f} min)"
+            )
+
+    def _take(self, seq: int) -> Job:
+        self._escalated.discard(seq)
+        return self._jobs.pop(seq)
+
+
+def select_on_time(
+    jobs: List[Job],
+    throughput_bps: float,
+    now: float,
+    time_budget_seconds: Optional[float] = None,
+    max_jobs: Optional[int] = None,
+) -> Tuple[List[Job], List[Job]]:
+    """
+    Choose the largest set of jobs that can all upload before their deadlines
+    (and within `time_budget_seconds` / `max_jobs`), treating the uplink as one
+    shared pipe at `throughput_bps`. Moore–Hodgson: walk jobs in deadline order
+    and, whenever the running total overshoots a deadline, drop the largest
+    job taken so far. Returns (selected in deadline order, deferred).
+    """
+    throughput_bps = max(throughput_bps, 1.0)
+    ordered = sorted(jobs, key=lambda j: j["deadline"])
+    taken: List[Tuple[float, int]] = []   # max-heap of (-duration, index)
+    dropped: Set[int] = set()
+    elapsed = 0.0
+
+    for i, job in enumerate(ordered):
+        duration = job.get("size", 0) / throughput_bps
+        heapq.heappush(taken, (-duration, i))
+        elapsed += duration
+        limit = job["deadline"].timestamp() - now
+        if time_budget_seconds is not None:
+            limit = min(limit, time_budget_seconds)
+        if elapsed > limit:
+            neg_duration, worst = heapq.heappop(taken)
+            elapsed += neg_duration
+            dropped.add(worst)
+
+    # Quota cap: dropping the longest jobs keeps everyone else on time.
+    while max_jobs is not None and len(taken) > max_jobs:
+        _, worst = heapq.heappop(taken)
+        dropped.add(worst)
+
+    selected = [job for i, job in enumerate(ordered) if i not in dropped]
+    deferred = [job for i, job in enumerate(ordered) if i in dropped]
+    return selected, deferred
@@ -0,0 +1,519 @@
+"""
+In-process stand-in for the YouTube Data API client.
+
+Nothing in the uploader could run without a live Google account, so runs
+could not be benchmarked or regression-tested. FakeYouTube implements the
+subset of the googleapiclient surface used here, with the same request /
+execute() / list_next() / next_chunk() shapes and HttpError failures:
+
+    channels().list                       (mine=True)
+    playlists().list / list_next          (mine=True or channelId)
+    playlistItems().list / list_next / insert / update
+    videos().insert (resumable, next_chunk) / update / list
+
+plus the uploads playlist of the channel, ETags (304 on If-None-Match, so
+ListCache works unchanged) and pageToken paging.
+
+Knobs for benchmarks and failure tests:
+- latency_seconds: added to every call and every upload chunk
+- bandwidth_bps: upload link shared by all concurrent uploads (None = unlimited)
+- daily_quota: calls beyond it fail with 403 quotaExceeded (usage resets
+  each UTC day and is kept in store_path, like the real per-project quota)
+- error_rates: {"videos.insert": 0.05, ...} random failures (status 500),
+  reproducible with `seed`; fail_next() queues exact failures
+- store_path: keep the fake channel in a JSON file between runs, so
+  plan/apply resumes, mirror and reconcile see earlier uploads. The file is
+  rewritten after each change to the channel (outside the lock, so calls do
+  not queue behind disk writes) and at exit, which also keeps quota spent
+  by read-only calls
+
+authenticate_youtube() returns one when FAKE_YOUTUBE is set (--fake-youtube).
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import random
+import string
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaUploadProgress
+
+API_ROOT = "https://youtube.googleapis.com/youtube/v3/"
+
+# YouTube Data API v3 quota table, for the calls implemented here
+QUOTA_COSTS: Dict[str, int] = {
+    "videos.insert": 1600,
+    "videos.update": 50,
+    "videos.list": 1,
+    "playlistItems.insert": 50,
+    "playlistItems.update": 50,
+    "playlistItems.list": 1,
+    "playlists.list": 1,
+    "channels.list": 1,
+}
+
+ERROR_REASONS = {
+    304: "notModified",
+    400: "invalidValue",
+    403: "quotaExceeded",
+    404: "notFound",
+    500: "backendError",
+    503: "backendError",
+}
+
+DEFAULT_PAGE_SIZE = 5       # the API's default maxResults
+TITLE_MAX_CHARS = 100
+DESCRIPTION_MAX_BYTES = 5000
+
+_ID_ALPHABET = string.ascii_letters + string.digits + "-_"
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def http_error(status: int, message: str, uri: str = "", reason: Optional[str] = None) -> HttpError:
+    """HttpError shaped like the API's JSON error responses."""
+    resp = httplib2.Response({"status": str(status), "content-type": "application/json; charset=UTF-8"})
+    resp.reason = message
+    reason = reason or ERROR_REASONS.get(status, "error")
+    content = json.dumps({
+        "error": {"code": status, "message": message, "errors": [{"reason": reason, "message": message}]}
+    }).encode("utf-8")
+    return HttpError(resp, content, uri=uri)
+
+
+class FakeRequest:
+    """One API call; execute() runs it against the fake channel."""
+
+    def __init__(self, service: "FakeYouTube", name: str, params: Dict[str, Any], handler):
+        self.service = service
+        self.name = name                      # e.g. "playlistItems.list"
+        self.params = params
+        self.method = "GET" if name.endswith(".list") else ("PUT" if name.endswith(".update") else "POST")
+        query = {k: v for k, v in params.items() if k not in ("body", "media_body") and v is not None}
+        self.uri = API_ROOT + name.split(".")[0] + "?" + urlencode(sorted(query.items()), doseq=True)
+        self.headers: Dict[str, str] = {}
+        self._handler = handler
+
+    def execute(self, num_retries: int = 0) -> Dict[str, Any]:
+        self.service._call(self.name, self.uri)
+        response = self._handler(self.params)
+        etag = response.get("etag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            raise http_error(304, "Not Modified", self.uri)
+        return response
+
+
+class FakeUploadRequest(FakeRequest):
+    """videos.insert with a resumable media body, sent chunk by chunk."""
+
+    def __init__(self, service: "FakeYouTube", params: Dict[str, Any]):
+        super().__init__(service, "videos.insert", params, handler=None)
+        self.media = params["media_body"]
+        self.resumable_progress = 0
+        self._charged = False
+
+    def next_chunk(self, num_retries: int = 0) -> Tuple[Optional[MediaUploadProgress], Optional[Dict[str, Any]]]:
+        service = self.service
+        if not self._charged:
+            # Quota is charged once, when the upload session is created.
+            service._charge(self.name, self.uri)
+            self._charged = True
+            service._validate_snippet(self.params["body"].get("snippet", {}), self.uri)
+        service._delay_and_fail(self.name, self.uri)
+
+        size = self.media.size()
+        chunk = self.media.chunksize()
+        length = size - self.resumable_progress if chunk == -1 else min(chunk, size - self.resumable_progress)
+        data = self.media.getbytes(self.resumable_progress, length)
+        service._transfer(len(data))
+        self.resumable_progress += len(data)
+
+        if self.resumable_progress < size:
+            return MediaUploadProgress(self.resumable_progress, size), None
+        return None, service._create_video(self.params["body"])
+
+    def execute(self, num_retries: int = 0) -> Dict[str, Any]:
+        response = None
+        while response is None:
+            _, response = self.next_chunk()
+        return response
+
+
+class _Resource:
+    def __init__(self, service: "FakeYouTube", name: str):
+        self._service = service
+        self._name = name
+
+    def _request(self, method: str, params: Dict[str, Any]) -> FakeRequest:
+        handler = getattr(self._service, f"_{self._name}_{method}")
+        return FakeRequest(self._service, f"{self._name}.{method}", params, handler)
+
+    def list(self, **params: Any) -> FakeRequest:
+        return self._request("list", params)
+
+    def list_next(self, previous_request: FakeRequest, previous_response: Dict[str, Any]) -> Optional[FakeRequest]:
+        token = previous_response.get("nextPageToken")
+        if not token:
+            return None
+        return self._request("list", {**previous_request.params, "pageToken": token})
+
+    def insert(self, **params: Any) -> FakeRequest:
+        if self._name == "videos":
+            return FakeUploadRequest(self._service, params)
+        return self._request("insert", params)
+
+    def update(self, **params: Any) -> FakeRequest:
+        return self._request("update", params)
+
+
+class FakeYouTube:
+    """Fake youtube v3 service for one channel, kept in memory (or in store_path)."""
+
+    def __init__(
+        self,
+        channel_title: str = "Fake Channel",
+        playlists: Optional[List[str]] = None,
+        latency_seconds: float = 0.0,
+        bandwidth_bps: Optional[float] = None,
+        daily_quota: Optional[int] = 10_000,
+        error_rates: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None,
+        store_path: Optional[str] = None,
+    ):
+        self.latency_seconds = latency_seconds
+        self.bandwidth_bps = bandwidth_bps
+        self.daily_quota = daily_quota
+        self.error_rates = error_rates or {}
+        self.store_path = store_path
+
+        self.calls: Counter = Counter()
+        self.bytes_received = 0
+
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._link = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._version = 0      # bumped per snapshot; older snapshots are never written over newer ones
+        self._written = 0
+        self._failures: Dict[str, List[int]] = {}
+
+        self._store: Dict[str, Any] = {
+            "channel": {"id": "UC" + self._new_id(22), "title": channel_title},
+            "videos": {},          # video id -> resource
+            "uploads": [],         # video ids, newest first
+            "playlists": {},       # playlist id -> {"title", "items": [item resource]}
+            "quota": {"day": None, "used": 0},
+        }
+        if store_path and os.path.exists(store_path):
+            with open(store_path, "r", encoding="utf-8") as f:
+                self._store = json.load(f)
+        for title in playlists or []:
+            if not any(p["title"] == title for p in self._store["playlists"].values()):
+                self.add_playlist(title)
+        if store_path:
+            atexit.register(self.save)
+
+    # ---- googleapiclient surface ----
+
+    def channels(self) -> _Resource:
+        return _Resource(self, "channels")
+
+    def playlists(self) -> _Resource:
+        return _Resource(self, "playlists")
+
+    def playlistItems(self) -> _Resource:
+        return _Resource(self, "playlistItems")
+
+    def videos(self) -> _Resource:
+        return _Resource(self, "videos")
+
+    # ---- test helpers ----
+
+    def add_playlist(self, title: str) -> str:
+        with self._lock:
+            playlist_id = "PL" + self._new_id(32)
+            self._store["playlists"][playlist_id] = {"title": title, "items": []}
+            snapshot = self._snapshot()
+        self._write(snapshot)
+        return playlist_id
+
+    def save(self) -> None:
+        """Write the store (including today's quota usage) to store_path."""
+        with self._lock:
+            snapshot = self._snapshot()
+        self._write(snapshot)
+
+    def fail_next(self, method: str, status: int = 500, times: int = 1) -> None:
+        """Make the next `times` calls of `method` (e.g. "videos.update") fail with `status`."""
+        with self._lock:
+            self._failures.setdefault(method, []).extend([status] * times)
+
+    @property
+    def quota_used(self) -> int:
+        """Units spent today."""
+        quota = self._store["quota"]
+        return quota["used"] if quota["day"] == _today() else 0
+
+    @property
+    def uploads_playlist_id(self) -> str:
+        return "UU" + self._store["channel"]["id"][2:]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": dict(self.calls),
+            "quota_used": self.quota_used,
+            "bytes_received": self.bytes_received,
+            "videos": len(self._store["videos"]),
+        }
+
+    # ---- call plumbing ----
+
+    def _new_id(self, length: int = 11) -> str:
+        return "".join(self._rng.choice(_ID_ALPHABET) for _ in range(length))
+
+    def _call(self, name: str, uri: str) -> None:
+        """Count the call, charge quota, apply latency and injected failures."""
+        self._charge(name, uri)
+        self._delay_and_fail(name, uri)
+
+    def _charge(self, name: str, uri: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+            cost = QUOTA_COSTS.get(name, 1)
+            used = self.quota_used
+            if self.daily_quota is not None and used + cost > self.daily_quota:
+                raise http_error(403, "The request cannot be completed because you have exceeded your quota.",
+                                 uri, reason="quotaExceeded")
+            self._store["quota"] = {"day": _today(), "used": used + cost}
+
+    def _delay_and_fail(self, name: str, uri: str) -> None:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        with self._lock:
+            queued = self._failures.get(name)
+            status = queued.pop(0) if queued else None
+            if status is None and self._rng.random() < self.error_rates.get(name, 0.0):
+                status = 500
+        if status is not None:
+            raise http_error(status, f"Injected failure of {name}", uri)
+
+    def _transfer(self, num_bytes: int) -> None:
+        """Receive bytes over the shared upload link."""
+        if self.bandwidth_bps:
+            with self._link:
+                time.sleep(num_bytes / self.bandwidth_bps)
+        with self._lock:
+            self.bytes_received += num_bytes
+
+    def _snapshot(self) -> Optional[Tuple[int, str]]:
+        """Serialized store to hand to _write() after releasing the lock (lock held)."""
+        if not self.store_path:
+            return None
+        self._version += 1
+        return self._version, json.dumps(self._store)
+
+    def _write(self, snapshot: Optional[Tuple[int, str]]) -> None:
+        if snapshot is None:
+            return
+        version, text = snapshot
+        with self._write_lock:
+            if version <= self._written:
+                return
+            os.makedirs(os.path.dirname(self.store_path) or ".", exist_ok=True)
+            tmp = self.store_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.store_path)
+            self._written = version
+
+    @staticmethod
+    def _page(items: List[Dict[str, Any]], params: Dict[str, Any], kind: str) -> Dict[str, Any]:
+        start = int(params.get("pageToken") or 0)
+        size = min(int(params.get("maxResults") or DEFAULT_PAGE_SIZE), 50)
+        page = items[start:start + size]
+        response: Dict[str, Any] = {
+            "kind": kind,
+            "pageInfo": {"totalResults": len(items), "resultsPerPage": size},
+            "items": page,
+        }
+        if start + size < len(items):
+            response["nextPageToken"] = str(start + size)
+        response["etag"] = hashlib.sha1(json.dumps(response, sort_keys=True).encode("utf-8")).hexdigest()
+        return response
+
+    def _validate_snippet(self, snippet: Dict[str, Any], uri: str) -> None:
+        title = snippet.get("title", "")
+        if not title or len(title) > TITLE_MAX_CHARS:
+            raise http_error(400, "The request metadata specifies an invalid video title.", uri,
+                             reason="invalidTitle")
+        if len(snippet.get("description", "").encode("utf-8")) > DESCRIPTION_MAX_BYTES:
+            raise http_error(400, "The request metadata specifies an invalid video description.", uri,
+                             reason="invalidDescription")
+
+    # ---- channels ----
+
+    def _channels_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        channel = self._store["channel"]
+        item = {
+            "kind": "youtube#channel",
+            "id": channel["id"],
+            "snippet": {"title": channel["title"]},
+            "contentDetails": {"relatedPlaylists": {"uploads": self.uploads_playlist_id}},
+        }
+        return self._page([item] if params.get("mine") else [], params, "youtube#channelListResponse")
+
+    # ---- playlists ----
+
+    def _playlists_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            mine = params.get("mine") or params.get("channelId") == self._store["channel"]["id"]
+            items = [
+                {
+                    "kind": "youtube#playlist",
+                    "id": pid,
+                    "snippet": {"title": p["title"], "channelId": self._store["channel"]["id"]},
+                    "contentDetails": {"itemCount": len(p["items"])},
+                }
+                for pid, p in self._store["playlists"].items()
+            ] if mine else []
+        return self._page(items, params, "youtube#playlistListResponse")
+
+    # ---- playlist items ----
+
+    def _playlist_items(self, playlist_id: str, uri: str) -> List[Dict[str, Any]]:
+        if playlist_id == self.uploads_playlist_id:
+            return [self._uploads_item(vid, i) for i, vid in enumerate(self._store["uploads"])]
+        playlist = self._store["playlists"].get(playlist_id)
+        if playlist is None:
+            raise http_error(404, "The playlist identified with the request's playlistId parameter cannot be found.",
+                             uri, reason="playlistNotFound")
+        return playlist["items"]
+
+    def _uploads_item(self, video_id: str, position: int) -> Dict[str, Any]:
+        video = self._store["videos"][video_id]
+        return {
+            "kind": "youtube#playlistItem",
+            "id": "UU" + video_id,
+            "snippet": {
+                "playlistId": self.uploads_playlist_id,
+                "position": position,
+                "title": video["snippet"]["title"],
+                "publishedAt": video["snippet"]["publishedAt"],
+                "resourceId": {"kind": "youtube#video", "videoId": video_id},
+            },
+            "contentDetails": {"videoId": video_id},
+        }
+
+    def _playlistItems_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        uri = API_ROOT + "playlistItems"
+        with self._lock:
+            items = json.loads(json.dumps(self._playlist_items(params.get("playlistId"), uri)))
+        return self._page(items, params, "youtube#playlistItemListResponse")
+
+    def _playlistItems_insert(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        uri = API_ROOT + "playlistItems"
+        snippet = params["body"]["snippet"]
+        video_id = snippet["resourceId"]["videoId"]
+        with self._lock:
+            items = self._playlist_items(snippet["playlistId"], uri)
+            if video_id not in self._store["videos"]:
+                raise http_error(404, "Video not found.", uri, reason="videoNotFound")
+            position = snippet.get("position", len(items))
+            item = {
+                "kind": "youtube#playlistItem",
+                "id": "PLI" + self._new_id(24),
+                "snippet": {
+                    "playlistId": snippet["playlistId"],
+                    "title": self._store["videos"][video_id]["snippet"]["title"],
+                    "resourceId": {"kind": "youtube#video", "videoId": video_id},
+                },
+                "contentDetails": {"videoId": video_id},
+            }
+            items.insert(min(position, len(items)), item)
+            self._renumber(items)
+            result = json.loads(json.dumps(item))
+            snapshot = self._snapshot()
+        self._write(snapshot)
+        return result
+
+    def _playlistItems_update(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        uri = API_ROOT + "playlistItems"
+        body = params["body"]
+        with self._lock:
+            items = self._playlist_items(body["snippet"]["playlistId"], uri)
+            index = next((i for i, item in enumerate(items) if item["id"] == body["id"]), None)
+            if index is None:
+                raise http_error(404, "Playlist item not found.", uri, reason="playlistItemNotFound")
+            item = items.pop(index)
+            items.insert(min(body["snippet"].get("position", index), len(items)), item)
+            self._renumber(items)
+            result = json.loads(json.dumps(item))
+            snapshot = self._snapshot()
+        self._write(snapshot)
+        return result
+
+    @staticmethod
+    def _renumber(items: List[Dict[str, Any]]) -> None:
+        for position, item in enumerate(items):
+            item["snippet"]["position"] = position
+
+    # ---- videos ----
+
+    def _create_video(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            video_id = self._new_id()
+            while video_id in self._store["videos"]:
+                video_id = self._new_id()
+            video = {
+                "kind": "youtube#video",
+                "id": video_id,
+                "snippet": {**body.get("snippet", {}), "publishedAt": _now_iso(),
+                            "channelId": self._store["channel"]["id"]},
+                "status": {**body.get("status", {}), "uploadStatus": "processed"},
+            }
+            self._store["videos"][video_id] = video
+            self._store["uploads"].insert(0, video_id)
+            result = json.loads(json.dumps(video))
+            snapshot = self._snapshot()
+        self._write(snapshot)
+        return result
+
+    def _videos_update(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        uri = API_ROOT + "videos"
+        body = params["body"]
+        with self._lock:
+            video = self._store["videos"].get(body.get("id"))
+            if video is None:
+                raise http_error(404, "Video not found.", uri, reason="videoNotFound")
+            for part in params["part"].split(","):
+                if part == "snippet":
+                    self._validate_snippet(body.get("snippet", {}), uri)
+                    video["snippet"] = {**body["snippet"], "publishedAt": video["snippet"]["publishedAt"],
+                                        "channelId": video["snippet"]["channelId"]}
+                elif part == "status":
+                    video["status"] = {**body["status"], "uploadStatus": video["status"]["uploadStatus"]}
+            result = json.loads(json.dumps(video))
+            snapshot = self._snapshot()
+        self._write(snapshot)
+        return result
+
+    def _videos_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        ids = [v for v in (params.get("id") or "").split(",") if v]
+        with self._lock:
+            items = [json.loads(json.dumps(self._store["videos"][v])) for v in ids if v in self._store["videos"]]
+        return self._page(items, {**params, "maxResults": 50}, "youtube#videoListResponse")
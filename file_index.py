@@ -0,0 +1,151 @@
+"""
+Match metadata keys to video files with one directory listing.
+
+main.py only looked for `challenge_final_<id>.mp4` and the GUI for
+`<prefix><key>.mp4`, one os.path.exists call per key, so a file named
+"Long Exhale Relax 5382.mp4" for key "long_exhale_relax_5382" was reported
+missing. FileIndex lists the folder once and matches every key in three
+tiers, each file going to at most one key:
+
+1. exact           file stem == key, or == <prefix><key>
+2. normalized      same word tokens after lower-casing, splitting on
+                   anything that is not a letter or digit and dropping
+                   prefixes and noise words ("final", "yt", "copy")
+3. numeric suffix  the key's trailing number equals the number a file is
+                   named by, when exactly one unclaimed file has it. Only
+                   stems that are just that number once prefixes and
+                   noise words are removed count ("Final 012.mp4"), so
+                   "challenge_final_12_v2" or "box_breath_5" never stand
+                   in for challenge 2 or 5.
+
+Keys left over are reported as unmatched, files left over as orphans, and
+keys with several equally good candidates as ambiguous. Unmatched keys whose
+number only appears at the end of other file names ("box_breath_5") are also
+listed as unconfirmed with those files, for a person to check; they are never
+matched automatically.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".m4v", ".mkv", ".webm")
+NOISE_TOKENS = ("final", "yt", "copy")
+
+EXACT = "exact"
+NORMALIZED = "normalized"
+NUMERIC = "numeric-suffix"
+
+
+def tokens(name: str) -> List[str]:
+    """Lower-case word tokens; "LongExhale-Relax_5382" -> ["long", "exhale", "relax", "5382"]."""
+    name = re.sub(r"([a-z])([A-Z])", r"\1 \2", name)
+    return [t for t in re.split(r"[^a-z0-9]+", name.lower()) if t]
+
+
+def trailing_number(name: str) -> Optional[str]:
+    found = re.search(r"(\d+)\D*$", name)
+    return (found.group(1).lstrip("0") or "0") if found else None
+
+
+class FileIndex:
+    """Video files of one folder, indexed by exact stem, token key and trailing number."""
+
+    def __init__(
+        self,
+        directory: os.PathLike,
+        prefixes: Iterable[str] = (),
+        extensions: Tuple[str, ...] = VIDEO_EXTENSIONS,
+        noise_tokens: Iterable[str] = NOISE_TOKENS,
+    ):
+        self.directory = Path(directory)
+        self.prefixes = [p.lower() for p in prefixes if p]
+        self.noise = set(noise_tokens)
+        for prefix in self.prefixes:
+            self.noise.update(tokens(prefix))
+
+        self.files: List[Path] = []
+        self._exact: Dict[str, Path] = {}
+        self._by_tokens: Dict[str, List[Path]] = {}
+        self._by_number: Dict[str, List[Path]] = {}
+        self._by_loose_number: Dict[str, List[Path]] = {}
+
+        try:
+            with os.scandir(self.directory) as it:
+                entries = [e for e in it if e.is_file() and e.name.lower().endswith(extensions)]
+        except OSError:
+            entries = []
+        for entry in sorted(entries, key=lambda e: e.name):
+            path = self.directory / entry.name
+            stem = path.stem
+            self.files.append(path)
+            self._exact.setdefault(stem.lower(), path)
+            for prefix in self.prefixes:
+                if stem.lower().startswith(prefix):
+                    self._exact.setdefault(stem[len(prefix):].lower(), path)
+            token_key = self.token_key(stem)
+            self._by_tokens.setdefault(token_key, []).append(path)
+            number = trailing_number(stem)
+            if number is None:
+                continue
+            if token_key.isdigit():
+                self._by_number.setdefault(number, []).append(path)
+            else:
+                self._by_loose_number.setdefault(number, []).append(path)
+
+    def token_key(self, name: str) -> str:
+        return "_".join(t for t in tokens(name) if t not in self.noise)
+
+    def match_all(self, keys: Iterable[Any]) -> Dict[str, Any]:
+        """
+        Match keys to files. Returns a report dict:
+        matched {key: Path}, methods {key: tier}, unmatched [key],
+        ambiguous {key: [Path]}, orphans [Path], and unconfirmed
+        {unmatched key: [Path]} for files that only end in the key's number.
+        """
+        keys = [str(k) for k in dict.fromkeys(keys)]
+        matched: Dict[str, Path] = {}
+        methods: Dict[str, str] = {}
+        ambiguous: Dict[str, List[Path]] = {}
+        claimed = set()
+
+        def claim(key: str, candidates: List[Path], method: str) -> None:
+            free = [p for p in candidates if p not in claimed]
+            if len(free) == 1:
+                matched[key] = free[0]
+                methods[key] = method
+                claimed.add(free[0])
+                ambiguous.pop(key, None)
+            elif len(free) > 1:
+                ambiguous[key] = free
+
+        for key in keys:
+            path = self._exact.get(key.lower())
+            if path is not None:
+                claim(key, [path], EXACT)
+        for key in keys:
+            if key not in matched:
+                claim(key, self._by_tokens.get(self.token_key(key), []), NORMALIZED)
+        for key in keys:
+            if key not in matched and key not in ambiguous:
+                number = trailing_number(key)
+                if number is not None:
+                    claim(key, self._by_number.get(number, []), NUMERIC)
+
+        unmatched = [k for k in keys if k not in matched and k not in ambiguous]
+        unconfirmed: Dict[str, List[Path]] = {}
+        for key in unmatched:
+            number = trailing_number(key)
+            candidates = [p for p in self._by_loose_number.get(number, []) if p not in claimed]
+            if number is not None and candidates:
+                unconfirmed[key] = candidates
+
+        return {
+            "matched": matched,
+            "methods": methods,
+            "unmatched": unmatched,
+            "unconfirmed": unconfirmed,
+            "ambiguous": ambiguous,
+            "orphans": [p for p in self.files if p not in claimed],
+        }
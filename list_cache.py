@@ -0,0 +1,98 @@
+"""
+ETag-aware on-disk cache for read-only YouTube list calls.
+
+channels.list, playlists.list and playlistItems.list answers rarely change,
+but get_playlist_id and the GUI dropdowns used to re-list them every time.
+ListCache.execute(request) wraps a googleapiclient list request:
+- fresh entry (younger than the TTL)   → returned without any API call
+- stale entry with an ETag             → re-sent with If-None-Match; a 304
+                                         keeps the cached body
+- no entry / changed listing           → normal call, response stored
+
+Entries are keyed on the request URI (method, parameters, page token) and
+the cache's scope: "mine=True" URIs are the same for every account, so callers
+pass the authenticated identity as `scope` and one account never gets
+another's listings.
+list_next() works unchanged on cached responses, since they carry the
+original nextPageToken.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import googleapiclient.errors
+
+DEFAULT_TTL_SECONDS = 3600
+
+
+class ListCache:
+    """Response cache for list requests, persisted as JSON."""
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, scope: str = ""):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.scope = scope
+        self.stats = {"hits": 0, "not_modified": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                try:
+                    self._entries = json.load(f)
+                except json.JSONDecodeError:
+                    self._entries = {}
+
+    def key_for(self, request) -> str:
+        return hashlib.sha1(f"{self.scope} {request.method} {request.uri}".encode("utf-8")).hexdigest()
+
+    def execute(self, request, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Run a list request through the cache (max_age overrides the TTL)."""
+        key = self.key_for(request)
+        ttl = self.ttl_seconds if max_age is None else max_age
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry["fetched"] < ttl:
+                self.stats["hits"] += 1
+                return entry["response"]
+
+        # The header goes on a copy used for this call only: list_next() pages
+        # are shallow copies of this request and must not inherit the ETag.
+        headers = request.headers
+        if entry and entry.get("etag"):
+            request.headers = {**headers, "If-None-Match": entry["etag"]}
+        try:
+            response = request.execute()
+        except googleapiclient.errors.HttpError as e:
+            if entry and e.resp.status == 304:
+                with self._lock:
+                    self.stats["not_modified"] += 1
+                    entry["fetched"] = now
+                    self._save()
+                return entry["response"]
+            raise
+        finally:
+            request.headers = headers
+
+        with self._lock:
+            self.stats["misses"] += 1
+            self._entries[key] = {"etag": response.get("etag"), "fetched": now, "response": response}
+            self._save()
+        return response
+
+    def invalidate(self) -> None:
+        """Forget everything, e.g. after creating a playlist."""
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def _save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
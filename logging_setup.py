@@ -0,0 +1,128 @@
+"""
+Non-blocking structured logging.
+
+Status output used to be synchronous print() calls straight from the upload
+workers: lines from concurrent uploads interleaved, and a slow terminal or
+a full pipe stalled the uploader itself. setup_logging() routes every log
+record through a QueueHandler instead. The calling thread only formats the
+message and puts it on an unbounded queue, which never blocks. A
+QueueListener thread does the actual I/O:
+
+- console: the message as before ("[WARN] " / "[ERROR] " added by level)
+- JSON lines (optional): one object per record with ts, level, logger,
+  thread, msg and the context fields channel, challenge_id, video_id, phase
+
+Context fields come from bind() / set_context() (a context variable, so each
+worker thread carries its own challenge) on top of set_defaults()
+(process-wide, e.g. the channel). Call stop() on the listener returned by
+setup_logging() before exiting to flush what is still queued.
+"""
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+CONTEXT_FIELDS = ("channel", "challenge_id", "video_id", "phase")
+
+_context: contextvars.ContextVar = contextvars.ContextVar("log_context", default={})
+_defaults: Dict[str, Any] = {}
+
+
+def set_defaults(**fields: Any) -> None:
+    """Context fields for every record of the process (unless bound otherwise)."""
+    _defaults.update(fields)
+
+
+@contextmanager
+def bind(**fields: Any) -> Iterator[None]:
+    """Add context fields to every record logged in this block, in this thread."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def set_context(**fields: Any) -> None:
+    """Change context fields for the rest of the enclosing bind() block."""
+    _context.set({**_context.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    """Copies the caller's context onto the record before it is queued."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = {**_defaults, **_context.get()}
+        for name in CONTEXT_FIELDS:
+            if not hasattr(record, name):
+                setattr(record, name, fields.get(name))
+        return True
+
+
+class ConsoleFormatter(logging.Formatter):
+    PREFIXES = {logging.WARNING: "[WARN] ", logging.ERROR: "[ERROR] ", logging.CRITICAL: "[ERROR] "}
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = self.PREFIXES.get(record.levelno, "") + record.getMessage()
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(
+    json_path: Optional[str] = None,
+    console: bool = True,
+    level: int = logging.INFO,
+) -> logging.handlers.QueueListener:
+    """Install the queue handler on the root logger and start the writer thread."""
+    targets = []
+    if console:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(ConsoleFormatter())
+        targets.append(stream)
+    if json_path:
+        os.makedirs(os.path.dirname(json_path) or ".", exist_ok=True)
+        file_handler = logging.FileHandler(json_path, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        targets.append(file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+    # Client libraries are chatty at INFO
+    logging.getLogger("googleapiclient").setLevel(logging.WARNING)
+
+    listener = logging.handlers.QueueListener(log_queue, *targets, respect_handler_level=True)
+    listener.start()
+    return listener
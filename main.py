@@ -13,10 +13,18 @@ Key features:
 - Dry-run mode + max uploads per run
 """
 
+import argparse
+import hashlib
+import itertools
 import os
 import json
+import logging
 import random
+import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone, date
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Any
@@ -28,6 +36,36 @@ from googleapiclient.http import MediaFileUpload
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 
+from channel_sync import fetch_video_statuses, sync_publish_times
+from deadlines import DeadlineQueue, select_on_time
+from fake_youtube import FakeYouTube
+from file_index import FileIndex
+from media import MmapMediaUpload
+from list_cache import ListCache
+from logging_setup import bind, set_context, set_defaults, setup_logging
+from metadata_compile import compile_manifest, load_manifest
+from metadata_update import changed_entries, metadata_hash, push_updates
+from metrics import (
+    API_ERRORS_TOTAL, BYTES_TOTAL, CHUNK_SECONDS, CHUNKS_TOTAL, METRICS, QUOTA_UNITS_TOTAL, quota_spent_since,
+)
+from mirror import ChannelMirror
+from plan import (
+    PLAN_VERSION, STEP_PLAYLIST, STEP_SCHEDULE, STEP_UPLOAD, PlanProgress, read_plan, write_plan,
+)
+from playlists import PlaylistIndex, apply_reorder, list_playlist_entries, plan_reorder
+from prefetch import Prefetcher
+from profiling import MODES as PROFILE_MODES, PROFILER
+from progress import JsonLinesSink, ProgressTracker, status_line
+from preflight import run_preflight
+from reconcile import LIVE, RECONCILE_FIELDS, classify, reconcile_all
+from slot_calendar import ChannelSchedule, SlotCalendar
+from throttle import BandwidthLimiter
+from tuning import AdaptiveController
+from tracing import SPAN_KIND_CLIENT, TRACER
+from transport import PooledHttp
+
+log = logging.getLogger(__name__)
+
 # =========================
 # PATHS & CONSTANTS
 # =========================
@@ -36,6 +74,13 @@ VIDEOS_DIR = Path("/Users/kedarbhokare/Desktop/electron/breathing-app/electron/d
 VIDEO_PREFIX = "challenge_final_"
 VIDEO_SUFFIX = ".mp4"
 
+# Match challenge ids to files with one listing of VIDEOS_DIR (see
+# file_index.py), so "Challenge Final 12.mp4" or "challenge-final-012.mov" are
+# found too. Ids without a match fall back to VIDEO_PREFIX<id>VIDEO_SUFFIX;
+# files that merely end in the id ("box_breath_12.mov") are only reported by
+# the match-files command, never uploaded in its place.
+FILE_MATCHING = True
+
 CLIENT_SECRETS_FILE = "client_secret.json"
 TOKEN_FILE = "youtube_token.json"
 
@@ -62,6 +107,177 @@ STOP_AT_ID: Optional[str] = None
 
 STATE_FILE = "upload_state.json"
 
+# =========================
+# API QUOTA
+# =========================
+
+DAILY_QUOTA_UNITS = 10_000      # default YouTube Data API project quota
+
+# The quota resets at midnight Pacific time. Fixed UTC-8: under daylight
+# saving the day starts an hour early, which only over-counts spend.
+QUOTA_RESET_TZ = timezone(timedelta(hours=-8))
+
+# Units charged per call (YouTube Data API v3 quota table)
+QUOTA_COSTS: Dict[str, int] = {
+    "videos.insert": 1600,
+    "videos.update": 50,
+    "videos.list": 1,
+    "playlistItems.insert": 50,
+    "playlistItems.update": 50,
+    "playlistItems.list": 1,
+    "playlists.list": 1,
+    "channels.list": 1,
+}
+
+# One upload = insert + playlist add + schedule update
+QUOTA_COST_PER_UPLOAD = (
+    QUOTA_COSTS["videos.insert"] + QUOTA_COSTS["playlistItems.insert"] + QUOTA_COSTS["videos.update"]
+)
+
+# =========================
+# HTTP TRANSPORT
+# =========================
+
+# "pooled"   → thread-safe urllib3 connection pool (see transport.py)
+# "httplib2" → googleapiclient's default per-client httplib2.Http
+HTTP_TRANSPORT = "pooled"
+HTTP_POOL_SIZE = 10                     # max connections kept per host
+HTTP_TCP_KEEPALIVE = True
+HTTP_SEND_BUFFER_BYTES = 4 * 1024 * 1024  # SO_SNDBUF; None = OS default
+HTTP_TIMEOUT_SECONDS = 120
+
+# "mmap" → zero-copy chunks served from a memory map (see media.py)
+# "file" → googleapiclient's MediaFileUpload (reads each chunk into memory)
+UPLOAD_MEDIA_SOURCE = "mmap"
+
+# Resumable chunk size in bytes (multiple of 256 KiB). Bandwidth pacing is
+# applied per chunk, so -1 (whole file in one request) disables throttling.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# A chunk failing with a 5xx or a network error is re-sent (next_chunk()
+# first asks the server how much it got) up to UPLOAD_CHUNK_RETRIES times,
+# waiting UPLOAD_RETRY_BACKOFF_SECONDS, doubled per attempt, in between.
+UPLOAD_CHUNK_RETRIES = 3
+UPLOAD_RETRY_BACKOFF_SECONDS = 2.0
+
+# Warm the page cache for upcoming videos while the current one uploads
+PREFETCH_ENABLED = True
+PREFETCH_HORIZON_SECONDS = 600      # keep ~10 min of upcoming uploads warm
+PREFETCH_MAX_FILES = 4
+PREFETCH_MEMORY_FRACTION = 0.5      # share of available RAM prefetch may use
+
+# =========================
+# PARALLEL UPLOADS & TUNING
+# =========================
+
+UPLOAD_WORKERS = 1              # parallel uploads when ADAPTIVE_TUNING is off
+
+# AIMD controller (see tuning.py): adjusts concurrent uploads and chunk size
+# from aggregate bytes/sec and the 5xx/timeout rate, starting at 1 worker.
+ADAPTIVE_TUNING = True
+ADAPTIVE_MAX_WORKERS = 4
+ADAPTIVE_MIN_CHUNK_SIZE = 1024 * 1024
+ADAPTIVE_MAX_CHUNK_SIZE = 64 * 1024 * 1024
+ADAPTIVE_INTERVAL_SECONDS = 30
+
+# Before scheduling, read the real publishAt of every uploaded video from the
+# channel (videos.list, 1 quota unit per 50 videos) so slots freed by deleted
+# or hand-rescheduled videos are reused.
+SYNC_SCHEDULE_FROM_CHANNEL = True
+
+# Local mirror of the channel's uploads and target playlist (see mirror.py).
+# Refreshed incrementally each run; challenges whose title already exists on
+# the channel are recorded instead of uploaded twice.
+MIRROR_ENABLED = True
+MIRROR_FILE = "channel_mirror.json"
+
+# ETag cache for channels/playlists/playlistItems list calls (see list_cache.py).
+# Within the TTL a listing costs nothing; after it, one If-None-Match request.
+LIST_CACHE_FILE = "youtube_list_cache.json"
+LIST_CACHE_TTL_SECONDS = 6 * 3600
+
+# Check every file of a run (exists, readable, looks like a video) before
+# authenticating; failing items are dropped up front.
+PREFLIGHT_ENABLED = True
+PREFLIGHT_WORKERS = 16          # stat/read concurrency, helps on network mounts
+
+# Compiled, validated metadata for the whole catalog (see metadata_compile.py).
+# Recompiled incrementally at the start of each run; entries that break
+# YouTube's limits are skipped before their file is uploaded.
+METADATA_MANIFEST_FILE = "metadata_manifest.jsonl"
+
+# Per-phase metrics (see metrics.py): Prometheus textfile for node_exporter's
+# textfile collector, plus one JSON summary per run. None disables an output.
+METRICS_TEXTFILE: Optional[str] = "metrics/youtube_uploader.prom"
+METRICS_SUMMARY_DIR: Optional[str] = "metrics"
+
+# Batch progress (see progress.py): a status line every
+# PROGRESS_INTERVAL_SECONDS with throughput and ETA for the run, and
+# optionally the same snapshots as JSON lines ("-" = stderr, so they do not
+# mix with the log lines on stdout).
+PROGRESS_INTERVAL_SECONDS = 5
+PROGRESS_JSON_FILE: Optional[str] = None
+
+# One trace per video (queue wait, each chunk, playlist insert, schedule),
+# appended as OTLP JSON lines (see tracing.py). None disables tracing.
+TRACE_FILE: Optional[str] = "traces/uploader_traces.jsonl"
+
+# Log records are queued and written by a background thread (see
+# logging_setup.py): human-readable lines on the console, plus JSON lines with
+# channel / challenge_id / video_id / phase fields. None disables the file.
+LOG_JSON_FILE: Optional[str] = "logs/uploader.jsonl"
+LOG_LEVEL = logging.INFO
+
+# Profile the whole run, worker threads included (see profiling.py):
+# "sample" (low overhead), "cprofile" (exact call counts) or None. Reports
+# and tracemalloc allocations per phase go to PROFILE_DIR/<command>-<time>/.
+# --profile on the command line overrides this.
+PROFILE_MODE: Optional[str] = None
+PROFILE_DIR = "profiles"
+
+# Run against the in-process fake API (see fake_youtube.py) instead of
+# YouTube; --fake-youtube on the command line sets it. State, mirror and list
+# cache then live under FAKE_YOUTUBE_DIR next to the fake channel itself, so
+# the real ones are never touched.
+FAKE_YOUTUBE = False
+FAKE_YOUTUBE_DIR = "fake_youtube"
+FAKE_YOUTUBE_OPTIONS: Dict[str, Any] = {
+    "latency_seconds": 0.05,
+    "bandwidth_bps": 50_000_000,
+    "daily_quota": DAILY_QUOTA_UNITS,
+    "error_rates": {},
+    "seed": 1,
+}
+
+# =========================
+# DEADLINE-AWARE ORDERING
+# =========================
+
+# Pending uploads get their publish slot up front and run earliest deadline
+# first; a job whose slack drops under the escalation window jumps the queue.
+DEADLINE_ESCALATION_SECONDS = 6 * 3600
+DEADLINE_SAFETY_MARGIN_SECONDS = 600
+EXPECTED_UPLOAD_BPS = 2 * 1024 * 1024   # initial estimate until uploads are measured
+
+# Pack each batch into the remaining time/quota window so the most videos
+# make their publishAt (Moore–Hodgson); others wait for the next run.
+DEADLINE_BIN_PACKING = False
+RUN_TIME_BUDGET_SECONDS: Optional[float] = None     # e.g. 6 * 3600; None = no limit
+
+# =========================
+# BANDWIDTH LIMIT
+# =========================
+
+# Default upload cap in bytes/sec, shared by all uploads. None = unlimited.
+# e.g. 2 * 1024 * 1024 for 2 MB/s during office hours.
+BANDWIDTH_LIMIT_BPS: Optional[float] = None
+
+# Local-time windows overriding the default: (start, end, bytes/sec or None).
+# Windows may wrap past midnight, e.g. ("22:00", "07:00", None).
+BANDWIDTH_WINDOWS: List[Tuple[str, str, Optional[float]]] = [
+    ("01:00", "07:00", None),       # full speed overnight
+]
+
 # =========================
 # MULTI-CHANNEL CONFIG
 # =========================
@@ -84,9 +300,20 @@ CHANNELS: Dict[str, Dict[str, Any]] = {
 
         # Timezone object
         "timezone": IST,
+
+        # Publish slots per day inside the window, and minimum gap between them
+        "slots_per_day": 1,
+        "min_slot_spacing_minutes": 60,
+        # Days that never get a publish slot, e.g. [date(2026, 3, 14)]
+        "blackout_dates": [],
+        # Fixed seed → reproducible slot times; None → random each run
+        "schedule_seed": None,
     },
 
     # You can add more profiles later, e.g. "second_channel": {...}
+    # Give each extra profile its own "token_file" (OAuth token of that
+    # channel's account) so reconcile can check it too; the active channel
+    # defaults to TOKEN_FILE.
 }
 
 # =========================
@@ -222,6 +449,8 @@ def get_channel_state(full_state: Dict[str, Any], channel_name: str) -> Dict[str
     return full_state[channel_name]
 
 
+@METRICS.timed("save_state", none_is_error=False)
+@TRACER.traced("state.save", none_is_error=False)
 def save_full_state(full_state: Dict[str, Any]) -> None:
     full_state.setdefault(ACTIVE_CHANNEL, {})["last_run"] = datetime.utcnow().isoformat() + "Z"
     with open(STATE_FILE, "w", encoding="utf-8") as f:
@@ -232,12 +461,48 @@ def save_full_state(full_state: Dict[str, Any]) -> None:
 # AUTHENTICATION
 # =========================
 
+# Who authenticate_youtube() signed in as; scopes the list cache
+_account_identity = ""
+
+
+def open_list_cache() -> ListCache:
+    """List cache for the authenticated account and the active channel."""
+    return ListCache(LIST_CACHE_FILE, ttl_seconds=LIST_CACHE_TTL_SECONDS,
+                     scope=f"{ACTIVE_CHANNEL}|{_account_identity}")
+
+
+@METRICS.timed("auth")
 def authenticate_youtube():
     """Authenticate and return a YouTube API client."""
+    global _account_identity
+    if FAKE_YOUTUBE:
+        _account_identity = "fake"
+        return FakeYouTube(
+            channel_title=ACTIVE_CHANNEL,
+            playlists=[cfg["playlist_name"] for cfg in CHANNELS.values()],
+            store_path=os.path.join(FAKE_YOUTUBE_DIR, "channel.json"),
+            **FAKE_YOUTUBE_OPTIONS,
+        )
+
+    token_file = CHANNELS[ACTIVE_CHANNEL].get("token_file", TOKEN_FILE)
+    creds = load_credentials(token_file, interactive=True)
+    # The refresh token stands for one account's grant; hashed, not stored
+    grant = creds.refresh_token or creds.token or token_file
+    _account_identity = hashlib.sha1(grant.encode("utf-8")).hexdigest()[:16]
+    return build_youtube(creds)
+
+
+def load_credentials(token_file: str, interactive: bool = True) -> Optional[Credentials]:
+    """
+    Valid credentials from `token_file`, refreshed and saved back if needed.
+
+    Without a usable token, runs the browser sign-in when interactive,
+    otherwise returns None.
+    """
     creds = None
 
-    if os.path.exists(TOKEN_FILE):
-        with open(TOKEN_FILE, "r", encoding="utf-8") as f:
+    if os.path.exists(token_file):
+        with open(token_file, "r", encoding="utf-8") as f:
             creds_data = json.load(f)
         creds = Credentials.from_authorized_user_info(creds_data, SCOPES)
 
@@ -249,15 +514,31 @@ def authenticate_youtube():
                 creds = None
 
         if not creds or not creds.valid:
+            if not interactive:
+                return None
             flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
                 CLIENT_SECRETS_FILE, SCOPES
             )
             creds = flow.run_local_server(port=0)
 
-        with open(TOKEN_FILE, "w", encoding="utf-8") as f:
+        with open(token_file, "w", encoding="utf-8") as f:
             f.write(creds.to_json())
-
-    youtube = googleapiclient.discovery.build("youtube", "v3", credentials=creds)
+    return creds
+
+
+def build_youtube(creds: Credentials):
+    """YouTube API client on HTTP_TRANSPORT; each client has its own connections."""
+    if HTTP_TRANSPORT == "pooled":
+        http = PooledHttp(
+            creds,
+            pool_size=HTTP_POOL_SIZE,
+            keepalive=HTTP_TCP_KEEPALIVE,
+            send_buffer_bytes=HTTP_SEND_BUFFER_BYTES,
+            timeout=HTTP_TIMEOUT_SECONDS,
+        )
+        youtube = googleapiclient.discovery.build("youtube", "v3", http=http)
+    else:
+        youtube = googleapiclient.discovery.build("youtube", "v3", credentials=creds)
     return youtube
 
 
@@ -265,6 +546,32 @@ def authenticate_youtube():
 # METADATA LOOKUP
 # =========================
 
+# challenge id -> file, filled by match_video_files()
+_matched_video_files: Dict[str, Path] = {}
+
+
+def video_path_for(challenge_id: Any) -> Path:
+    matched = _matched_video_files.get(str(challenge_id))
+    if matched is not None:
+        return matched
+    return VIDEOS_DIR / f"{VIDEO_PREFIX}{challenge_id}{VIDEO_SUFFIX}"
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def match_video_files(challenge_ids: List[Any]) -> Dict[str, Any]:
+    """Match ids to files in VIDEOS_DIR in one pass; video_path_for uses the result."""
+    report = FileIndex(VIDEOS_DIR, prefixes=(VIDEO_PREFIX,)).match_all(challenge_ids)
+    _matched_video_files.clear()
+    _matched_video_files.update(report["matched"])
+    return report
+
+
 def flatten_challenges() -> List[Dict[str, Any]]:
     """Flatten all challenge arrays into one ordered list."""
     all_items: List[Dict[str, Any]] = []
@@ -338,6 +645,42 @@ def fallback_generate_description(challenge: Dict[str, Any]) -> str:
     return "\n\n".join(description)
 
 
+def resolve_title(challenge: Dict[str, Any]) -> str:
+    """Title only, without the fallback notice printed by resolve_metadata."""
+    td = get_title_description(challenge["id"])
+    return (td or {}).get("title") or fallback_generate_title(challenge)
+
+
+def resolve_metadata(challenge: Dict[str, Any]) -> Tuple[str, str, List[str]]:
+    """Title, description and tags for a challenge, with fallbacks."""
+    td = get_title_description(challenge["id"])
+    if td:
+        title = td.get("title") or fallback_generate_title(challenge)
+        description = td.get("description") or fallback_generate_description(challenge)
+        tags = td.get("tags")
+    else:
+        log.info(f"[INFO] No title/desc entry for id={challenge['id']}; using fallback.")
+        title = fallback_generate_title(challenge)
+        description = fallback_generate_description(challenge)
+        tags = None
+
+    # If tags still None, try to derive from hashtags in description
+    if tags is None:
+        tags = [w.strip("#") for w in description.split() if w.startswith("#")]
+
+    return title, description, tags
+
+
+def compile_metadata() -> Dict[str, int]:
+    """Bring METADATA_MANIFEST_FILE up to date with the catalog."""
+    return compile_manifest(
+        METADATA_MANIFEST_FILE,
+        flatten_challenges(),
+        lookup=get_title_description,
+        resolve=resolve_metadata,
+    )
+
+
 # =========================
 # FILTERING BY ID RANGE
 # =========================
@@ -382,7 +725,13 @@ def filter_challenges_by_id_range(
 # YOUTUBE HELPERS
 # =========================
 
-def get_playlist_id(youtube, playlist_name: str, override: Optional[str]) -> Optional[str]:
+@METRICS.timed("playlist_lookup")
+def get_playlist_id(
+    youtube,
+    playlist_name: str,
+    override: Optional[str],
+    cache: Optional[ListCache] = None,
+) -> Optional[str]:
     if override:
         return override
 
@@ -393,29 +742,42 @@ def get_playlist_id(youtube, playlist_name: str, override: Optional[str]) -> Opt
             maxResults=50,
         )
         while request is not None:
-            response = request.execute()
+            if cache is None:
+                METRICS.inc(QUOTA_UNITS_TOTAL, QUOTA_COSTS["playlists.list"], method="playlists.list")
+            response = cache.execute(request) if cache else request.execute()
             for pl in response.get("items", []):
                 if pl["snippet"]["title"] == playlist_name:
                     return pl["id"]
             request = youtube.playlists().list_next(request, response)
     except googleapiclient.errors.HttpError as e:
-        print(f"[ERROR] Failed to fetch playlists: {e}")
+        log.error(f"Failed to fetch playlists: {e}")
         return None
 
-    print(f"[WARN] Playlist '{playlist_name}' not found.")
+    log.warning(f"Playlist '{playlist_name}' not found.")
     return None
 
 
+@METRICS.timed("upload")
+@TRACER.traced("upload", kind=SPAN_KIND_CLIENT)
 def upload_video(
     youtube,
     file_path: str,
     title: str,
     description: str,
     tags: Optional[List[str]] = None,
+    limiter: Optional[BandwidthLimiter] = None,
+    controller: Optional[AdaptiveController] = None,
+    progress: Optional[ProgressTracker] = None,
 ) -> Optional[str]:
-    """Upload a video file as PRIVATE."""
+    """
+    Upload a video file as PRIVATE.
+
+    Each chunk is paced through `limiter`; `controller` picks the chunk size
+    and is told how long each chunk took and which ones failed. `progress`
+    gets every chunk for the batch-level status line.
+    """
     if not os.path.exists(file_path):
-        print(f"[ERROR] File not found: {file_path}")
+        log.error(f"File not found: {file_path}")
         return None
 
     body = {
@@ -434,33 +796,115 @@ def upload_video(
     if tags:
         body["snippet"]["tags"] = tags
 
-    media = MediaFileUpload(file_path, chunksize=-1, resumable=True)
+    chunk_size = controller.current_chunk_size() if controller else UPLOAD_CHUNK_SIZE
+    if UPLOAD_MEDIA_SOURCE == "mmap":
+        media = MmapMediaUpload(file_path, chunksize=chunk_size, resumable=True)
+    else:
+        media = MediaFileUpload(file_path, chunksize=chunk_size, resumable=True)
 
+    uploaded = False
+    if progress:
+        progress.start_file(file_path, media.size())
     try:
         request = youtube.videos().insert(
             part="snippet,status",
             body=body,
             media_body=media,
         )
+        METRICS.inc(QUOTA_UNITS_TOTAL, QUOTA_COSTS["videos.insert"], method="videos.insert")
         response = None
+        attempt = 0
         while response is None:
-            status, response = request.next_chunk()
-            if status:
-                print(f"    Upload progress: {int(status.progress() * 100)}%")
+            if controller and isinstance(media, MmapMediaUpload):
+                chunk_size = controller.current_chunk_size()
+                media.set_chunksize(chunk_size)
+
+            remaining = media.size() - request.resumable_progress
+            chunk = remaining if chunk_size == -1 else min(chunk_size, remaining)
+            window = limiter.acquire(chunk) if limiter else None
+
+            chunk_started = time.monotonic()
+            try:
+                with TRACER.span("upload.chunk", kind=SPAN_KIND_CLIENT, offset=request.resumable_progress, bytes=chunk):
+                    status, response = request.next_chunk()
+            except (googleapiclient.errors.HttpError, TimeoutError, ConnectionError) as e:
+                attempt += 1
+                if not _retryable(e) or attempt > UPLOAD_CHUNK_RETRIES:
+                    raise
+                _wait_before_retry(e, attempt, controller)
+                continue
+            attempt = 0
+            chunk_seconds = time.monotonic() - chunk_started
+            if limiter:
+                limiter.record_sent(window, chunk)
+            METRICS.observe(CHUNK_SECONDS, chunk_seconds)
+            METRICS.inc(BYTES_TOTAL, chunk)
+            METRICS.inc(CHUNKS_TOTAL)
+            if controller:
+                controller.record_chunk(chunk, chunk_seconds)
+            if progress:
+                progress.advance(file_path, chunk)
+            elif status:
+                log.info(f"    Upload progress: {int(status.progress() * 100)}%")
 
         vid = response.get("id")
-        print(f"[OK] Uploaded video ID: {vid}")
+        log.info(f"[OK] Uploaded video ID: {vid}")
+        uploaded = True
         return vid
     except googleapiclient.errors.HttpError as e:
-        print(f"[ERROR] Failed to upload {file_path}: {e}")
+        METRICS.inc(API_ERRORS_TOTAL, phase="upload", status=e.resp.status)
+        if controller and e.resp.status >= 500:
+            controller.record_error()
+        log.error(f"Failed to upload {file_path}: {e}")
         return None
-
-
-def add_to_playlist(youtube, video_id: str, playlist_id: Optional[str]) -> bool:
+    except (TimeoutError, ConnectionError) as e:
+        METRICS.inc(API_ERRORS_TOTAL, phase="upload", status="network")
+        if controller:
+            controller.record_error()
+        log.error(f"Network error uploading {file_path}: {e}")
+        return None
+    finally:
+        if progress:
+            progress.finish_file(file_path, uploaded)
+        if isinstance(media, MmapMediaUpload):
+            media.close()
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, googleapiclient.errors.HttpError):
+        return error.resp.status >= 500
+    return True
+
+
+def _wait_before_retry(error: Exception, attempt: int, controller: Optional[AdaptiveController]) -> None:
+    """Count a failed chunk and back off before re-sending it, inside an upload.retry span."""
+    status = error.resp.status if isinstance(error, googleapiclient.errors.HttpError) else "network"
+    METRICS.inc(API_ERRORS_TOTAL, phase="upload", status=status)
+    if controller:
+        controller.record_error()
+    delay = UPLOAD_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+    log.warning(f"Upload chunk failed ({status}); retry {attempt}/{UPLOAD_CHUNK_RETRIES} in {delay:.1f}s")
+    with TRACER.span("upload.retry", attempt=attempt, status=str(status), delay_seconds=round(delay, 2)):
+        time.sleep(delay)
+
+
+@METRICS.timed("playlist_insert")
+@TRACER.traced("playlist.insert", kind=SPAN_KIND_CLIENT)
+def add_to_playlist(
+    youtube,
+    video_id: str,
+    playlist_id: Optional[str],
+    index: Optional[PlaylistIndex] = None,
+) -> bool:
+    """Insert a video into the playlist; with an index, skip it when already there."""
     if not playlist_id:
-        print("[WARN] No playlist ID; skipping playlist add.")
+        log.warning("No playlist ID; skipping playlist add.")
         return False
 
+    if index and not index.claim(playlist_id, video_id):
+        log.info(f"⏭️  Video {video_id} already in playlist {playlist_id}, skipping insert.")
+        return True
+
     body = {
         "snippet": {
             "playlistId": playlist_id,
@@ -471,18 +915,27 @@ def add_to_playlist(youtube, video_id: str, playlist_id: Optional[str]) -> bool:
         }
     }
 
+    item_id = None
     try:
-        youtube.playlistItems().insert(
+        METRICS.inc(QUOTA_UNITS_TOTAL, QUOTA_COSTS["playlistItems.insert"], method="playlistItems.insert")
+        response = youtube.playlistItems().insert(
             part="snippet",
             body=body,
         ).execute()
-        print(f"[OK] Added to playlist: {playlist_id}")
+        item_id = response.get("id", "")
+        log.info(f"[OK] Added to playlist: {playlist_id}")
         return True
     except googleapiclient.errors.HttpError as e:
-        print(f"[ERROR] Failed to add to playlist: {e}")
+        METRICS.inc(API_ERRORS_TOTAL, phase="playlist_insert", status=e.resp.status)
+        log.error(f"Failed to add to playlist: {e}")
         return False
+    finally:
+        if index:
+            index.release(playlist_id, video_id, item_id)
 
 
+@METRICS.timed("schedule")
+@TRACER.traced("schedule", kind=SPAN_KIND_CLIENT)
 def schedule_video_publication(
     youtube,
     video_id: str,
@@ -505,17 +958,19 @@ def schedule_video_publication(
     }
 
     try:
+        METRICS.inc(QUOTA_UNITS_TOTAL, QUOTA_COSTS["videos.update"], method="videos.update")
         youtube.videos().update(
             part="status",
             body=body,
         ).execute()
-        print(
+        log.info(
             f"[OK] Scheduled publish at local {publish_time_local} "
             f"(UTC {publish_time_utc})"
         )
         return True
     except googleapiclient.errors.HttpError as e:
-        print(f"[ERROR] Failed to schedule {video_id}: {e}")
+        METRICS.inc(API_ERRORS_TOTAL, phase="schedule", status=e.resp.status)
+        log.error(f"Failed to schedule {video_id}: {e}")
         return False
 
 
@@ -554,30 +1009,438 @@ def calculate_publish_time_for_index(
 
 
 # =========================
-# MAIN WORKFLOW
+# PARALLEL UPLOADS
 # =========================
 
-def main_upload_workflow():
-    print("🔐 Authenticating with YouTube API...")
-    youtube = authenticate_youtube()
-    print("✅ Authentication successful.")
-
-    channel_cfg = CHANNELS[ACTIVE_CHANNEL]
+class UploadRun:
+    """
+    Uploads the pending challenges of one run with a pool of worker threads.
 
-    print(f"📺 Active channel profile: {ACTIVE_CHANNEL}")
-    print(f"🎵 Playlist name: {channel_cfg['playlist_name']}")
+    Each challenge pulled from the backlog (catalog order) gets its publish
+    slot immediately; workers then take jobs from a DeadlineQueue, earliest
+    publishAt first. With an AdaptiveController the number of concurrent
+    uploads follows controller.workers; otherwise UPLOAD_WORKERS threads run.
+    Channel state, calendar and queue are only touched under `_lock`.
+    """
 
-    playlist_id = None
-    if not DRY_RUN:
-        playlist_id = get_playlist_id(
-            youtube,
-            channel_cfg["playlist_name"],
-            channel_cfg.get("playlist_id_override"),
+    def __init__(
+        self,
+        youtube,
+        channel_cfg: Dict[str, Any],
+        playlist_id: Optional[str],
+        full_state: Dict[str, Any],
+        channel_state: Dict[str, Any],
+        schedule: ChannelSchedule,
+        all_challenges: List[Dict[str, Any]],
+        pending: List[Dict[str, Any]],
+        limiter: Optional[BandwidthLimiter] = None,
+        controller: Optional[AdaptiveController] = None,
+        prefetcher: Optional[Prefetcher] = None,
+        mirror: Optional[ChannelMirror] = None,
+        playlist_index: Optional[PlaylistIndex] = None,
+        metadata: Optional[Dict[str, Dict[str, Any]]] = None,
+        progress: Optional[ProgressTracker] = None,
+    ):
+        self.youtube = youtube
+        self.channel_cfg = channel_cfg
+        self.playlist_id = playlist_id
+        self.full_state = full_state
+        self.channel_state = channel_state
+        self.schedule = schedule
+        self.limiter = limiter
+        self.controller = controller
+        self.prefetcher = prefetcher
+        self.mirror = mirror
+        self.playlist_index = playlist_index
+        self.metadata = metadata or {}
+        self.progress = progress
+
+        self.uploads_this_run = 0
+        self.errors = 0
+        self.deferred = 0
+        self._held: List[str] = []   # deferred or failed this run; resume must not skip them
+
+        self._backlog = deque(pending)
+        self._queue = DeadlineQueue(
+            throughput_bps=EXPECTED_UPLOAD_BPS,
+            escalation_seconds=DEADLINE_ESCALATION_SECONDS,
+            safety_margin_seconds=DEADLINE_SAFETY_MARGIN_SECONDS,
         )
-        if playlist_id:
-            print(f"✅ Using playlist ID: {playlist_id}")
+        self._in_flight = 0
+        self._limit_reported = False
+        self._lock = threading.Condition()
+        self._positions = {str(c["id"]): i for i, c in enumerate(all_challenges)}
+        self._not_before = earliest_publish_date(channel_cfg)
+        self._started = time.time()
+        self._quota_spent_before = quota_spent_today()   # by earlier runs since the reset
+
+    def execute(self) -> None:
+        if self.controller:
+            num_threads = self.controller.max_workers
+        else:
+            num_threads = UPLOAD_WORKERS
+        threads = [
+            threading.Thread(target=self._worker, name=f"upload-{n}", daemon=True)
+            for n in range(max(1, num_threads))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self._cap_resume_point()
+
+    def save_state(self) -> None:
+        with self._lock:
+            self.full_state[ACTIVE_CHANNEL] = self.channel_state
+            save_full_state(self.full_state)
+
+    # ---- workers ----
+
+    def _worker(self) -> None:
+        while True:
+            if self.controller:
+                self.controller.acquire_slot()
+            try:
+                job = self._next_job()
+                if job is None:
+                    return
+                try:
+                    ok = self._traced_process(job)
+                except Exception as e:  # keep the other workers going
+                    log.error(f"Challenge id={job['challenge']['id']} failed: {e}")
+                    ok = False
+                if not ok:
+                    self._free_slot(job["deadline"])
+                self._finish_job(job, ok)
+            finally:
+                if self.controller:
+                    self.controller.release_slot()
+
+    def _next_job(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            while True:
+                self._refill()
+                if not self._queue and not self._backlog:
+                    return None
+                if self._queue and self.uploads_this_run + self._in_flight < MAX_UPLOADS_PER_RUN:
+                    self._in_flight += 1
+                    return self._ensure_reachable(self._queue.pop())
+                if self._in_flight == 0:
+                    if not self._limit_reported:
+                        log.info("🚦 Reached MAX_UPLOADS_PER_RUN limit, stopping this session.")
+                        self._limit_reported = True
+                    return None
+                # Uploads in flight may still fail and free up room under the limit.
+                self._lock.wait()
+
+    def _upcoming_paths(self, limit: int) -> List[str]:
+        """Files of the next `limit` uploads in the order workers will take them."""
+        with self._lock:
+            jobs = self._queue.upcoming(limit)
+            challenges = [j["challenge"] for j in jobs]
+            # Refills take the backlog in order, behind what is queued
+            challenges += list(itertools.islice(self._backlog, max(0, limit - len(jobs))))
+        return [str(video_path_for(ch["id"])) for ch in challenges]
+
+    def _make_job(self, ch: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            size = video_path_for(ch["id"]).stat().st_size
+        except OSError:
+            size = 0
+        return {
+            "challenge": ch,
+            "deadline": self.schedule.allocate(not_before=self._not_before),
+            "size": size,
+            "queued_ns": time.time_ns(),
+        }
+
+    def _refill(self) -> None:
+        """Give slots to backlog challenges until the run limit is covered (lock held)."""
+        wanted = MAX_UPLOADS_PER_RUN - self.uploads_this_run - self._in_flight - len(self._queue)
+        jobs = []
+        while wanted > 0 and self._backlog:
+            jobs.append(self._make_job(self._backlog.popleft()))
+            wanted -= 1
+        if not jobs:
+            return
+
+        if DEADLINE_BIN_PACKING:
+            budget = None
+            if RUN_TIME_BUDGET_SECONDS is not None:
+                budget = RUN_TIME_BUDGET_SECONDS - (time.time() - self._started)
+            attempted = self.uploads_this_run + self.errors + self._in_flight + len(self._queue)
+            jobs, deferred = select_on_time(
+                jobs,
+                throughput_bps=self._queue.throughput_bps,
+                now=time.time(),
+                time_budget_seconds=budget,
+                max_jobs=max(0, (DAILY_QUOTA_UNITS - self._quota_spent_before) // QUOTA_COST_PER_UPLOAD
+                             - attempted),
+            )
+            for job in deferred:
+                self.schedule.free(job["deadline"])
+                self.deferred += 1
+                self._held.append(str(job["challenge"]["id"]))
+                log.info(f"⏭️  Challenge id={job['challenge']['id']} deferred: "
+                         "would miss its slot in this run's time/quota window.")
+
+        for job in jobs:
+            self._queue.push(job)
+
+    def _ensure_reachable(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Move a job whose slot can no longer be met to the next free slot (lock held)."""
+        if self._queue.latest_start(job) < time.time():
+            old = job["deadline"]
+            self.schedule.free(old)
+            job["deadline"] = self.schedule.allocate(not_before=max(self._not_before, old.date()))
+            log.warning(f"Challenge id={job['challenge']['id']} cannot make {old}; "
+                        f"moved to {job['deadline']}")
+        return job
+
+    def _record_throughput(self, num_bytes: int, seconds: float) -> None:
+        if num_bytes <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            estimate = 0.7 * self._queue.throughput_bps + 0.3 * (num_bytes / seconds)
+            self._queue.update_throughput(estimate)
+
+    def _finish_job(self, job: Dict[str, Any], ok: bool) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if ok:
+                self.uploads_this_run += 1
+            else:
+                self.errors += 1
+                self._held.append(str(job["challenge"]["id"]))
+            self._lock.notify_all()
+
+    def _cap_resume_point(self) -> None:
+        """
+        Keep last_uploaded_challenge_id before the earliest deferred or failed challenge.
+
+        Uploads finish out of catalog order, so a later challenge can advance the
+        resume point past one that was deferred or failed; the next run resumes
+        after last_uploaded_challenge_id and would never pick it up again.
+        Challenges after the cap that did upload are skipped as already uploaded.
+        """
+        with self._lock:
+            held = [self._positions[cid] for cid in self._held if cid in self._positions]
+            last = self.channel_state.get("last_uploaded_challenge_id")
+            if not held or last is None or self._positions.get(str(last), -1) < min(held):
+                return
+            by_position = {i: cid for cid, i in self._positions.items()}
+            capped = by_position.get(min(held) - 1)
+            self.channel_state["last_uploaded_challenge_id"] = capped
+            log.info(f"↩️  Resume point kept at challenge id={capped} so deferred/failed "
+                     "challenges are retried next run.")
+
+    def _free_slot(self, slot: datetime) -> None:
+        with self._lock:
+            self.schedule.free(slot)
+
+    def _record_upload(
+        self,
+        cid_str: str,
+        video_id: str,
+        title: str,
+        publish_at: Optional[datetime] = None,
+        meta_hash: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self.channel_state["uploaded"][cid_str] = video_id
+            if meta_hash is not None:
+                self.channel_state.setdefault("metadata_hash", {})[cid_str] = meta_hash
+            if publish_at is not None:
+                self.channel_state.setdefault("publish_at", {})[cid_str] = publish_at.isoformat()
+            if self.mirror and not DRY_RUN:
+                self.mirror.add_video(video_id, title, publish_at)
+            last = self.channel_state.get("last_uploaded_challenge_id")
+            if last is None or self._positions.get(cid_str, -1) > self._positions.get(str(last), -1):
+                self.channel_state["last_uploaded_challenge_id"] = cid_str
+
+    # ---- one challenge ----
+
+    def _traced_process(self, job: Dict[str, Any]) -> bool:
+        """_process inside the challenge's root span (one trace per video) and log context."""
+        with bind(challenge_id=str(job["challenge"]["id"])), TRACER.span(
+            "challenge",
+            new_trace=True,
+            start_ns=job["queued_ns"],
+            **{"challenge.id": str(job["challenge"]["id"]), "file.size": job["size"],
+               "publish_at": job["deadline"].isoformat(), "channel": ACTIVE_CHANNEL},
+        ) as span:
+            TRACER.record("queue.wait", job["queued_ns"], time.time_ns())
+            ok = self._process(job)
+            if not ok:
+                span.set_error("challenge failed")
+            return ok
+
+    def _process(self, job: Dict[str, Any]) -> bool:
+        ch = job["challenge"]
+        cid_str = str(ch["id"])
+        entry = self.metadata.get(cid_str)
+        if entry:
+            title, description, tags = entry["title"], entry["description"], entry["tags"]
         else:
-            print("[WARN] No playlist found; continuing without playlist add.")
+            title, description, tags = resolve_metadata(ch)
+
+        # File path
+        video_file = video_path_for(cid_str)
+
+        log.info("-" * 60)
+        log.info(f"🎬 Processing challenge id={cid_str}")
+        log.info(f"    File: {video_file}")
+        log.info(f"    Title: {title}")
+
+        if DRY_RUN:
+            log.info("💡 [DRY RUN] Skipping upload, playlist add, and scheduling.")
+            self._record_upload(cid_str, f"dry_{cid_str}", title)
+            return True
+
+        if self.prefetcher:
+            self.prefetcher.advance(str(video_file), self._upcoming_paths(self.prefetcher.max_files))
+
+        # Upload
+        set_context(phase="upload")
+        upload_started = time.monotonic()
+        video_id = None
+        try:
+            video_id = upload_video(
+                youtube=self.youtube,
+                file_path=str(video_file),
+                title=title,
+                description=description,
+                tags=tags,
+                limiter=self.limiter,
+                controller=self.controller,
+                progress=self.progress,
+            )
+        finally:
+            if self.prefetcher:
+                self.prefetcher.finish(str(video_file), uploaded=bool(video_id))
+
+        if not video_id:
+            return False
+
+        upload_seconds = time.monotonic() - upload_started
+        self._record_throughput(job["size"], upload_seconds)
+        if self.prefetcher:
+            self.prefetcher.record_upload(job["size"], upload_seconds)
+
+        # Add to playlist (best effort)
+        set_context(video_id=video_id, phase="playlist")
+        add_to_playlist(self.youtube, video_id, self.playlist_id, self.playlist_index)
+
+        # Slot booked for this job when it was queued
+        publish_time_local = job["deadline"]
+
+        # Schedule
+        set_context(phase="schedule")
+        ok = schedule_video_publication(
+            youtube=self.youtube,
+            video_id=video_id,
+            publish_time_local=publish_time_local,
+        )
+
+        if not ok:
+            return False
+
+        # Update state and persist after each successful schedule
+        set_context(phase="state")
+        self._record_upload(
+            cid_str, video_id, title, publish_time_local,
+            meta_hash=metadata_hash(title, description, tags),
+        )
+        self.save_state()
+        return True
+
+
+def build_slot_calendar(full_state: Dict[str, Any]) -> SlotCalendar:
+    """Slot calendar holding every recorded booking of every configured channel."""
+    calendar = SlotCalendar()
+    for name, cfg in CHANNELS.items():
+        schedule = calendar.add_channel(name, cfg)
+        ch_state = full_state.get(name, {})
+        # challenge id -> ISO publish time, or None if its video holds no slot
+        publish_at: Dict[str, Optional[str]] = ch_state.get("publish_at", {})
+
+        for iso in publish_at.values():
+            if iso:
+                schedule.reserve(datetime.fromisoformat(iso))
+
+        # Uploads recorded before publish times were kept in state (and never
+        # synced from the channel) were scheduled one per day from
+        # schedule_start_date, in upload order.
+        legacy = [cid for cid in ch_state.get("uploaded", {}) if cid not in publish_at]
+        for i in range(len(legacy)):
+            schedule.reserve_day(cfg["schedule_start_date"] + timedelta(days=i))
+    return calendar
+
+
+def earliest_publish_date(channel_cfg: Dict[str, Any]) -> date:
+    """First day new uploads may be scheduled on (tomorrow, channel time)."""
+    today = datetime.now(channel_cfg["timezone"]).date()
+    return max(channel_cfg["schedule_start_date"], today + timedelta(days=1))
+
+
+def make_progress(sizes: List[int]) -> Tuple[ProgressTracker, Optional[JsonLinesSink]]:
+    """Tracker for a batch of files; returns it with the JSON sink to close afterwards."""
+    sinks = [lambda snap: log.info(status_line(snap))]
+    json_sink = None
+    if PROGRESS_JSON_FILE == "-":
+        json_sink = JsonLinesSink(sys.stderr)
+    elif PROGRESS_JSON_FILE:
+        os.makedirs(os.path.dirname(PROGRESS_JSON_FILE) or ".", exist_ok=True)
+        json_sink = JsonLinesSink(open(PROGRESS_JSON_FILE, "a", encoding="utf-8"), owns_stream=True)
+    if json_sink:
+        sinks.append(json_sink)
+    tracker = ProgressTracker(
+        total_bytes=sum(sizes),
+        total_files=len(sizes),
+        sinks=sinks,
+        interval_seconds=PROGRESS_INTERVAL_SECONDS,
+    )
+    return tracker, json_sink
+
+
+def export_metrics(run_name: str, list_cache: Optional[ListCache] = None) -> None:
+    """Write the run's metrics to METRICS_TEXTFILE / METRICS_SUMMARY_DIR."""
+    if list_cache:
+        # Cache hits cost nothing; misses and 304 revalidations cost 1 unit each
+        METRICS.inc(QUOTA_UNITS_TOTAL, list_cache.stats["misses"] + list_cache.stats["not_modified"],
+                    method="list")
+    try:
+        if METRICS_TEXTFILE:
+            METRICS.write_textfile(METRICS_TEXTFILE)
+        if METRICS_SUMMARY_DIR:
+            path = METRICS.write_summary(METRICS_SUMMARY_DIR, run_name)
+            log.info(f"📈 Metrics summary: {path}")
+    except OSError as e:
+        log.warning(f"Could not write metrics: {e}")
+
+
+def quota_spent_today() -> int:
+    """Quota units earlier runs recorded in METRICS_SUMMARY_DIR since the quota reset."""
+    if not METRICS_SUMMARY_DIR:
+        return 0
+    day_start = datetime.now(QUOTA_RESET_TZ).replace(hour=0, minute=0, second=0, microsecond=0)
+    return quota_spent_since(METRICS_SUMMARY_DIR, day_start.timestamp())
+
+
+# =========================
+# MAIN WORKFLOW
+# =========================
+
+def prepare_local() -> Optional[Dict[str, Any]]:
+    """
+    The part of a run that needs no network: state, id range, file matching,
+    compiled metadata and pre-flight checks. Items failing pre-flight are
+    dropped here, before authentication or any quota is spent.
+    """
+    channel_cfg = CHANNELS[ACTIVE_CHANNEL]
+
+    log.info(f"📺 Active channel profile: {ACTIVE_CHANNEL}")
+    log.info(f"🎵 Playlist name: {channel_cfg['playlist_name']}")
 
     # Load state
     full_state = load_full_state()
@@ -586,8 +1449,8 @@ def main_upload_workflow():
     # Flatten challenges in the order of arrays
     all_challenges = flatten_challenges()
     if not all_challenges:
-        print("[ERROR] No challenges defined in CHALLENGE_ARRAYS.")
-        return
+        log.error("No challenges defined in CHALLENGE_ARRAYS.")
+        return None
 
     # Decide start_from_id based on config or state
     if START_FROM_ID is not None:
@@ -606,115 +1469,997 @@ def main_upload_workflow():
         start_is_last_uploaded=start_is_last_uploaded,
     )
 
-    print(f"📦 Total challenges available: {len(all_challenges)}")
-    print(f"🎯 Challenges to process this run: {len(filtered_challenges)}")
+    log.info(f"📦 Total challenges available: {len(all_challenges)}")
+    log.info(f"🎯 Challenges to process this run: {len(filtered_challenges)}")
+
+    if FILE_MATCHING:
+        report = match_video_files([c["id"] for c in all_challenges])
+        run_ids = {str(c["id"]) for c in filtered_challenges}
+        unmatched = [k for k in report["unmatched"] + list(report["ambiguous"]) if k in run_ids]
+        log.info(f"🗂️  Matched {len(report['matched'])} file(s) to challenges; "
+                 f"{len(unmatched)} of this run unmatched, {len(report['orphans'])} orphan file(s).")
+        for key, candidates in report["unconfirmed"].items():
+            if key in run_ids:
+                log.warning(f"Challenge id={key} has no file of its own; not using "
+                            f"{', '.join(p.name for p in candidates)} (see match-files).")
+
+    counts = compile_metadata()
+    log.info(f"🧾 Metadata manifest: {counts['entries']} entries "
+             f"({counts['compiled']} compiled, {counts['reused']} unchanged, {counts['invalid']} invalid).")
+    metadata = load_manifest(METADATA_MANIFEST_FILE, [str(c["id"]) for c in filtered_challenges])
 
     already_uploaded_map: Dict[str, str] = channel_state.get("uploaded", {})
-    total_uploaded_before = len(already_uploaded_map)
-
-    uploads_this_run = 0
-    errors = 0
+    candidates: List[Dict[str, Any]] = []
     skipped = 0
-
+    invalid = 0
     for ch in filtered_challenges:
-        if uploads_this_run >= MAX_UPLOADS_PER_RUN:
-            print("🚦 Reached MAX_UPLOADS_PER_RUN limit, stopping this session.")
-            break
-
         cid_str = str(ch["id"])
-
         if cid_str in already_uploaded_map:
-            print(f"⏭️  Challenge id={cid_str} already uploaded, skipping.")
+            log.info(f"⏭️  Challenge id={cid_str} already uploaded, skipping.")
             skipped += 1
             continue
+        entry = metadata.get(cid_str)
+        if entry and entry["errors"]:
+            log.error(f"Challenge id={cid_str} has invalid metadata, skipping: {'; '.join(entry['errors'])}")
+            invalid += 1
+            continue
+        candidates.append(ch)
 
-        # Lookup metadata
-        td = get_title_description(ch["id"])
-        if td:
-            title = td.get("title") or fallback_generate_title(ch)
-            description = td.get("description") or fallback_generate_description(ch)
-            tags = td.get("tags")
+    failed: Dict[str, List[str]] = {}
+    if PREFLIGHT_ENABLED and not DRY_RUN and candidates:
+        failed = run_preflight(
+            [(str(c["id"]), video_path_for(c["id"])) for c in candidates],
+            max_workers=PREFLIGHT_WORKERS,
+        )
+        if failed:
+            log.error(f"Pre-flight: {len(failed)} of {len(candidates)} item(s) dropped from this run:")
+            for cid_str, problems in failed.items():
+                log.info(f"    id={cid_str}: {'; '.join(problems)}")
         else:
-            print(f"[INFO] No title/desc entry for id={cid_str}; using fallback.")
-            title = fallback_generate_title(ch)
-            description = fallback_generate_description(ch)
-            tags = None
+            log.info(f"✅ Pre-flight: all {len(candidates)} item(s) OK.")
+        candidates = [c for c in candidates if str(c["id"]) not in failed]
+
+    return {
+        "channel_cfg": channel_cfg,
+        "full_state": full_state,
+        "channel_state": channel_state,
+        "all_challenges": all_challenges,
+        "candidates": candidates,
+        "metadata": metadata,
+        "skipped": skipped,
+        "invalid": invalid,
+        "preflight_failed": len(failed),
+        "total_uploaded_before": len(already_uploaded_map),
+    }
 
-        # If tags still None, try to derive from hashtags in description
-        if tags is None:
-            tags = [w.strip("#") for w in description.split() if w.startswith("#")]
 
-        # File path
-        video_file = VIDEOS_DIR / f"{VIDEO_PREFIX}{cid_str}{VIDEO_SUFFIX}"
+def prepare_run(youtube, ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The networked part of a run: playlist, channel sync, mirror and the
+    final pending list (candidates not already on the channel). Shared by
+    the upload workflow and `plan`; fills in and returns `ctx`. Only reads
+    from YouTube: videos found on the channel are returned as
+    ctx["duplicates"] for record_duplicates().
+    """
+    channel_cfg = ctx["channel_cfg"]
+    channel_state = ctx["channel_state"]
+    metadata = ctx["metadata"]
 
-        print("-" * 60)
-        print(f"🎬 Processing challenge id={cid_str}")
-        print(f"    File: {video_file}")
-        print(f"    Title: {title}")
+    list_cache = open_list_cache()
 
-        if DRY_RUN:
-            print("💡 [DRY RUN] Skipping upload, playlist add, and scheduling.")
-            fake_video_id = f"dry_{cid_str}"
-            channel_state["uploaded"][cid_str] = fake_video_id
-            channel_state["last_uploaded_challenge_id"] = cid_str
-            uploads_this_run += 1
+    playlist_id = None
+    if not DRY_RUN:
+        playlist_id = get_playlist_id(
+            youtube,
+            channel_cfg["playlist_name"],
+            channel_cfg.get("playlist_id_override"),
+            cache=list_cache,
+        )
+        if playlist_id:
+            log.info(f"✅ Using playlist ID: {playlist_id}")
+        else:
+            log.warning("No playlist found; continuing without playlist add.")
+
+    if SYNC_SCHEDULE_FROM_CHANNEL and not DRY_RUN and channel_state.get("uploaded"):
+        log.info("🔄 Syncing publish times from channel...")
+        counts = sync_publish_times(youtube, channel_state, channel_cfg["timezone"])
+        if counts:
+            log.info(
+                f"✅ Channel holds {counts['scheduled']} scheduled / {counts['published']} published; "
+                f"{counts['free']} recorded uploads hold no slot, {counts['moved']} moved in Studio."
+            )
+
+    mirror = None
+    if MIRROR_ENABLED and not DRY_RUN:
+        mirror = ChannelMirror(MIRROR_FILE, ACTIVE_CHANNEL, cache=list_cache)
+        try:
+            counts = mirror.refresh(youtube, [playlist_id] if playlist_id else [])
+            mirror.save()
+            log.info(f"🪞 Channel mirror: {len(mirror.videos)} videos ({counts['new_videos']} new, "
+                     f"{counts['pages']} page(s) read).")
+        except googleapiclient.errors.HttpError as e:
+            log.warning(f"Could not refresh channel mirror, using cached copy: {e}")
+
+    playlist_index = None
+    if playlist_id:
+        playlist_index = PlaylistIndex(mirror=mirror)
+        try:
+            members = playlist_index.load(youtube, playlist_id, cache=list_cache)
+            log.info(f"📋 Playlist holds {members} video(s).")
+        except googleapiclient.errors.HttpError as e:
+            log.warning(f"Could not list playlist items; inserting without membership check: {e}")
+            playlist_index = None
+
+    # Videos on the channel with a candidate's title, not yet recorded for any
+    # challenge: uploaded before but never recorded (e.g. crash before state save).
+    recorded = set(channel_state["uploaded"].values())
+    titles = {}
+    for ch in ctx["candidates"]:
+        entry = metadata.get(str(ch["id"]))
+        titles[str(ch["id"])] = entry["title"] if entry else resolve_title(ch)
+    matches = {
+        cid: [v for v in mirror.find_by_title(title) if v not in recorded]
+        for cid, title in titles.items()
+    } if mirror else {}
+    live = set()
+    if any(matches.values()):
+        # The mirror never sees deletions; check matches before trusting them.
+        matched_ids = {v for vids in matches.values() for v in vids}
+        try:
+            statuses = fetch_video_statuses(youtube, matched_ids, fields=RECONCILE_FIELDS)
+            live = {v for v in matched_ids if classify(v, statuses.get(v)) == LIVE}
+            for vid in matched_ids - live:
+                mirror.remove_video(vid)
+            mirror.save()
+        except googleapiclient.errors.HttpError as e:
+            log.warning(f"Could not verify title matches on the channel; uploading those challenges: {e}")
+
+    pending: List[Dict[str, Any]] = []
+    duplicates: Dict[str, str] = {}
+    for ch in ctx["candidates"]:
+        cid_str = str(ch["id"])
+        existing = [v for v in matches.get(cid_str, []) if v in live and v not in recorded]
+        if existing:
+            log.info(f"⏭️  Challenge id={cid_str} already on channel as {existing[0]}.")
+            duplicates[cid_str] = existing[0]
+            recorded.add(existing[0])   # one video never stands for two challenges
             continue
+        pending.append(ch)
+
+    ctx.update({
+        "list_cache": list_cache,
+        "playlist_id": playlist_id,
+        "pending": pending,
+        "mirror": mirror,
+        "playlist_index": playlist_index,
+        "duplicates": duplicates,
+    })
+    return ctx
+
+
+def record_duplicates(youtube, ctx: Dict[str, Any]) -> None:
+    """Record videos prepare_run found on the channel and add missing ones to the playlist."""
+    channel_state = ctx["channel_state"]
+    playlist_id, playlist_index = ctx["playlist_id"], ctx["playlist_index"]
+    for cid_str, video_id in ctx["duplicates"].items():
+        channel_state["uploaded"][cid_str] = video_id
+        if playlist_index and not playlist_index.contains(playlist_id, video_id):
+            add_to_playlist(youtube, video_id, playlist_id, playlist_index)
+    if ctx["duplicates"]:
+        ctx["full_state"][ACTIVE_CHANNEL] = channel_state
+        save_full_state(ctx["full_state"])
 
-        # Upload
-        video_id = upload_video(
-            youtube=youtube,
-            file_path=str(video_file),
-            title=title,
-            description=description,
-            tags=tags,
+
+def main_upload_workflow():
+    TRACER.configure(TRACE_FILE)
+    ctx = prepare_local()
+    PROFILER.checkpoint("prepare_local")
+    if ctx is None:
+        return
+    if not ctx["candidates"]:
+        log.info("Nothing to upload this run.")
+        return
+
+    log.info("🔐 Authenticating with YouTube API...")
+    youtube = authenticate_youtube()
+    log.info("✅ Authentication successful.")
+    PROFILER.checkpoint("auth")
+
+    prepare_run(youtube, ctx)
+    PROFILER.checkpoint("prepare_run")
+    record_duplicates(youtube, ctx)
+    channel_cfg = ctx["channel_cfg"]
+    channel_state = ctx["channel_state"]
+    all_challenges = ctx["all_challenges"]
+    pending = ctx["pending"]
+    mirror = ctx["mirror"]
+
+    limiter = BandwidthLimiter(BANDWIDTH_LIMIT_BPS, BANDWIDTH_WINDOWS)
+
+    controller = None
+    if ADAPTIVE_TUNING:
+        max_workers = ADAPTIVE_MAX_WORKERS
+        if HTTP_TRANSPORT != "pooled":
+            log.warning("httplib2 transport is not thread-safe; uploading with one worker.")
+            max_workers = 1
+        controller = AdaptiveController(
+            min_workers=1,
+            max_workers=max_workers,
+            initial_workers=1,
+            min_chunk_bytes=ADAPTIVE_MIN_CHUNK_SIZE,
+            max_chunk_bytes=ADAPTIVE_MAX_CHUNK_SIZE,
+            initial_chunk_bytes=UPLOAD_CHUNK_SIZE if UPLOAD_CHUNK_SIZE > 0 else ADAPTIVE_MAX_CHUNK_SIZE,
+            interval_seconds=ADAPTIVE_INTERVAL_SECONDS,
         )
 
-        if not video_id:
-            errors += 1
+    batch = pending[:MAX_UPLOADS_PER_RUN]
+    progress, progress_sink = make_progress([_file_size(video_path_for(c["id"])) for c in batch])
+
+    prefetcher = None
+    if PREFETCH_ENABLED and not DRY_RUN:
+        # Fed the run's queue order as uploads start (UploadRun._upcoming_paths)
+        prefetcher = Prefetcher(
+            horizon_seconds=PREFETCH_HORIZON_SECONDS,
+            max_files=PREFETCH_MAX_FILES,
+            memory_fraction=PREFETCH_MEMORY_FRACTION,
+        )
+
+    run = UploadRun(
+        youtube=youtube,
+        channel_cfg=channel_cfg,
+        playlist_id=ctx["playlist_id"],
+        full_state=ctx["full_state"],
+        channel_state=channel_state,
+        schedule=build_slot_calendar(ctx["full_state"])[ACTIVE_CHANNEL],
+        all_challenges=all_challenges,
+        pending=pending,
+        limiter=limiter,
+        controller=controller,
+        prefetcher=prefetcher,
+        mirror=mirror,
+        playlist_index=ctx["playlist_index"],
+        metadata=ctx["metadata"],
+        progress=progress,
+    )
+    run.execute()
+    PROFILER.checkpoint("upload")
+    if progress_sink:
+        progress_sink.close()
+
+    if mirror:
+        mirror.save()
+
+    if prefetcher:
+        prefetcher.stop()
+
+    # Final state save
+    run.save_state()
+    PROFILER.checkpoint("state_save")
+
+    log.info("=" * 60)
+    log.info("UPLOAD SUMMARY")
+    log.info(f"Channel profile: {ACTIVE_CHANNEL}")
+    log.info(f"Total challenges defined: {len(all_challenges)}")
+    log.info(f"Total uploaded before this run: {ctx['total_uploaded_before']}")
+    log.info(f"Uploaded this run: {run.uploads_this_run}")
+    log.info(f"Skipped (already uploaded): {ctx['skipped']}")
+    if ctx["duplicates"]:
+        log.info(f"Found on channel, recorded without upload: {len(ctx['duplicates'])}")
+    log.info(f"Errors: {run.errors}")
+    if ctx["invalid"]:
+        log.info(f"Skipped (invalid metadata): {ctx['invalid']}")
+    if ctx["preflight_failed"]:
+        log.info(f"Dropped by pre-flight checks: {ctx['preflight_failed']}")
+    if run.deferred:
+        log.info(f"Deferred (would miss publish slot): {run.deferred}")
+    log.info(f"Last uploaded challenge id: {channel_state.get('last_uploaded_challenge_id')}")
+    for line in limiter.report():
+        log.info(f"Bandwidth {line}")
+    if controller:
+        log.info(f"Final tuning: {controller.workers} worker(s), "
+                 f"{controller.chunk_bytes // 1024} KiB chunks, {len(controller.decisions)} decision(s)")
+    log.info("=" * 60)
+    export_metrics("upload", ctx["list_cache"])
+
+
+# =========================
+# PLAN / APPLY
+# =========================
+
+def plan_workflow(path: str, limit: Optional[int] = None) -> None:
+    """Decide the next batch (files, metadata, slots, quota) and write it to a plan file."""
+    ctx = prepare_local()
+    if ctx is None:
+        return
+
+    log.info("🔐 Authenticating with YouTube API...")
+    youtube = authenticate_youtube()
+    prepare_run(youtube, ctx)
+    channel_cfg = ctx["channel_cfg"]
+    playlist_id = ctx["playlist_id"]
+    schedule = build_slot_calendar(ctx["full_state"])[ACTIVE_CHANNEL]
+    not_before = earliest_publish_date(channel_cfg)
+
+    quota_cost = QUOTA_COSTS["videos.insert"] + QUOTA_COSTS["videos.update"]
+    if playlist_id:
+        quota_cost += QUOTA_COSTS["playlistItems.insert"]
+
+    entries: List[Dict[str, Any]] = []
+    for ch in ctx["pending"][:limit if limit is not None else MAX_UPLOADS_PER_RUN]:
+        cid_str = str(ch["id"])
+        video_file = video_path_for(cid_str)
+        try:
+            size = video_file.stat().st_size
+        except OSError:
+            log.error(f"File not found for id={cid_str}: {video_file}; left out of the plan.")
             continue
+        meta = ctx["metadata"].get(cid_str)
+        if meta:
+            title, description, tags = meta["title"], meta["description"], meta["tags"]
+        else:
+            title, description, tags = resolve_metadata(ch)
+        entries.append({
+            "challenge_id": cid_str,
+            "file": video_file.name,
+            "size": size,
+            "title": title,
+            "description": description,
+            "tags": tags,
+            "publish_at": schedule.allocate(not_before=not_before).isoformat(),
+            "playlist_id": playlist_id,
+            "quota_cost": quota_cost,
+        })
+
+    total_quota = sum(e["quota_cost"] for e in entries)
+    write_plan(path, {
+        "version": PLAN_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "channel": ACTIVE_CHANNEL,
+        "videos_dir": str(VIDEOS_DIR),
+        "total_bytes": sum(e["size"] for e in entries),
+        "total_quota": total_quota,
+        "entries": entries,
+        # challenge id -> video already on the channel; apply records them
+        "duplicates": ctx["duplicates"],
+    })
+
+    log.info("=" * 60)
+    log.info(f"PLAN WRITTEN: {path}")
+    log.info(f"Entries: {len(entries)} ({sum(e['size'] for e in entries) / 1e9:.2f} GB)")
+    if entries:
+        log.info(f"Publish slots: {entries[0]['publish_at']} .. {entries[-1]['publish_at']}")
+    log.info(f"Quota: {total_quota} units (~{-(-total_quota // DAILY_QUOTA_UNITS)} day(s) of quota)")
+    if ctx["duplicates"]:
+        log.info(f"Already on channel, recorded by apply: {len(ctx['duplicates'])}")
+    log.info("=" * 60)
+
+
+def apply_workflow(path: str, videos_dir: Optional[str] = None, workers: Optional[int] = None) -> None:
+    """Execute a plan file; resumes from its checkpoint log if one exists."""
+    plan = read_plan(path)
+    progress = PlanProgress(path)
+    source_dir = Path(videos_dir or plan["videos_dir"])
+    todo = [e for e in plan["entries"] if not progress.is_complete(e["challenge_id"])]
+
+    log.info(f"📄 Plan {path}: {len(plan['entries'])} entries, {len(todo)} left to apply.")
+    if not todo:
+        return
+    if DRY_RUN:
+        for e in todo:
+            log.info(f"💡 [DRY RUN] Would upload {e['file']} as \"{e['title']}\" for {e['publish_at']}")
+        return
 
-        # Add to playlist (best effort)
-        add_to_playlist(youtube, video_id, playlist_id)
+    # Quota left today after earlier runs; entries past it wait for the next apply
+    spent = quota_spent_today()
+    budget = max(0, DAILY_QUOTA_UNITS - spent)
+    if spent:
+        log.info(f"📊 {spent} quota units already spent today; {budget} left for this apply.")
+    runnable = []
+    for e in todo:
+        if e["quota_cost"] > budget:
+            break
+        budget -= e["quota_cost"]
+        runnable.append(e)
+    if len(runnable) < len(todo):
+        log.warning(f"{len(todo) - len(runnable)} entries exceed today's quota; apply again tomorrow.")
 
-        # Compute global index to find the day's offset
-        global_index = total_uploaded_before + uploads_this_run
-        publish_time_local = calculate_publish_time_for_index(channel_cfg, global_index)
+    log.info("🔐 Authenticating with YouTube API...")
+    youtube = authenticate_youtube()
+    TRACER.configure(TRACE_FILE)
 
-        # Schedule
-        ok = schedule_video_publication(
-            youtube=youtube,
-            video_id=video_id,
-            publish_time_local=publish_time_local,
-        )
+    full_state = load_full_state()
+    channel_state = get_channel_state(full_state, plan["channel"])
+    duplicates = {cid: vid for cid, vid in plan.get("duplicates", {}).items() if cid not in channel_state["uploaded"]}
+    if duplicates:
+        # Found on the channel when the plan was made
+        channel_state["uploaded"].update(duplicates)
+        save_full_state(full_state)
+        log.info(f"⏭️  Recorded {len(duplicates)} challenge(s) already on the channel.")
+    positions = {str(c["id"]): i for i, c in enumerate(flatten_challenges())}
+    limiter = BandwidthLimiter(BANDWIDTH_LIMIT_BPS, BANDWIDTH_WINDOWS)
+    tracker, tracker_sink = make_progress(
+        [e["size"] for e in runnable if progress.get(e["challenge_id"], STEP_UPLOAD) is None]
+    )
+    lock = threading.Lock()
+    counts = {"applied": 0, "failed": 0}
 
-        if not ok:
-            errors += 1
+    def apply_entry(entry: Dict[str, Any]) -> bool:
+        cid_str = entry["challenge_id"]
+
+        video_id = progress.get(cid_str, STEP_UPLOAD)
+        if video_id is None:
+            set_context(phase="upload")
+            video_file = source_dir / entry["file"]
+            try:
+                size = video_file.stat().st_size
+            except OSError:
+                size = None
+            if size != entry["size"]:
+                log.error(f"id={cid_str}: {video_file} is missing or changed since the plan was made.")
+                return False
+            video_id = upload_video(
+                youtube=youtube,
+                file_path=str(video_file),
+                title=entry["title"],
+                description=entry["description"],
+                tags=entry["tags"],
+                limiter=limiter,
+                progress=tracker,
+            )
+            if not video_id:
+                return False
+            progress.record(cid_str, STEP_UPLOAD, video_id)
+        else:
+            log.info(f"⏭️  id={cid_str} already uploaded as {video_id}; resuming.")
+
+        set_context(video_id=video_id, phase="playlist")
+        if entry["playlist_id"] and progress.get(cid_str, STEP_PLAYLIST) is None:
+            if add_to_playlist(youtube, video_id, entry["playlist_id"]):
+                progress.record(cid_str, STEP_PLAYLIST, True)
+
+        set_context(phase="schedule")
+        publish_at = datetime.fromisoformat(entry["publish_at"])
+        if not schedule_video_publication(youtube, video_id, publish_at):
+            return False
+        progress.record(cid_str, STEP_SCHEDULE, entry["publish_at"])
+
+        set_context(phase="state")
+        with lock:
+            channel_state["uploaded"][cid_str] = video_id
+            channel_state.setdefault("publish_at", {})[cid_str] = entry["publish_at"]
+            channel_state.setdefault("metadata_hash", {})[cid_str] = metadata_hash(
+                entry["title"], entry["description"], entry["tags"]
+            )
+            last = channel_state.get("last_uploaded_challenge_id")
+            if last is None or positions.get(cid_str, -1) > positions.get(str(last), -1):
+                channel_state["last_uploaded_challenge_id"] = cid_str
+            full_state[plan["channel"]] = channel_state
+            save_full_state(full_state)
+        return True
+
+    def run(entry: Dict[str, Any]) -> None:
+        try:
+            with bind(channel=plan["channel"], challenge_id=entry["challenge_id"]), TRACER.span(
+                "plan.entry",
+                new_trace=True,
+                **{"challenge.id": entry["challenge_id"], "file.size": entry["size"],
+                   "publish_at": entry["publish_at"], "channel": plan["channel"]},
+            ) as span:
+                ok = apply_entry(entry)
+                if not ok:
+                    span.set_error("entry failed")
+        except Exception as e:  # keep the other entries going
+            log.error(f"id={entry['challenge_id']} failed: {e}")
+            ok = False
+        with lock:
+            counts["applied" if ok else "failed"] += 1
+
+    if workers is None:
+        workers = ADAPTIVE_MAX_WORKERS if HTTP_TRANSPORT == "pooled" else 1
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(run, runnable))
+    PROFILER.checkpoint("apply")
+    if tracker_sink:
+        tracker_sink.close()
+
+    log.info("=" * 60)
+    log.info("APPLY SUMMARY")
+    log.info(f"Applied: {counts['applied']}; failed: {counts['failed']}; "
+             f"remaining: {len(todo) - counts['applied']}")
+    for line in limiter.report():
+        log.info(f"Bandwidth {line}")
+    log.info("=" * 60)
+    export_metrics("apply")
+
+
+# =========================
+# BACKLOG FORECAST
+# =========================
+
+def forecast_workflow(
+    items: Optional[int] = None,
+    failure_rate: float = 0.0,
+    runs_per_day: int = 1,
+    csv_path: Optional[str] = None,
+) -> None:
+    """Print how long the pending backlog (or `items` videos) takes to publish."""
+    # NumPy is only needed for forecasting, not for upload runs.
+    from forecast import forecast_backlog, summarize_forecast, write_forecast_csv
+
+    channel_cfg = CHANNELS[ACTIVE_CHANNEL]
+    full_state = load_full_state()
+    channel_state = get_channel_state(full_state, ACTIVE_CHANNEL)
+
+    if items is None:
+        uploaded = channel_state.get("uploaded", {})
+        items = sum(1 for c in flatten_challenges() if str(c["id"]) not in uploaded)
+
+    # Slots already booked by earlier runs reduce the capacity of their days
+    booked: Dict[date, int] = {}
+    for iso in channel_state.get("publish_at", {}).values():
+        if not iso:
             continue
+        d = datetime.fromisoformat(iso).astimezone(channel_cfg["timezone"]).date()
+        booked[d] = booked.get(d, 0) + 1
+
+    today = datetime.now(channel_cfg["timezone"]).date()
+    result = forecast_backlog(
+        n_items=items,
+        upload_start=today,
+        schedule_start=earliest_publish_date(channel_cfg),
+        slots_per_day=channel_cfg.get("slots_per_day", 1),
+        max_uploads_per_day=MAX_UPLOADS_PER_RUN * runs_per_day,
+        daily_quota_units=DAILY_QUOTA_UNITS,
+        quota_cost_per_upload=QUOTA_COST_PER_UPLOAD,
+        failure_rate=failure_rate,
+        blackout_dates=channel_cfg.get("blackout_dates", ()),
+        booked_slots=booked,
+    )
 
-        # Update state
-        channel_state["uploaded"][cid_str] = video_id
-        channel_state["last_uploaded_challenge_id"] = cid_str
-        uploads_this_run += 1
+    log.info("=" * 60)
+    log.info(f"BACKLOG FORECAST ({ACTIVE_CHANNEL})")
+    for line in summarize_forecast(result):
+        log.info(line)
+    log.info("=" * 60)
+
+    if csv_path:
+        write_forecast_csv(result, csv_path)
+        log.info(f"[OK] Per-day forecast written to {csv_path}")
+
+
+# =========================
+# CHANNEL MIRROR
+# =========================
+
+def mirror_workflow(full: bool = False) -> None:
+    """Refresh the local channel mirror and print what it holds."""
+    log.info("🔐 Authenticating with YouTube API...")
+    youtube = authenticate_youtube()
+
+    channel_cfg = CHANNELS[ACTIVE_CHANNEL]
+    list_cache = open_list_cache()
+    playlist_id = get_playlist_id(
+        youtube,
+        channel_cfg["playlist_name"],
+        channel_cfg.get("playlist_id_override"),
+        cache=list_cache,
+    )
+
+    mirror = ChannelMirror(MIRROR_FILE, ACTIVE_CHANNEL, cache=list_cache)
+    counts = mirror.refresh(youtube, [playlist_id] if playlist_id else [], full=full)
+    mirror.save()
+
+    scheduled = sum(1 for v in mirror.videos.values() if v.get("publish_at"))
+    log.info("=" * 60)
+    log.info(f"CHANNEL MIRROR ({ACTIVE_CHANNEL})")
+    log.info(f"Videos: {len(mirror.videos)} ({counts['new_videos']} new, {scheduled} with publish time)")
+    log.info(f"Pages read: {counts['pages']}; playlists re-listed: {counts['playlists_relisted']}")
+    for pid, entry in mirror.playlists.items():
+        log.info(f"Playlist {pid}: {entry['count']} items")
+    log.info("=" * 60)
+    export_metrics("mirror", list_cache)
+
+
+# =========================
+# PLAYLIST SORT
+# =========================
 
-        # Persist state after each successful schedule
-        full_state[ACTIVE_CHANNEL] = channel_state
+def sort_playlist_workflow(dry_run: bool = False) -> None:
+    """Reorder the channel playlist into catalog order with as few moves as possible."""
+    log.info("🔐 Authenticating with YouTube API...")
+    youtube = authenticate_youtube()
+
+    channel_cfg = CHANNELS[ACTIVE_CHANNEL]
+    list_cache = open_list_cache()
+    playlist_id = get_playlist_id(
+        youtube,
+        channel_cfg["playlist_name"],
+        channel_cfg.get("playlist_id_override"),
+        cache=list_cache,
+    )
+    if not playlist_id:
+        log.error("No playlist found; nothing to sort.")
+        return
+
+    # Desired order: catalog position of the challenge each video belongs to
+    channel_state = get_channel_state(load_full_state(), ACTIVE_CHANNEL)
+    catalog_pos = {str(c["id"]): i for i, c in enumerate(flatten_challenges())}
+    rank = {
+        video_id: catalog_pos[cid]
+        for cid, video_id in channel_state.get("uploaded", {}).items()
+        if cid in catalog_pos
+    }
+
+    # Every entry, duplicates included, so planned positions match the playlist
+    entries = list_playlist_entries(youtube, playlist_id, cache=list_cache)
+    current = [e["item_id"] for e in entries]
+    video_of = {e["item_id"]: e["video_id"] for e in entries}
+    item_rank = {item_id: rank[vid] for item_id, vid in video_of.items() if vid in rank}
+    target, moves = plan_reorder(current, item_rank)
+
+    update_cost = QUOTA_COSTS["playlistItems.update"]
+    budget = max(0, DAILY_QUOTA_UNITS - quota_spent_today()) // update_cost
+    unranked = sum(1 for item_id in current if item_id not in item_rank)
+    duplicates = len(current) - len(set(video_of.values()))
+
+    log.info("=" * 60)
+    log.info(f"PLAYLIST SORT ({playlist_id})")
+    log.info(f"Items: {len(current)} ({unranked} not from the catalog, kept at the end; "
+             f"{duplicates} duplicate entr{'y' if duplicates == 1 else 'ies'})")
+    log.info(f"Moves needed: {len(moves)} instead of {len(current)} (one update per item)")
+    log.info(f"API calls saved: {len(current) - len(moves)} "
+             f"({(len(current) - len(moves)) * update_cost} quota units)")
+    if len(moves) > budget:
+        log.warning(f"Only {budget} moves fit in the daily quota; run again tomorrow to finish.")
+        moves = moves[:budget]
+
+    if dry_run or not moves:
+        log.info("=" * 60)
+        return
+
+    done = apply_reorder(
+        youtube, playlist_id, video_of, moves,
+        on_update=lambda: METRICS.inc(QUOTA_UNITS_TOTAL, update_cost, method="playlistItems.update"),
+    )
+    export_metrics("sort-playlist", list_cache)
+    log.info(f"Moved: {done}/{len(moves)} ({done * update_cost} quota units)")
+    log.info("=" * 60)
+
+
+# =========================
+# FILE MATCHING
+# =========================
+
+def match_files_workflow() -> None:
+    """Report how catalog ids map to files in VIDEOS_DIR."""
+    report = match_video_files([c["id"] for c in flatten_challenges()])
+    methods: Dict[str, int] = {}
+    for method in report["methods"].values():
+        methods[method] = methods.get(method, 0) + 1
+
+    log.info("=" * 60)
+    log.info(f"FILE MATCHING ({VIDEOS_DIR})")
+    log.info(f"Matched: {len(report['matched'])} "
+             f"({', '.join(f'{n} {m}' for m, n in sorted(methods.items())) or 'none'})")
+    for key, path in report["matched"].items():
+        if report["methods"][key] != "exact":
+            log.info(f"    id={key} -> {path.name} ({report['methods'][key]})")
+    log.info(f"Unmatched ids: {len(report['unmatched'])}")
+    for key in report["unmatched"]:
+        candidates = report["unconfirmed"].get(key)
+        if candidates:
+            log.info(f"    id={key} (unconfirmed, rename to use: {', '.join(p.name for p in candidates)})")
+        else:
+            log.info(f"    id={key}")
+    log.info(f"Ambiguous ids: {len(report['ambiguous'])}")
+    for key, paths in report["ambiguous"].items():
+        log.info(f"    id={key}: {', '.join(p.name for p in paths)}")
+    log.info(f"Orphan files: {len(report['orphans'])}")
+    for path in report["orphans"]:
+        log.info(f"    {path.name}")
+    log.info("=" * 60)
+
+
+# =========================
+# METADATA COMPILE
+# =========================
+
+def compile_workflow() -> None:
+    """Compile the metadata manifest and report entries YouTube would reject."""
+    counts = compile_metadata()
+
+    log.info("=" * 60)
+    log.info(f"METADATA MANIFEST ({METADATA_MANIFEST_FILE})")
+    log.info(f"Entries: {counts['entries']} ({counts['compiled']} compiled, {counts['reused']} unchanged)")
+    log.info(f"Invalid: {counts['invalid']}; normalized with warnings: {counts['warnings']}")
+    for entry in load_manifest(METADATA_MANIFEST_FILE).values():
+        for problem in entry["errors"]:
+            log.info(f"    [ERROR] id={entry['id']}: {problem}")
+        for problem in entry["warnings"]:
+            log.info(f"    [WARN] id={entry['id']}: {problem}")
+    log.info("=" * 60)
+
+
+# =========================
+# METADATA UPDATE
+# =========================
+
+def update_metadata_workflow(dry_run: bool = False, baseline: bool = False, include_unhashed: bool = False) -> None:
+    """
+    Push changed titles/descriptions/tags to already-uploaded videos.
+
+    Videos uploaded before hashes were recorded are only sent with
+    include_unhashed; otherwise --baseline records their hashes instead
+    (videos hashed before keep theirs, so their edits still get pushed).
+    """
+    full_state = load_full_state()
+    channel_state = get_channel_state(full_state, ACTIVE_CHANNEL)
+    uploaded = channel_state.get("uploaded", {})
+
+    # Same compiled metadata the uploads sent, so hashes compare like for like
+    compile_metadata()
+    metadata: Dict[str, Dict[str, Any]] = {}
+    for cid_str, entry in load_manifest(METADATA_MANIFEST_FILE, uploaded).items():
+        if entry["errors"]:
+            log.error(f"id={cid_str} has invalid metadata, not updating: {'; '.join(entry['errors'])}")
+            continue
+        metadata[cid_str] = {"title": entry["title"], "description": entry["description"], "tags": entry["tags"]}
+
+    changed = changed_entries(channel_state, metadata)
+    unknown = sum(1 for e in changed if e["challenge_id"] not in channel_state.get("metadata_hash", {}))
+
+    log.info("=" * 60)
+    log.info(f"METADATA UPDATE ({ACTIVE_CHANNEL})")
+    log.info(f"Uploaded videos checked: {len(metadata)}")
+    log.info(f"Changed since last sent: {len(changed) - unknown}; never hashed: {unknown}")
+
+    if baseline:
+        # Trust that never-hashed videos match the catalog; record hashes only.
+        # Videos with a previous hash were edited since and still need pushing.
+        hashes = channel_state.setdefault("metadata_hash", {})
+        unhashed = [e for e in changed if e["challenge_id"] not in hashes]
+        for entry in unhashed:
+            hashes[entry["challenge_id"]] = entry["hash"]
         save_full_state(full_state)
+        log.info(f"Recorded {len(unhashed)} hash(es) without updating any video.")
+        if len(changed) > len(unhashed):
+            log.info(f"{len(changed) - len(unhashed)} edited video(s) left to push: run update-metadata.")
+        log.info("=" * 60)
+        return
 
-    # Final state save
-    full_state[ACTIVE_CHANNEL] = channel_state
+    if unknown and not include_unhashed:
+        hashes = channel_state.get("metadata_hash", {})
+        changed = [e for e in changed if e["challenge_id"] in hashes]
+        log.info(f"Skipping {unknown} never-hashed video(s): run with --baseline if they already match, "
+                 "or --include-unhashed to update them.")
+
+    update_cost = QUOTA_COSTS["videos.update"]
+    spent = quota_spent_today()
+    budget = max(0, DAILY_QUOTA_UNITS - spent) // update_cost
+    if spent:
+        log.info(f"Quota already spent today: {spent} units")
+    if len(changed) > budget:
+        log.warning(f"Only {budget} updates fit in today's remaining quota; run again tomorrow for the rest.")
+        changed = changed[:budget]
+    log.info(f"Updates to send: {len(changed)} ({len(changed) * update_cost} quota units)")
+
+    if dry_run or not changed:
+        for entry in changed:
+            log.info(f"    would update id={entry['challenge_id']} video={entry['video_id']}: {entry['title']}")
+        log.info("=" * 60)
+        return
+
+    log.info("🔐 Authenticating with YouTube API...")
+    youtube = authenticate_youtube()
+    workers = ADAPTIVE_MAX_WORKERS if HTTP_TRANSPORT == "pooled" else 1
+    counts = push_updates(youtube, channel_state, changed, YOUTUBE_CATEGORY_ID, max_workers=workers)
     save_full_state(full_state)
+    METRICS.inc(QUOTA_UNITS_TOTAL, (counts["updated"] + counts["failed"]) * update_cost, method="videos.update")
+    export_metrics("update-metadata")
+    log.info(f"Updated: {counts['updated']}; failed: {counts['failed']}")
+    log.info("=" * 60)
+
+
+# =========================
+# STATE RECONCILIATION
+# =========================
+
+def channel_clients(youtube) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    One client per configured channel, for concurrent per-channel work.
+
+    ACTIVE_CHANNEL reuses `youtube`; every other channel needs its own
+    "token_file" holding a valid token for its account (no browser sign-in
+    mid-run). Returns (clients by channel, skipped channels with the reason).
+    """
+    clients: Dict[str, Any] = {ACTIVE_CHANNEL: youtube}
+    skipped: List[str] = []
+    token_owner = {CHANNELS[ACTIVE_CHANNEL].get("token_file", TOKEN_FILE): ACTIVE_CHANNEL}
+    for name, cfg in CHANNELS.items():
+        if name == ACTIVE_CHANNEL:
+            continue
+        if FAKE_YOUTUBE:
+            skipped.append(f"{name} (the fake API has one channel)")
+            continue
+        token_file = cfg.get("token_file", TOKEN_FILE)
+        if token_file in token_owner:
+            # Same account as another channel: its videos would look missing
+            skipped.append(f"{name} (shares {token_file} with {token_owner[token_file]})")
+            continue
+        creds = load_credentials(token_file, interactive=False)
+        if creds is None:
+            skipped.append(f"{name} (no valid token in {token_file})")
+            continue
+        token_owner[token_file] = name
+        clients[name] = build_youtube(creds)
+    return clients, skipped
+
+
+def reconcile_workflow(repair: bool = True) -> None:
+    """Check every channel's recorded video ids against YouTube and drop dead entries."""
+    log.info("🔐 Authenticating with YouTube API...")
+    youtube = authenticate_youtube()
+    clients, skipped = channel_clients(youtube)
+    for reason in skipped:
+        log.warning(f"Not reconciling channel {reason}")
+
+    full_state = load_full_state()
+    catalog_ids = [str(c["id"]) for c in flatten_challenges()]
+    reports = reconcile_all(clients, full_state, catalog_ids, repair=repair)
+
+    log.info("=" * 60)
+    log.info("RECONCILE SUMMARY")
+    for name, report in reports.items():
+        if "error" in report:
+            log.info(f"{name}: failed ({report['error']})")
+            continue
+        counts = report["counts"]
+        log.info(
+            f"{name}: {counts['live']} live, {counts['missing']} missing, "
+            f"{counts['processing-failed']} processing-failed, {counts['fake']} fake "
+            f"({report['quota_units']} quota units)"
+        )
+        for cid, (video_id, kind) in report["bad"].items():
+            action = "removed" if report["repaired"] else "would remove"
+            log.info(f"    {action} id={cid} video={video_id} ({kind})")
+    log.info("=" * 60)
+
+    if repair and any(r.get("repaired") for r in reports.values()):
+        save_full_state(full_state)
+        log.info("[OK] State repaired; dropped challenges will upload on the next run.")
+    export_metrics("reconcile")
+
+
+# =========================
+# COMMAND LINE
+# =========================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk YouTube uploader & scheduler")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=PROFILE_MODE,
+                        help=f"profile the run and write reports under {PROFILE_DIR}/")
+    parser.add_argument("--fake-youtube", action="store_true", default=FAKE_YOUTUBE,
+                        help=f"run offline against a fake YouTube API kept in {FAKE_YOUTUBE_DIR}/")
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("upload", help="upload and schedule pending challenges (default)")
+
+    pl = sub.add_parser("plan", help="write the next batch to a reviewable plan file")
+    pl.add_argument("path", help="plan file to write")
+    pl.add_argument("--limit", type=int, help="entries to plan (default: MAX_UPLOADS_PER_RUN)")
+
+    ap = sub.add_parser("apply", help="execute a plan file, resuming where a previous apply stopped")
+    ap.add_argument("path", help="plan file to execute")
+    ap.add_argument("--videos-dir", help="folder holding the plan's files (default: as planned)")
+    ap.add_argument("--workers", type=int, help="parallel uploads")
+
+    fc = sub.add_parser("forecast", help="forecast when the backlog finishes publishing")
+    fc.add_argument("--items", type=int, help="backlog size (default: pending challenges)")
+    fc.add_argument("--failure-rate", type=float, default=0.0, help="share of uploads that fail, 0-1")
+    fc.add_argument("--runs-per-day", type=int, default=1)
+    fc.add_argument("--csv", dest="csv_path", help="write the per-day table to this CSV file")
+
+    mr = sub.add_parser("mirror", help="refresh the local mirror of the channel's uploads and playlist")
+    mr.add_argument("--full", action="store_true", help="rebuild from scratch instead of incrementally")
+
+    sp = sub.add_parser("sort-playlist", help="reorder the playlist into catalog order with minimal moves")
+    sp.add_argument("--dry-run", action="store_true", help="report the moves without sending them")
+
+    sub.add_parser("match-files", help="report how challenge ids map to files in VIDEOS_DIR")
+
+    sub.add_parser("compile", help="compile and validate metadata for the whole catalog")
 
-    print("=" * 60)
-    print("UPLOAD SUMMARY")
-    print(f"Channel profile: {ACTIVE_CHANNEL}")
-    print(f"Total challenges defined: {len(all_challenges)}")
-    print(f"Total uploaded before this run: {total_uploaded_before}")
-    print(f"Uploaded this run: {uploads_this_run}")
-    print(f"Skipped (already uploaded): {skipped}")
-    print(f"Errors: {errors}")
-    print(f"Last uploaded challenge id: {channel_state.get('last_uploaded_challenge_id')}")
-    print("=" * 60)
+    um = sub.add_parser("update-metadata", help="push changed titles/descriptions/tags to uploaded videos")
+    um.add_argument("--dry-run", action="store_true", help="list the videos that would be updated")
+    um.add_argument("--baseline", action="store_true",
+                    help="record metadata hashes of never-hashed videos without updating them (they already match)")
+    um.add_argument("--include-unhashed", action="store_true",
+                    help="also update videos uploaded before metadata hashes were recorded")
+
+    rc = sub.add_parser("reconcile", help="check recorded uploads against YouTube and repair state")
+    rc.add_argument("--report-only", action="store_true", help="classify entries without changing state")
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args.command = "upload"
+    return args
+
+
+def use_fake_youtube() -> None:
+    """Authenticate against FakeYouTube and keep every local file under FAKE_YOUTUBE_DIR.
+
+    That covers the metrics, trace, log and progress outputs too, so offline
+    runs never mix into the real channel's dashboards and logs.
+    """
+    global FAKE_YOUTUBE, STATE_FILE, MIRROR_FILE, LIST_CACHE_FILE
+    global METRICS_TEXTFILE, METRICS_SUMMARY_DIR, TRACE_FILE, LOG_JSON_FILE, PROGRESS_JSON_FILE
+
+    def moved(path: Optional[str]) -> Optional[str]:
+        if not path or path == "-":
+            return path
+        if os.path.isabs(path):
+            path = os.path.basename(path)
+        return os.path.join(FAKE_YOUTUBE_DIR, path)
+
+    FAKE_YOUTUBE = True
+    STATE_FILE = os.path.join(FAKE_YOUTUBE_DIR, os.path.basename(STATE_FILE))
+    MIRROR_FILE = os.path.join(FAKE_YOUTUBE_DIR, os.path.basename(MIRROR_FILE))
+    LIST_CACHE_FILE = os.path.join(FAKE_YOUTUBE_DIR, os.path.basename(LIST_CACHE_FILE))
+    METRICS_TEXTFILE = moved(METRICS_TEXTFILE)
+    METRICS_SUMMARY_DIR = moved(METRICS_SUMMARY_DIR)
+    TRACE_FILE = moved(TRACE_FILE)
+    LOG_JSON_FILE = moved(LOG_JSON_FILE)
+    PROGRESS_JSON_FILE = moved(PROGRESS_JSON_FILE)
+    os.makedirs(FAKE_YOUTUBE_DIR, exist_ok=True)
+    for cfg in CHANNELS.values():
+        cfg["playlist_id_override"] = None  # real playlist ids do not exist there
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.fake_youtube:
+        use_fake_youtube()
+    listener = setup_logging(LOG_JSON_FILE, level=LOG_LEVEL)
+    set_defaults(channel=ACTIVE_CHANNEL)
+    try:
+        if args.profile:
+            with PROFILER.session(PROFILE_DIR, args.command, mode=args.profile):
+                run_command(args)
+        else:
+            run_command(args)
+    finally:
+        TRACER.close()
+        listener.stop()
+
+
+def run_command(args: argparse.Namespace) -> None:
+    if args.command == "plan":
+        plan_workflow(args.path, limit=args.limit)
+    elif args.command == "apply":
+        apply_workflow(args.path, videos_dir=args.videos_dir, workers=args.workers)
+    elif args.command == "mirror":
+        mirror_workflow(full=args.full)
+    elif args.command == "sort-playlist":
+        sort_playlist_workflow(dry_run=args.dry_run)
+    elif args.command == "match-files":
+        match_files_workflow()
+    elif args.command == "compile":
+        compile_workflow()
+    elif args.command == "update-metadata":
+        update_metadata_workflow(dry_run=args.dry_run, baseline=args.baseline,
+                                 include_unhashed=args.include_unhashed)
+    elif args.command == "reconcile":
+        reconcile_workflow(repair=not args.report_only)
+    elif args.command == "forecast":
+        forecast_workflow(
+            items=args.items,
+            failure_rate=args.failure_rate,
+            runs_per_day=args.runs_per_day,
+            csv_path=args.csv_path,
+        )
+    else:
+        main_upload_workflow()
 
 
 if __name__ == "__main__":
-    main_upload_workflow()
+    main()
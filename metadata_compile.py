@@ -0,0 +1,150 @@
+"""
+Compile the catalog's upload metadata once into a validated manifest.
+
+Titles, descriptions and tags used to be resolved per upload through the
+TITLE_DESC_ARRAYS lookup and the fallback generators, and nothing checked
+YouTube's limits until videos.insert rejected an entry after the file had
+already been sent. compile_manifest() resolves every challenge up front,
+normalizes the result and validates it:
+
+- title        1..100 characters, no "<" or ">"
+- description  at most 5000 bytes (UTF-8), no "<" or ">"
+- tags         500 characters in total, counted the way YouTube does
+               (comma between tags, quotes around tags containing spaces)
+
+The manifest is JSON lines, one entry per challenge in catalog order, keyed
+by challenge id. Each entry carries a hash of its sources (challenge record
++ title/desc entry); on recompile, entries whose sources did not change are
+copied over without resolving them again. Upload runs read it with
+load_manifest(), keeping only the ids they need.
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+COMPILER_VERSION = 1
+
+TITLE_MAX_CHARS = 100
+DESCRIPTION_MAX_BYTES = 5000
+TAGS_MAX_CHARS = 500
+
+Metadata = Tuple[str, str, List[str]]
+
+
+def source_hash(challenge: Dict[str, Any], entry: Optional[Dict[str, Any]]) -> str:
+    payload = json.dumps([COMPILER_VERSION, challenge, entry], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def tags_length(tags: List[str]) -> int:
+    """Length YouTube counts against the 500 character tag limit."""
+    return sum(len(t) + (2 if " " in t else 0) for t in tags) + max(0, len(tags) - 1)
+
+
+def normalize(title: str, description: str, tags: Optional[List[str]]) -> Tuple[Metadata, List[str]]:
+    """Clean up what can be fixed safely; returns (metadata, warnings)."""
+    warnings: List[str] = []
+
+    title = re.sub(r"\s+", " ", title or "").strip()
+    description = (description or "").strip()
+    if any(c in title + description for c in "<>"):
+        warnings.append("angle brackets replaced")
+        title = title.replace("<", "‹").replace(">", "›")
+        description = description.replace("<", "‹").replace(">", "›")
+
+    clean: List[str] = []
+    seen: Set[str] = set()
+    for tag in tags or []:
+        tag = re.sub(r"\s+", " ", str(tag).replace(",", " ").replace("<", "").replace(">", "")).strip().lstrip("#")
+        if tag and tag.lower() not in seen:
+            seen.add(tag.lower())
+            clean.append(tag)
+    dropped = 0
+    while clean and tags_length(clean) > TAGS_MAX_CHARS:
+        clean.pop()
+        dropped += 1
+    if dropped:
+        warnings.append(f"{dropped} tag(s) dropped to fit {TAGS_MAX_CHARS} characters")
+
+    return (title, description, clean), warnings
+
+
+def validate(title: str, description: str, tags: List[str]) -> List[str]:
+    """Problems YouTube would reject the insert for."""
+    errors = []
+    if not title:
+        errors.append("empty title")
+    elif len(title) > TITLE_MAX_CHARS:
+        errors.append(f"title is {len(title)} characters (max {TITLE_MAX_CHARS})")
+    size = len(description.encode("utf-8"))
+    if size > DESCRIPTION_MAX_BYTES:
+        errors.append(f"description is {size} bytes (max {DESCRIPTION_MAX_BYTES})")
+    if tags_length(tags) > TAGS_MAX_CHARS:
+        errors.append(f"tags are {tags_length(tags)} characters (max {TAGS_MAX_CHARS})")
+    return errors
+
+
+def iter_manifest(path: str) -> Iterator[Dict[str, Any]]:
+    """Entries of a manifest file, one at a time."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_manifest(path: str, ids: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """challenge id -> entry, restricted to `ids` when given."""
+    wanted = set(ids) if ids is not None else None
+    return {
+        e["id"]: e for e in iter_manifest(path)
+        if wanted is None or e["id"] in wanted
+    }
+
+
+def compile_manifest(
+    path: str,
+    challenges: List[Dict[str, Any]],
+    lookup: Callable[[Any], Optional[Dict[str, Any]]],
+    resolve: Callable[[Dict[str, Any]], Metadata],
+) -> Dict[str, int]:
+    """
+    (Re)write the manifest for `challenges`.
+
+    `lookup(id)` returns the title/desc entry a challenge resolves from (its
+    hash decides whether the entry is stale); `resolve(challenge)` produces
+    the raw title, description and tags. Returns counts for the log.
+    """
+    previous = load_manifest(path)
+    counts = {"entries": 0, "compiled": 0, "reused": 0, "invalid": 0, "warnings": 0}
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as out:
+        for ch in challenges:
+            cid = str(ch["id"])
+            digest = source_hash(ch, lookup(ch["id"]))
+            entry = previous.get(cid)
+            if entry is not None and entry.get("source") == digest:
+                counts["reused"] += 1
+            else:
+                (title, description, tags), warnings = normalize(*resolve(ch))
+                entry = {
+                    "id": cid,
+                    "source": digest,
+                    "title": title,
+                    "description": description,
+                    "tags": tags,
+                    "errors": validate(title, description, tags),
+                    "warnings": warnings,
+                }
+                counts["compiled"] += 1
+            counts["entries"] += 1
+            counts["invalid"] += 1 if entry["errors"] else 0
+            counts["warnings"] += 1 if entry["warnings"] else 0
+            out.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+    os.replace(tmp, path)
+    return counts
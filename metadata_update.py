@@ -0,0 +1,94 @@
+"""
+Push revised titles / descriptions / tags to videos that are already uploaded.
+
+Every upload records a hash of the metadata it sent in
+channel_state["metadata_hash"][challenge id]. changed_entries() recomputes the
+hash from the current TITLE_DESC_ARRAYS / metadata.json for every uploaded
+challenge and returns only those that differ, so an unchanged catalog costs
+no API call at all. push_updates() sends the videos.update calls (50 quota
+units each) from a small thread pool, capped at the quota budget, and records
+the new hash of each video it updated.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import googleapiclient.errors
+
+from channel_sync import is_fake_video_id
+
+log = logging.getLogger(__name__)
+
+
+def metadata_hash(title: str, description: str, tags: Optional[List[str]]) -> str:
+    """Content hash of exactly what videos.insert / videos.update send."""
+    payload = json.dumps([title, description, list(tags or [])], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def changed_entries(
+    channel_state: Dict[str, Any],
+    metadata: Dict[str, Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Uploaded challenges whose current metadata differs from what was sent.
+
+    `metadata` maps challenge id -> {"title", "description", "tags"}.
+    Entries without a recorded hash (uploaded before hashes existed) count
+    as changed; the caller decides whether to send or baseline them.
+    """
+    hashes = channel_state.get("metadata_hash", {})
+    changed = []
+    for cid, video_id in channel_state.get("uploaded", {}).items():
+        if is_fake_video_id(video_id) or cid not in metadata:
+            continue
+        meta = metadata[cid]
+        digest = metadata_hash(meta["title"], meta["description"], meta["tags"])
+        if hashes.get(cid) != digest:
+            changed.append({"challenge_id": cid, "video_id": video_id, "hash": digest, **meta})
+    return changed
+
+
+def push_updates(
+    youtube,
+    channel_state: Dict[str, Any],
+    entries: List[Dict[str, Any]],
+    category_id: str,
+    max_workers: int = 4,
+) -> Dict[str, int]:
+    """Send one videos.update per entry; returns counts for the summary."""
+    hashes = channel_state.setdefault("metadata_hash", {})
+    lock = threading.Lock()
+    counts = {"updated": 0, "failed": 0}
+
+    def update(entry: Dict[str, Any]) -> None:
+        snippet = {
+            "title": entry["title"],
+            "description": entry["description"],
+            "categoryId": category_id,
+            "defaultLanguage": "en",
+        }
+        if entry["tags"]:
+            snippet["tags"] = entry["tags"]
+        try:
+            youtube.videos().update(
+                part="snippet",
+                body={"id": entry["video_id"], "snippet": snippet},
+            ).execute()
+        except googleapiclient.errors.HttpError as e:
+            log.error(f"Failed to update metadata of {entry['video_id']} (id={entry['challenge_id']}): {e}")
+            with lock:
+                counts["failed"] += 1
+            return
+        log.info(f"[OK] Updated metadata of {entry['video_id']} (id={entry['challenge_id']})")
+        with lock:
+            hashes[entry["challenge_id"]] = entry["hash"]
+            counts["updated"] += 1
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        list(pool.map(update, entries))
+    return counts
@@ -0,0 +1,245 @@
+"""
+Per-phase metrics for upload runs.
+
+Print lines and the final summary cannot tell a slow night caused by auth
+from one caused by API latency or state saves. METRICS collects:
+- histograms: duration of each phase (auth, playlist lookup, upload,
+  playlist insert, schedule, state save) by outcome, and of each chunk
+- counters: bytes and chunks sent, API errors by phase and HTTP status,
+  quota units by API method
+
+write_textfile() exports them in the Prometheus text format for
+node_exporter's textfile collector (written atomically, as the collector
+requires); write_summary() writes a JSON summary of the run, and
+quota_spent_since() adds up the quota units those summaries recorded.
+
+Instrument a function with @METRICS.timed("phase"). A return value of False
+(or None, unless none_is_error=False) counts as outcome "error", an
+exception as "exception".
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+PHASE_SECONDS = "uploader_phase_duration_seconds"
+CHUNK_SECONDS = "uploader_chunk_duration_seconds"
+BYTES_TOTAL = "uploader_upload_bytes_total"
+CHUNKS_TOTAL = "uploader_upload_chunks_total"
+API_ERRORS_TOTAL = "uploader_api_errors_total"
+QUOTA_UNITS_TOTAL = "uploader_quota_units_total"
+LAST_RUN_SECONDS = "uploader_last_run_timestamp_seconds"
+
+HELP = {
+    PHASE_SECONDS: "Duration of each run phase.",
+    CHUNK_SECONDS: "Duration of each resumable upload chunk.",
+    BYTES_TOTAL: "Video bytes sent.",
+    CHUNKS_TOTAL: "Upload chunks sent.",
+    API_ERRORS_TOTAL: "YouTube API errors by phase and HTTP status.",
+    QUOTA_UNITS_TOTAL: "YouTube Data API quota units spent, by method.",
+    LAST_RUN_SECONDS: "Unix time the run finished.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate from the buckets (linear within a bucket), like histogram_quantile()."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower, below = 0.0, 0
+        for bound, cumulative in zip(self.buckets, self.counts):
+            if cumulative >= rank:
+                inside = cumulative - below
+                estimate = lower + (bound - lower) * ((rank - below) / inside if inside else 0)
+                return min(max(estimate, self.min), self.max)
+            lower, below = bound, cumulative
+        return self.max
+
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms keyed by name and labels."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.started = time.time()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    # ---- recording ----
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = _Histogram(self.buckets)
+            series[key].observe(value)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Dict[str, str]]:
+        """Time a block; set result["outcome"] inside it to override "ok"."""
+        result = {"outcome": "ok"}
+        started = time.monotonic()
+        try:
+            yield result
+        except BaseException:
+            result["outcome"] = "exception"
+            raise
+        finally:
+            self.observe(PHASE_SECONDS, time.monotonic() - started, phase=name, outcome=result["outcome"])
+
+    def timed(self, name: str, none_is_error: bool = True) -> Callable[[Callable], Callable]:
+        """Decorator: time every call as phase `name`."""
+        def decorate(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.phase(name) as result:
+                    value = func(*args, **kwargs)
+                    if value is False or (value is None and none_is_error):
+                        result["outcome"] = "error"
+                    return value
+            return wrapper
+        return decorate
+
+    # ---- export ----
+
+    def textfile_lines(self) -> List[str]:
+        lines: List[str] = []
+        with self._lock:
+            for kind, series_by_name in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(series_by_name.items()):
+                    lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for labels, value in sorted(series.items()):
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, h in sorted(series.items()):
+                    for bound, cumulative in zip(h.buckets, h.counts):
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+        return lines
+
+    def write_textfile(self, path: str) -> None:
+        """Prometheus text format, replaced atomically for node_exporter."""
+        self.set(LAST_RUN_SECONDS, time.time())
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.textfile_lines()) + "\n")
+        os.replace(tmp, path)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            histograms = {
+                name: {
+                    ",".join(f"{k}={v}" for k, v in labels) or "all": {
+                        "count": h.count,
+                        "sum": round(h.sum, 3),
+                        "min": h.min,
+                        "max": h.max,
+                        "p50": h.quantile(0.5),
+                        "p95": h.quantile(0.95),
+                    }
+                    for labels, h in series.items()
+                }
+                for name, series in self._histograms.items()
+            }
+            counters = {
+                name: {",".join(f"{k}={v}" for k, v in labels) or "all": value for labels, value in series.items()}
+                for name, series in self._counters.items()
+            }
+        return {
+            "started": self.started,
+            "finished": time.time(),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def write_summary(self, directory: str, run_name: str) -> str:
+        """JSON summary of this run as <directory>/<run_name>-<timestamp>.json; returns the path."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{run_name}-{time.strftime('%Y%m%dT%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+
+def quota_spent_since(directory: str, since: float) -> int:
+    """Quota units recorded by the run summaries in `directory` that finished after `since`."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    total = 0
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if summary.get("finished", 0) >= since:
+            total += sum(summary.get("counters", {}).get(QUOTA_UNITS_TOTAL, {}).values())
+    return int(total)
+
+
+METRICS = Metrics()
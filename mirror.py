@@ -0,0 +1,251 @@
+"""
+Local mirror of a channel's uploads playlist and target playlists.
+
+Duplicate detection, gap filling and playlist membership all need to know
+what the channel already has. Asking YouTube every run is slow and costs
+quota, so ChannelMirror keeps a copy on disk (MIRROR_FILE) and refreshes it
+incrementally:
+- uploads playlist: paged newest first, stopping at the first video already
+  mirrored; only new videos get a videos.list lookup (50 per call) for
+  their schedule
+- target playlists: re-listed only when their item count changed (or
+  refresh(full=True))
+
+In memory the mirror is indexed by video id, by title hash (normalized title)
+and by publish time (sorted), so those questions are answered locally. With a
+ListCache, every listing is revalidated by ETag, so an unchanged page costs a
+304 instead of a full response.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from channel_sync import fetch_video_statuses, occupied_slot
+from list_cache import ListCache
+
+PAGE_SIZE = 50
+
+
+def title_hash(title: str) -> str:
+    """Hash of the title with case and whitespace normalized."""
+    normalized = re.sub(r"\s+", " ", title or "").strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class ChannelMirror:
+    """On-disk mirror of one channel's videos and playlist membership."""
+
+    def __init__(self, path: str, channel_key: str, cache: Optional[ListCache] = None):
+        self.path = path
+        self.channel_key = channel_key
+        self.cache = cache
+        # video_id -> {"title", "title_hash", "publish_at", "privacy"}
+        self.videos: Dict[str, Dict[str, Any]] = {}
+        # newest first, as the uploads playlist returns them
+        self.upload_order: List[str] = []
+        # playlist_id -> {"items": {video_id: playlist_item_id}, "count": int}
+        self.playlists: Dict[str, Dict[str, Any]] = {}
+        self.uploads_playlist_id: Optional[str] = None
+
+        self._by_title: Dict[str, List[str]] = {}
+        self._by_time: List[Tuple[str, str]] = []   # sorted (publish_at iso UTC, video_id)
+        self.load()
+
+    # ---- persistence ----
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f).get(self.channel_key, {})
+            except json.JSONDecodeError:
+                return
+        self.uploads_playlist_id = data.get("uploads_playlist_id")
+        self.videos = data.get("videos", {})
+        self.upload_order = data.get("upload_order", [])
+        self.playlists = data.get("playlists", {})
+        self._reindex()
+
+    def save(self) -> None:
+        all_data: Dict[str, Any] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                try:
+                    all_data = json.load(f)
+                except json.JSONDecodeError:
+                    all_data = {}
+        all_data[self.channel_key] = {
+            "uploads_playlist_id": self.uploads_playlist_id,
+            "videos": self.videos,
+            "upload_order": self.upload_order,
+            "playlists": self.playlists,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(all_data, f)
+        os.replace(tmp, self.path)
+
+    # ---- indexes ----
+
+    def _reindex(self) -> None:
+        self._by_title = {}
+        self._by_time = []
+        for vid, info in self.videos.items():
+            self._index(vid, info)
+        self._by_time.sort()
+
+    def _index(self, video_id: str, info: Dict[str, Any]) -> None:
+        self._by_title.setdefault(info["title_hash"], []).append(video_id)
+        if info.get("publish_at"):
+            bisect.insort(self._by_time, (info["publish_at"], video_id))
+
+    def has_video(self, video_id: str) -> bool:
+        return video_id in self.videos
+
+    def find_by_title(self, title: str) -> List[str]:
+        return list(self._by_title.get(title_hash(title), []))
+
+    def published_between(self, start: datetime, end: datetime) -> List[Tuple[str, str]]:
+        """(publish time, video_id) pairs with start <= time < end."""
+        lo = bisect.bisect_left(self._by_time, (_utc_iso(start), ""))
+        hi = bisect.bisect_left(self._by_time, (_utc_iso(end), ""))
+        return self._by_time[lo:hi]
+
+    def playlist_contains(self, playlist_id: str, video_id: str) -> bool:
+        return video_id in self.playlists.get(playlist_id, {}).get("items", {})
+
+    def add_video(
+        self,
+        video_id: str,
+        title: str,
+        publish_at: Optional[datetime] = None,
+        privacy: str = "private",
+    ) -> None:
+        """Record a video we just uploaded so the mirror stays current."""
+        if video_id in self.videos:
+            return
+        info = {
+            "title": title,
+            "title_hash": title_hash(title),
+            "publish_at": _utc_iso(publish_at) if publish_at else None,
+            "privacy": privacy,
+        }
+        self.videos[video_id] = info
+        self.upload_order.insert(0, video_id)
+        self._index(video_id, info)
+
+    def remove_video(self, video_id: str) -> None:
+        """Forget a video found deleted or failed (the incremental refresh never sees deletions)."""
+        if self.videos.pop(video_id, None) is None:
+            return
+        self.upload_order = [v for v in self.upload_order if v != video_id]
+        for entry in self.playlists.values():
+            if entry["items"].pop(video_id, None) is not None:
+                entry["count"] -= 1
+        self._reindex()
+
+    def add_playlist_item(self, playlist_id: str, video_id: str, item_id: str) -> None:
+        entry = self.playlists.setdefault(playlist_id, {"items": {}, "count": 0})
+        if video_id not in entry["items"]:
+            entry["items"][video_id] = item_id
+            entry["count"] += 1
+
+    # ---- refresh ----
+
+    def refresh(self, youtube, playlist_ids: Iterable[str] = (), full: bool = False) -> Dict[str, int]:
+        """Pull new uploads and changed playlists; returns counts for the log."""
+        counts = {"new_videos": 0, "pages": 0, "playlists_relisted": 0}
+
+        if not self.uploads_playlist_id:
+            response = self._execute(youtube.channels().list(part="contentDetails", mine=True))
+            items = response.get("items", [])
+            if not items:
+                return counts
+            self.uploads_playlist_id = items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+
+        if full:
+            self.videos, self.upload_order = {}, []
+            self._reindex()
+
+        # Uploads playlist: newest first, stop at the first known video.
+        new_items: List[Dict[str, Any]] = []
+        request = youtube.playlistItems().list(
+            part="snippet,contentDetails",
+            playlistId=self.uploads_playlist_id,
+            maxResults=PAGE_SIZE,
+        )
+        while request is not None:
+            response = self._execute(request, max_age=0)
+            counts["pages"] += 1
+            reached_known = False
+            for item in response.get("items", []):
+                vid = item["contentDetails"]["videoId"]
+                if vid in self.videos:
+                    reached_known = True
+                    break
+                new_items.append(item)
+            if reached_known:
+                break
+            request = youtube.playlistItems().list_next(request, response)
+
+        if new_items:
+            statuses = fetch_video_statuses(youtube, [i["contentDetails"]["videoId"] for i in new_items])
+            for item in new_items:
+                vid = item["contentDetails"]["videoId"]
+                status = statuses.get(vid, {})
+                slot = occupied_slot(status)
+                info = {
+                    "title": item["snippet"].get("title", ""),
+                    "title_hash": title_hash(item["snippet"].get("title", "")),
+                    "publish_at": _utc_iso(slot) if slot else None,
+                    "privacy": status.get("status", {}).get("privacyStatus"),
+                }
+                self.videos[vid] = info
+                self._index(vid, info)
+            self.upload_order = [i["contentDetails"]["videoId"] for i in new_items] + self.upload_order
+            counts["new_videos"] = len(new_items)
+
+        for playlist_id in playlist_ids:
+            if playlist_id and self._refresh_playlist(youtube, playlist_id, full):
+                counts["playlists_relisted"] += 1
+        return counts
+
+    def _execute(self, request, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Listings go through the ETag cache when one is attached."""
+        if self.cache:
+            return self.cache.execute(request, max_age=max_age)
+        return request.execute()
+
+    def _refresh_playlist(self, youtube, playlist_id: str, full: bool) -> bool:
+        """Re-list a playlist when its item count differs from the mirror."""
+        request = youtube.playlistItems().list(
+            part="contentDetails",
+            playlistId=playlist_id,
+            maxResults=PAGE_SIZE,
+        )
+        response = self._execute(request, max_age=0)
+        total = response.get("pageInfo", {}).get("totalResults")
+        known = self.playlists.get(playlist_id)
+        if not full and known is not None and known["count"] == total:
+            return False
+
+        items: Dict[str, str] = {}
+        while True:
+            for item in response.get("items", []):
+                items[item["contentDetails"]["videoId"]] = item["id"]
+            request = youtube.playlistItems().list_next(request, response)
+            if request is None:
+                break
+            response = self._execute(request, max_age=0)
+        self.playlists[playlist_id] = {"items": items, "count": total if total is not None else len(items)}
+        return True
+
+
+def _utc_iso(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -0,0 +1,77 @@
+"""
+Upload plan files and their checkpoint logs.
+
+`plan` writes every decision of a run to one JSON file: which challenges, in
+which order, from which file (name and size), with which compiled metadata,
+publish slot, playlist and quota cost. The plan can be reviewed, or copied to
+another machine with the videos, and executed with `apply`.
+
+Progress is kept in an append-only log next to the plan
+(<plan>.progress.jsonl), one line per finished step of an entry:
+    upload   -> video id
+    playlist -> true
+    schedule -> publish time
+A crashed or interrupted apply reads the log and continues each entry from
+its first unfinished step, so nothing is uploaded twice and nothing in the
+plan is recomputed. Writing a plan reserves nothing; slots are only recorded
+in upload_state.json when apply schedules them.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+PLAN_VERSION = 1
+
+STEP_UPLOAD = "upload"
+STEP_PLAYLIST = "playlist"
+STEP_SCHEDULE = "schedule"
+
+
+def write_plan(path: str, plan: Dict[str, Any]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def read_plan(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"{path}: unsupported plan version {plan.get('version')!r}")
+    return plan
+
+
+class PlanProgress:
+    """Checkpoint log of an apply; safe to record from several threads."""
+
+    def __init__(self, plan_path: str):
+        self.path = plan_path + ".progress.jsonl"
+        self._steps: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line after a crash
+                    self._steps.setdefault(rec["id"], {})[rec["step"]] = rec["value"]
+
+    def get(self, challenge_id: str, step: str) -> Optional[Any]:
+        return self._steps.get(challenge_id, {}).get(step)
+
+    def is_complete(self, challenge_id: str) -> bool:
+        return self.get(challenge_id, STEP_SCHEDULE) is not None
+
+    def record(self, challenge_id: str, step: str, value: Any) -> None:
+        """Append one finished step and flush it to disk before returning."""
+        line = json.dumps({"id": challenge_id, "step": step, "value": value}) + "\n"
+        with self._lock:
+            self._steps.setdefault(challenge_id, {})[step] = value
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
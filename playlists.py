@@ -0,0 +1,186 @@
+"""
+Playlist membership index.
+
+add_to_playlist used to insert blindly, so re-runs after partial failures
+created duplicate entries and every insert cost 50 quota units.
+PlaylistIndex keeps one set of video ids per playlist, loaded once with paged
+playlistItems.list (50 per page, 1 unit each) or taken from the channel
+mirror, and updated as we insert. Membership checks are O(1), and claim()
+stops two workers from inserting the same video concurrently.
+
+plan_reorder()/apply_reorder() sort a playlist into catalog order with the
+fewest playlistItems.update calls: items on the longest increasing
+subsequence of (current position -> desired rank) are already in order
+relative to each other and stay; only the rest are moved. They work on
+playlist item ids, not video ids, so a video that is in the playlist twice
+keeps both entries and every position matches the real playlist.
+"""
+
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import googleapiclient.errors
+
+from list_cache import ListCache
+from mirror import ChannelMirror
+
+log = logging.getLogger(__name__)
+
+PAGE_SIZE = 50
+
+
+def list_playlist_entries(youtube, playlist_id: str, cache: Optional[ListCache] = None) -> List[Dict[str, Any]]:
+    """Every item of a playlist, duplicates included, as {"item_id", "video_id", "position"} by position."""
+    entries: List[Dict[str, Any]] = []
+    request = youtube.playlistItems().list(
+        part="snippet",
+        playlistId=playlist_id,
+        maxResults=PAGE_SIZE,
+    )
+    while request is not None:
+        response = cache.execute(request, max_age=0) if cache else request.execute()
+        for item in response.get("items", []):
+            snippet = item["snippet"]
+            entries.append({
+                "item_id": item["id"],
+                "video_id": snippet["resourceId"]["videoId"],
+                "position": snippet.get("position"),
+            })
+        request = youtube.playlistItems().list_next(request, response)
+    entries.sort(key=lambda e: e["position"])
+    return entries
+
+
+class PlaylistIndex:
+    """Video ids per playlist, for O(1) "already in playlist?" checks."""
+
+    def __init__(self, mirror: Optional[ChannelMirror] = None):
+        self.mirror = mirror
+        self._members: Dict[str, Set[str]] = {}
+        self._claimed: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, youtube, playlist_id: str, cache: Optional[ListCache] = None) -> int:
+        """Load a playlist's members (from the mirror if it has them); returns the count."""
+        if self.mirror and playlist_id in self.mirror.playlists:
+            members = set(self.mirror.playlists[playlist_id]["items"])
+        else:
+            members = {e["video_id"] for e in list_playlist_entries(youtube, playlist_id, cache)}
+        with self._lock:
+            self._members[playlist_id] = members
+        return len(members)
+
+    def is_loaded(self, playlist_id: str) -> bool:
+        return playlist_id in self._members
+
+    def contains(self, playlist_id: str, video_id: str) -> bool:
+        return video_id in self._members.get(playlist_id, ())
+
+    def claim(self, playlist_id: str, video_id: str) -> bool:
+        """Reserve an insert; False if the video is already in or being added."""
+        with self._lock:
+            if video_id in self._members.get(playlist_id, ()):
+                return False
+            claimed = self._claimed.setdefault(playlist_id, set())
+            if video_id in claimed:
+                return False
+            claimed.add(video_id)
+            return True
+
+    def release(self, playlist_id: str, video_id: str, item_id: Optional[str] = None) -> None:
+        """Finish a claim: record the video as a member when the insert succeeded."""
+        with self._lock:
+            self._claimed.get(playlist_id, set()).discard(video_id)
+            if item_id is None:
+                return
+            self._members.setdefault(playlist_id, set()).add(video_id)
+            if self.mirror:
+                self.mirror.add_playlist_item(playlist_id, video_id, item_id)
+
+
+# ---- minimal-move reordering ----
+
+def longest_increasing_subsequence(seq: List[int]) -> List[int]:
+    """Indexes into seq of one longest strictly increasing subsequence, O(n log n)."""
+    tails: List[int] = []          # tails[k] = seq value ending the best run of length k+1
+    tail_index: List[int] = []     # index in seq of that value
+    parent: List[int] = [-1] * len(seq)
+    for i, value in enumerate(seq):
+        k = bisect.bisect_left(tails, value)
+        if k == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[k] = value
+            tail_index[k] = i
+        parent[i] = tail_index[k - 1] if k else -1
+
+    result: List[int] = []
+    i = tail_index[-1] if tail_index else -1
+    while i != -1:
+        result.append(i)
+        i = parent[i]
+    result.reverse()
+    return result
+
+
+def plan_reorder(current: List[str], rank: Dict[str, int]) -> Tuple[List[str], List[Tuple[str, int]]]:
+    """
+    Moves that turn `current` (item ids by playlist position) into rank order.
+
+    Items without a rank (not from the catalog) keep their relative order
+    after the ranked ones. Returns (target order, [(item_id, position)]);
+    the moves must be applied in the given order, each position being the
+    index the item takes at that moment.
+    """
+    ranked = sorted((v for v in current if v in rank), key=lambda v: rank[v])
+    target = ranked + [v for v in current if v not in rank]
+    target_index = {v: i for i, v in enumerate(target)}
+
+    keep = {current[i] for i in longest_increasing_subsequence([target_index[v] for v in current])}
+
+    # Place every moved item directly after its target predecessor, in target
+    # order; the kept items never move relative to each other.
+    order = list(current)
+    moves: List[Tuple[str, int]] = []
+    for i, item_id in enumerate(target):
+        if item_id in keep:
+            continue
+        order.remove(item_id)
+        position = order.index(target[i - 1]) + 1 if i else 0
+        order.insert(position, item_id)
+        moves.append((item_id, position))
+    return target, moves
+
+
+def apply_reorder(
+    youtube,
+    playlist_id: str,
+    video_of: Dict[str, str],
+    moves: List[Tuple[str, int]],
+    on_update: Optional[Callable[[], None]] = None,
+) -> int:
+    """Send playlistItems.update for each move (item id -> video id in `video_of`); returns how many succeeded."""
+    done = 0
+    for item_id, position in moves:
+        video_id = video_of[item_id]
+        body = {
+            "id": item_id,
+            "snippet": {
+                "playlistId": playlist_id,
+                "resourceId": {"kind": "youtube#video", "videoId": video_id},
+                "position": position,
+            },
+        }
+        if on_update:
+            on_update()
+        try:
+            youtube.playlistItems().update(part="snippet", body=body).execute()
+        except googleapiclient.errors.HttpError as e:
+            # Later positions assume this move happened; stop and re-plan next time.
+            log.error(f"Failed to move {video_id} to position {position}: {e}")
+            break
+        done += 1
+    return done
@@ -0,0 +1,208 @@
+"""
+Read-ahead prefetch of upcoming video files into the OS page cache.
+
+While video N uploads (or several, with parallel workers), a background
+thread warms the next K files of the run queue so their first chunks don't
+stall on cold reads from spinning disks or network mounts:
+- the caller passes the upcoming files in the order the queue will hand them
+  out (deadline order, not catalog order) on every advance()
+- posix_fadvise(WILLNEED) where available (Linux), otherwise sequential
+  background reads into a reused buffer (macOS, network filesystems)
+- K is sized from measured upload throughput: enough files to cover
+  `horizon_seconds` of uploading, capped at `max_files`
+- prefetch stays within a share of available memory, always reserving room for
+  the files currently uploading, so warming the queue never evicts them
+- a finished upload's pages are dropped only when it succeeded; a failed one
+  may be retried and would have to be read from disk again
+"""
+
+import logging
+import math
+import os
+import queue
+import threading
+from typing import Dict, List, Optional, Set
+
+log = logging.getLogger(__name__)
+
+READ_BLOCK_BYTES = 1024 * 1024
+
+# Re-check memory pressure every N bytes during read-based prefetch.
+PRESSURE_CHECK_BYTES = 64 * 1024 * 1024
+
+_HAS_FADVISE = hasattr(os, "posix_fadvise") and hasattr(os, "POSIX_FADV_WILLNEED")
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Memory the kernel can hand out without swapping, or None if unknown."""
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class Prefetcher:
+    """Warms the page cache for the files queued after the ones uploading."""
+
+    def __init__(
+        self,
+        horizon_seconds: float = 600.0,
+        max_files: int = 4,
+        memory_fraction: float = 0.5,
+        initial_throughput_bps: float = 2 * 1024 * 1024,
+    ):
+        self.horizon_seconds = horizon_seconds
+        self.max_files = max_files
+        self.memory_fraction = memory_fraction
+        self.throughput_bps = initial_throughput_bps
+
+        self._sizes: Dict[str, int] = {}
+        self._warmed: Set[str] = set()
+        self._active: Set[str] = set()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._worker, name="prefetch", daemon=True)
+        self._thread.start()
+
+    # ---- public API ----
+
+    def record_upload(self, num_bytes: int, seconds: float) -> None:
+        """Feed a finished upload into the throughput estimate (EWMA)."""
+        if num_bytes <= 0 or seconds <= 0:
+            return
+        sample = num_bytes / seconds
+        with self._lock:
+            self.throughput_bps = 0.7 * self.throughput_bps + 0.3 * sample
+
+    def window_size(self) -> int:
+        """Files to keep warm: upcoming upload time covered by `horizon_seconds`."""
+        with self._lock:
+            sizes = [s for s in self._sizes.values() if s > 0]
+            throughput_bps = self.throughput_bps
+        avg_size = sum(sizes) / len(sizes) if sizes else 64 * 1024 * 1024
+        seconds_per_file = avg_size / max(throughput_bps, 1.0)
+        k = math.ceil(self.horizon_seconds / max(seconds_per_file, 1e-3))
+        return max(1, min(self.max_files, k))
+
+    def advance(self, current_path: str, upcoming: List[str]) -> None:
+        """
+        Mark `current_path` as uploading and queue the next files in the window.
+
+        `upcoming` lists the files that will upload next, in queue order.
+        """
+        current_path = str(current_path)
+        with self._lock:
+            self._active.add(current_path)
+            self._warmed.add(current_path)
+
+        budget = self._budget_bytes()
+        for path in [str(p) for p in upcoming[:self.window_size()]]:
+            size = self._size_of(path)
+            if budget is not None:
+                if size > budget:
+                    break
+                budget -= size
+            with self._lock:
+                if path in self._warmed:
+                    continue
+                self._warmed.add(path)
+            self._queue.put(path)
+
+    def finish(self, path: str, uploaded: bool = True) -> None:
+        """
+        The upload of `path` ended. After a success let the kernel reclaim its
+        pages first; after a failure keep them for the retry.
+        """
+        path = str(path)
+        with self._lock:
+            self._active.discard(path)
+            if not uploaded:
+                return
+        self._drop_from_cache(path)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    # ---- internals ----
+
+    def _size_of(self, path: str) -> int:
+        """File size, cached; the stat itself runs without the lock held."""
+        with self._lock:
+            size = self._sizes.get(path)
+        if size is None:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+            with self._lock:
+                self._sizes[path] = size
+        return size
+
+    def _budget_bytes(self) -> Optional[int]:
+        """Bytes we may prefetch while keeping the active uploads resident."""
+        available = available_memory_bytes()
+        if available is None:
+            return None
+        with self._lock:
+            active = list(self._active)
+        return int(available * self.memory_fraction) - sum(self._size_of(p) for p in active)
+
+    def _under_pressure(self) -> bool:
+        budget = self._budget_bytes()
+        return budget is not None and budget <= 0
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            path = self._queue.get()
+            if path is None:
+                return
+            if self._under_pressure():
+                with self._lock:
+                    self._warmed.discard(path)
+                continue
+            try:
+                self._warm(path)
+            except OSError as e:
+                log.warning(f"Prefetch failed for {path}: {e}")
+
+    def _warm(self, path: str) -> None:
+        with open(path, "rb") as f:
+            if _HAS_FADVISE:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                return
+
+            buf = bytearray(READ_BLOCK_BYTES)
+            since_check = 0
+            while not self._stop.is_set():
+                n = f.readinto(buf)
+                if not n:
+                    return
+                since_check += n
+                if since_check >= PRESSURE_CHECK_BYTES:
+                    since_check = 0
+                    if self._under_pressure():
+                        return
+
+    @staticmethod
+    def _drop_from_cache(path: str) -> None:
+        """Let the kernel reclaim a finished upload's pages before anything queued."""
+        if not hasattr(os, "POSIX_FADV_DONTNEED"):
+            return
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
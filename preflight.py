@@ -0,0 +1,66 @@
+"""
+Pre-flight checks for every item a run will touch, before any network call.
+
+A missing or unreadable file used to surface only after authentication and
+playlist lookup, when upload_video reached it mid-run. run_preflight() checks
+all items up front, on a thread pool because a stat or first read on a
+network mount can take a while:
+
+- file exists, is a regular file and is not empty
+- file is readable (first block can actually be read)
+- MP4/MOV files start with a known top-level box ("ftyp", or "moov" /
+  "wide" / "mdat" in older QuickTime files), which catches non-video files
+  with a video extension
+
+Metadata is not checked here: invalid manifest entries are skipped before
+pre-flight runs, whether or not it is enabled.
+
+The result maps each failing challenge id to its problems, so the caller can
+print one consolidated report and drop those items from the run.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+DEFAULT_WORKERS = 16
+PROBE_BYTES = 4096
+ISO_BMFF_EXTENSIONS = (".mp4", ".m4v", ".mov")
+FIRST_BOX_TYPES = {b"ftyp", b"moov", b"wide", b"mdat", b"free", b"skip", b"pnot"}
+
+Item = Tuple[str, Path]   # (challenge id, file)
+
+
+def check_item(path: Path) -> List[str]:
+    """Problems with one file; empty when it is fine to upload."""
+    problems: List[str] = []
+
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return problems + [f"file not found: {path}"]
+    except OSError as e:
+        return problems + [f"cannot stat {path}: {e.strerror}"]
+    if not os.path.isfile(path):
+        return problems + [f"not a regular file: {path}"]
+    if st.st_size == 0:
+        return problems + [f"empty file: {path}"]
+
+    try:
+        with open(path, "rb") as f:
+            head = f.read(PROBE_BYTES)
+    except OSError as e:
+        return problems + [f"cannot read {path}: {e.strerror}"]
+    if path.suffix.lower() in ISO_BMFF_EXTENSIONS and head[4:8] not in FIRST_BOX_TYPES:
+        problems.append(f"not an MP4/MOV container: {path}")
+    return problems
+
+
+def run_preflight(items: List[Item], max_workers: int = DEFAULT_WORKERS) -> Dict[str, List[str]]:
+    """Check items concurrently; returns {challenge id: problems} for failing items only."""
+    if not items:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as pool:
+        results = pool.map(lambda item: check_item(item[1]), items)
+        return {cid: problems for (cid, _), problems in zip(items, results) if problems}
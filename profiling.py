@@ -0,0 +1,246 @@
+"""
+Profiling mode for upload runs.
+
+Chunk handling and state saves run on worker threads, so a plain
+`python -m cProfile main.py` only sees the main thread waiting on the pool.
+PROFILER.session() profiles the whole run, worker threads included, in one
+of two modes:
+
+- "sample": a background thread samples the stack of every thread every
+  `interval` seconds (default 5 ms). Cheap enough to leave the run's timing
+  intact; reports functions by self and total samples, plus folded stacks
+  (samples.folded) for flamegraph.pl / speedscope.
+- "cprofile": deterministic cProfile of the main thread and of every thread
+  started during the session, merged into one report (profile.txt) and a
+  .pstats file for snakeviz. Exact call counts, but it slows the hot loop.
+
+tracemalloc runs for the whole session; PROFILER.checkpoint("phase") at
+phase boundaries records current and peak traced memory and the top
+allocation growth since the previous checkpoint (allocations.txt).
+
+Each session writes its reports to a new <directory>/<run name>-<timestamp>/.
+Outside a session, checkpoint() does nothing.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+log = logging.getLogger(__name__)
+
+MODE_SAMPLE = "sample"
+MODE_CPROFILE = "cprofile"
+MODES = (MODE_SAMPLE, MODE_CPROFILE)
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+TRACEMALLOC_FRAMES = 10
+TOP_ENTRIES = 30
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Sampler:
+    """Samples the stacks of all threads from a background thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.self_counts: Counter = Counter()
+        self.total_counts: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self.paused = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def pause(self) -> None:
+        self.paused.set()
+
+    def resume(self) -> None:
+        self.paused.clear()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            if self.paused.is_set():
+                continue
+            for t in threading.enumerate():
+                names[t.ident] = t.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples += 1
+                self.self_counts[stack[-1]] += 1
+                self.total_counts.update(set(stack))
+                self.stacks[";".join([names.get(ident, str(ident))] + stack)] += 1
+
+    def write(self, directory: str) -> List[str]:
+        report = os.path.join(directory, "samples.txt")
+        with open(report, "w", encoding="utf-8") as f:
+            f.write(f"{self.samples} samples every {self.interval * 1000:g} ms (all threads)\n")
+            for title, counts in (("self", self.self_counts), ("total", self.total_counts)):
+                f.write(f"\nTop {TOP_ENTRIES} by {title} samples:\n")
+                for label, n in counts.most_common(TOP_ENTRIES):
+                    f.write(f"{n:8d} {100 * n / max(self.samples, 1):6.1f}%  {label}\n")
+        folded = os.path.join(directory, "samples.folded")
+        with open(folded, "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+        return [report, folded]
+
+
+class _ThreadedCProfile:
+    """cProfile of the calling thread and every thread started while it runs."""
+
+    def __init__(self):
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _bootstrap(self, frame, event, arg) -> None:
+        # Installed by threading.setprofile(); runs once at the start of each new thread.
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        profile.enable()
+
+    def start(self) -> None:
+        main = cProfile.Profile()
+        self.profiles.append(main)
+        threading.setprofile(self._bootstrap)
+        main.enable()
+
+    def stop(self) -> None:
+        self.profiles[0].disable()
+        threading.setprofile(None)
+
+    def pause(self) -> None:
+        self.profiles[0].disable()
+
+    def resume(self) -> None:
+        self.profiles[0].enable()
+
+    def write(self, directory: str) -> List[str]:
+        stats = pstats.Stats(self.profiles[0], stream=io.StringIO())
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        dump = os.path.join(directory, "profile.pstats")
+        stats.dump_stats(dump)
+        report = os.path.join(directory, "profile.txt")
+        with open(report, "w", encoding="utf-8") as f:
+            stats.stream = f
+            f.write(f"cProfile of {len(self.profiles)} thread(s)\n")
+            stats.sort_stats("tottime").print_stats(TOP_ENTRIES)
+            stats.sort_stats("cumulative").print_stats(TOP_ENTRIES)
+        return [report, dump]
+
+
+class Profiler:
+    def __init__(self):
+        self.directory: Optional[str] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._profiler = None
+        self._owner: Optional[int] = None
+        self._started = 0.0
+        self._allocations: List[str] = []
+
+    @property
+    def active(self) -> bool:
+        return self.directory is not None
+
+    @contextmanager
+    def session(
+        self,
+        directory: str,
+        run_name: str,
+        mode: str = MODE_SAMPLE,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> Iterator[str]:
+        """Profile the block; yields the report directory."""
+        if mode not in MODES:
+            raise ValueError(f"unknown profile mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.directory = os.path.join(directory, f"{run_name}-{time.strftime('%Y%m%dT%H%M%S')}")
+        os.makedirs(self.directory, exist_ok=True)
+        self._allocations = []
+        self._started = time.monotonic()
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._snapshot = self._take_snapshot()
+
+        profiler = _Sampler(interval) if mode == MODE_SAMPLE else _ThreadedCProfile()
+        self._profiler, self._owner = profiler, threading.get_ident()
+        profiler.start()
+        try:
+            yield self.directory
+        finally:
+            profiler.stop()
+            self._profiler = None
+            self.checkpoint("end")
+            tracemalloc.stop()
+            written = profiler.write(self.directory) + [self._write_allocations()]
+            self.directory, self._snapshot = None, None
+            log.info(f"🔬 Profile reports: {', '.join(written)}")
+
+    def checkpoint(self, phase: str) -> None:
+        """Record memory at a phase boundary (no-op outside a session).
+
+        Call it from the thread that opened the session; the profiler is paused
+        meanwhile so snapshot processing does not show up in the profile.
+        """
+        if not self.active or threading.get_ident() != self._owner:
+            return
+        if self._profiler:
+            self._profiler.pause()
+        snapshot = self._take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"== {phase} (+{time.monotonic() - self._started:.1f} s): "
+            f"current {current / 1e6:.2f} MB, peak {peak / 1e6:.2f} MB",
+        ]
+        for stat in snapshot.compare_to(self._snapshot, "lineno")[:10]:
+            lines.append(f"    {stat}")
+        self._allocations.append("\n".join(lines))
+        self._snapshot = snapshot
+        tracemalloc.reset_peak()
+        if self._profiler:
+            self._profiler.resume()
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    def _write_allocations(self) -> str:
+        path = os.path.join(self.directory, "allocations.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Traced memory at each phase boundary; peaks are since the previous one.\n")
+            f.write("Top lines by allocation growth since the previous phase.\n\n")
+            f.write("\n\n".join(self._allocations) + "\n")
+        return path
+
+
+PROFILER = Profiler()
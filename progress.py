@@ -0,0 +1,221 @@
+"""
+Batch-level upload progress with throughput and ETA.
+
+upload_video used to print "Upload progress: N%" per chunk for one file, with
+no view of the whole run. ProgressTracker is fed by chunk callbacks from every
+upload (start_file / advance / finish_file) and keeps:
+- bytes done / total for each file in flight and for the run
+- throughput over a sliding window (default 30 s), for each file and overall
+- ETA = remaining bytes / windowed throughput
+
+A snapshot is pushed to every sink at most once per `interval_seconds` (and
+whenever a file finishes). Sinks are plain callables; this module provides a
+terminal status line and a JSON-lines stream, and the GUI adds its own
+progress bar.
+"""
+
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, IO, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+Sink = Callable[[Dict[str, Any]], None]
+
+DEFAULT_WINDOW_SECONDS = 30.0
+
+
+class _Rate:
+    """Bytes per second over the last `window` seconds."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self.events: Deque[Tuple[float, int]] = deque()
+        self.in_window = 0
+
+    def add(self, now: float, n: int) -> None:
+        self.events.append((now, n))
+        self.in_window += n
+        self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self.events and self.events[0][0] < now - self.window:
+            self.in_window -= self.events.popleft()[1]
+
+    def bps(self, now: float, since: float) -> float:
+        self._trim(now)
+        span = min(self.window, now - since)
+        return self.in_window / span if span > 0 else 0.0
+
+
+def _eta(remaining: int, bps: float) -> Optional[float]:
+    if remaining <= 0:
+        return 0.0
+    return remaining / bps if bps > 0 else None
+
+
+class ProgressTracker:
+    """Thread-safe progress of a batch of uploads."""
+
+    def __init__(
+        self,
+        total_bytes: int,
+        total_files: int,
+        sinks: Optional[List[Sink]] = None,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        interval_seconds: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.total_bytes = total_bytes
+        self.total_files = total_files
+        self.sinks = sinks or []
+        self.window_seconds = window_seconds
+        self.interval_seconds = interval_seconds
+        self.clock = clock
+
+        self.bytes_done = 0
+        self.files_done = 0
+        self.files_failed = 0
+        self._started = clock()
+        self._rate = _Rate(window_seconds)
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._last_emit = float("-inf")
+        self._lock = threading.Lock()
+
+    # ---- callbacks ----
+
+    def start_file(self, key: str, size: int) -> None:
+        with self._lock:
+            self._files[key] = {"size": size, "done": 0, "started": self.clock(), "rate": _Rate(self.window_seconds)}
+
+    def advance(self, key: str, n: int) -> None:
+        """A chunk of `n` bytes of file `key` was sent."""
+        now = self.clock()
+        with self._lock:
+            f = self._files.get(key)
+            if f is not None:
+                n = min(n, f["size"] - f["done"])
+                f["done"] += n
+                f["rate"].add(now, n)
+            self.bytes_done += n
+            self._rate.add(now, n)
+            due = now - self._last_emit >= self.interval_seconds
+            if due:
+                self._last_emit = now
+        if due:
+            self._emit()
+
+    def finish_file(self, key: str, ok: bool) -> None:
+        with self._lock:
+            f = self._files.pop(key, None)
+            if ok:
+                self.files_done += 1
+            else:
+                self.files_failed += 1
+                # Its unsent bytes will never come; keep the ETA honest.
+                if f is not None:
+                    self.total_bytes -= f["size"] - f["done"]
+        self._emit()
+
+    # ---- output ----
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = self.clock()
+        with self._lock:
+            bps = self._rate.bps(now, self._started)
+            files = {
+                key: {
+                    "bytes_done": f["done"],
+                    "bytes_total": f["size"],
+                    "bps": round(f["rate"].bps(now, f["started"]), 1),
+                    "eta_seconds": _eta(f["size"] - f["done"], f["rate"].bps(now, f["started"])),
+                }
+                for key, f in self._files.items()
+            }
+            return {
+                "time": time.time(),
+                "elapsed_seconds": round(now - self._started, 1),
+                "bytes_done": self.bytes_done,
+                "bytes_total": self.total_bytes,
+                "files_done": self.files_done,
+                "files_failed": self.files_failed,
+                "files_total": self.total_files,
+                "bps": round(bps, 1),
+                "eta_seconds": _eta(self.total_bytes - self.bytes_done, bps),
+                "files": files,
+            }
+
+    def _emit(self) -> None:
+        snap = self.snapshot()
+        for sink in self.sinks:
+            try:
+                sink(snap)
+            except Exception as e:  # a broken sink must not stop the uploads
+                log.warning(f"Progress output failed: {e}")
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+def status_line(snap: Dict[str, Any]) -> str:
+    """Compact one-line summary of a snapshot."""
+    total = snap["bytes_total"] or 1
+    failed = f" ({snap['files_failed']} failed)" if snap["files_failed"] else ""
+    return (
+        f"📊 {snap['files_done']}/{snap['files_total']} files{failed} | "
+        f"{snap['bytes_done'] / 1e6:.1f}/{snap['bytes_total'] / 1e6:.1f} MB "
+        f"({100 * snap['bytes_done'] / total:.0f}%) | "
+        f"{snap['bps'] / 1e6:.2f} MB/s | ETA {format_duration(snap['eta_seconds'])} | "
+        f"{len(snap['files'])} in flight"
+    )
+
+
+def terminal_sink(stream: IO[str] = sys.stdout) -> Sink:
+    def write(snap: Dict[str, Any]) -> None:
+        print(status_line(snap), file=stream, flush=True)
+    return write
+
+
+class JsonLinesSink:
+    """
+    One JSON snapshot per line, for scripts and dashboards.
+
+    Sinks are called from the upload workers, so the sink only queues the
+    line; a writer thread does the I/O and a slow pipe never stalls an upload.
+    close() writes what is still queued, then closes the stream if owned.
+    """
+
+    def __init__(self, stream: IO[str], owns_stream: bool = False):
+        self.stream = stream
+        self.owns_stream = owns_stream
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="progress-json", daemon=True)
+        self._thread.start()
+
+    def __call__(self, snap: Dict[str, Any]) -> None:
+        self._queue.put(json.dumps(snap))
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        if self.owns_stream:
+            self.stream.close()
+
+    def _run(self) -> None:
+        while True:
+            line = self._queue.get()
+            if line is None:
+                return
+            self.stream.write(line + "\n")
+            self.stream.flush()
@@ -0,0 +1,115 @@
+"""
+Reconcile upload_state.json against YouTube.
+
+The "uploaded" map used to be trusted blindly. reconcile_channel() checks every
+recorded video id with batched videos.list calls (50 ids = 1 quota unit) and
+classifies each entry:
+- live              exists and processed (or still processing)
+- missing           not returned: deleted on YouTube, or never existed
+- processing-failed uploadStatus failed / rejected / deleted
+- fake              DRY_RUN placeholder ("dry_<id>")
+
+Repair drops every entry that is not live, so those challenges upload again,
+and moves last_uploaded_challenge_id back before the earliest dropped one so
+the resume logic reaches it. reconcile_all() runs channels concurrently, each
+with its own client: a client only sees its own account's videos, so another
+channel's would all look missing.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from typing import Any, Dict, List, Optional
+
+import googleapiclient.errors
+
+from channel_sync import BATCH_SIZE, fetch_video_statuses, is_fake_video_id
+
+log = logging.getLogger(__name__)
+
+RECONCILE_FIELDS = "items(id,status(uploadStatus,failureReason,rejectionReason,privacyStatus,publishAt))"
+
+FAILED_UPLOAD_STATUSES = {"failed", "rejected", "deleted"}
+
+LIVE = "live"
+MISSING = "missing"
+FAILED = "processing-failed"
+FAKE = "fake"
+
+
+def classify(video_id: str, item: Optional[Dict[str, Any]]) -> str:
+    if is_fake_video_id(video_id):
+        return FAKE
+    if item is None:
+        return MISSING
+    if item.get("status", {}).get("uploadStatus") in FAILED_UPLOAD_STATUSES:
+        return FAILED
+    return LIVE
+
+
+def reconcile_channel(
+    youtube,
+    channel_state: Dict[str, Any],
+    catalog_ids: List[str],
+    repair: bool = True,
+) -> Dict[str, Any]:
+    """Classify (and optionally repair) one channel's recorded uploads."""
+    uploaded: Dict[str, str] = channel_state.get("uploaded", {})
+    real_ids = [v for v in uploaded.values() if not is_fake_video_id(v)]
+    items = fetch_video_statuses(youtube, real_ids, fields=RECONCILE_FIELDS)
+
+    classes: Dict[str, str] = {cid: classify(vid, items.get(vid)) for cid, vid in uploaded.items()}
+    counts = {LIVE: 0, MISSING: 0, FAILED: 0, FAKE: 0}
+    for c in classes.values():
+        counts[c] += 1
+
+    bad = [cid for cid, c in classes.items() if c != LIVE]
+    report = {
+        "counts": counts,
+        "bad": {cid: (uploaded[cid], classes[cid]) for cid in bad},
+        "quota_units": -(-len(set(real_ids)) // BATCH_SIZE),
+        "repaired": False,
+    }
+    if not repair or not bad:
+        return report
+
+    for cid in bad:
+        uploaded.pop(cid, None)
+        channel_state.get("publish_at", {}).pop(cid, None)
+
+    # Resume starts AFTER last_uploaded_challenge_id: move it before the
+    # earliest dropped challenge so that one is picked up again.
+    positions = {cid: i for i, cid in enumerate(catalog_ids)}
+    last = channel_state.get("last_uploaded_challenge_id")
+    dropped_positions = [positions[cid] for cid in bad if cid in positions]
+    if dropped_positions and last is not None and str(last) in positions:
+        first_dropped = min(dropped_positions)
+        if first_dropped <= positions[str(last)]:
+            channel_state["last_uploaded_challenge_id"] = catalog_ids[first_dropped - 1] if first_dropped else None
+
+    report["repaired"] = True
+    return report
+
+
+def reconcile_all(
+    clients: Dict[str, Any],
+    full_state: Dict[str, Any],
+    catalog_ids: List[str],
+    repair: bool = True,
+    max_workers: int = 4,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Reconcile channels concurrently; returns reports by channel.
+
+    `clients` maps each channel in state to a client authenticated as that
+    channel. Each client is used by one thread only.
+    """
+    def run(name: str) -> Dict[str, Any]:
+        try:
+            return reconcile_channel(clients[name], full_state[name], catalog_ids, repair=repair)
+        except googleapiclient.errors.HttpError as e:
+            log.error(f"Reconcile failed for channel {name}: {e}")
+            return {"error": str(e)}
+
+    names = [n for n in clients if isinstance(full_state.get(n), dict) and full_state[n].get("uploaded")]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names) or 1))) as pool:
+        return dict(zip(names, pool.map(run, names)))
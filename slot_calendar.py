@@ -0,0 +1,253 @@
+"""
+Slot calendar for publish scheduling.
+
+Replaces "schedule_start_date + global_index days" with real slot bookkeeping:
+- per channel, per day, a sorted list of booked minutes (several slots per day,
+  with a minimum spacing between them inside the publish window)
+- blackout dates that never receive a slot
+- booked UTC minutes are shared by all channels, so two channels never publish
+  in the same minute
+- free capacity per day lives in a max segment tree over day offsets, so
+  allocate / free / next free day are O(log n) in the calendar horizon
+- slot minutes come from an RNG seeded by (seed, channel, day, slot number):
+  the same seed and bookings always produce the same plan
+"""
+
+import bisect
+import random
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+
+class _CapacityTree:
+    """Max segment tree over day offsets 0..size-1; grows by doubling."""
+
+    def __init__(self, leaf_default: Callable[[int], int]):
+        self._leaf_default = leaf_default
+        self.size = 1
+        self.tree = [0, leaf_default(0)]
+
+    def _grow(self) -> None:
+        old_size = self.size
+        leaves = self.tree[old_size:] + [self._leaf_default(i) for i in range(old_size, 2 * old_size)]
+        self.size = 2 * old_size
+        self.tree = [0] * self.size + leaves
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def get(self, offset: int) -> int:
+        while offset >= self.size:
+            self._grow()
+        return self.tree[self.size + offset]
+
+    def set(self, offset: int, value: int) -> None:
+        while offset >= self.size:
+            self._grow()
+        node = self.size + offset
+        self.tree[node] = value
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    def first_free(self, lo: int, max_grow: int = 32) -> Optional[int]:
+        """Smallest offset >= lo with capacity > 0."""
+        for _ in range(max_grow):
+            while lo >= self.size:
+                self._grow()
+            found = self._descend(1, 0, self.size - 1, lo)
+            if found is not None:
+                return found
+            self._grow()
+        return None
+
+    def _descend(self, node: int, left: int, right: int, lo: int) -> Optional[int]:
+        if right < lo or self.tree[node] <= 0:
+            return None
+        if left == right:
+            return left
+        mid = (left + right) // 2
+        found = self._descend(2 * node, left, mid, lo)
+        if found is None:
+            found = self._descend(2 * node + 1, mid + 1, right, lo)
+        return found
+
+
+class ChannelSchedule:
+    """Booked publish slots for one channel."""
+
+    def __init__(
+        self,
+        name: str,
+        start_date: date,
+        tz: timezone,
+        hour_start: int,
+        hour_end: int,
+        slots_per_day: int = 1,
+        min_spacing_minutes: int = 0,
+        blackout_dates: Iterable[date] = (),
+        seed: Optional[int] = None,
+        taken_utc_minutes: Optional[Set[int]] = None,
+    ):
+        # Window is inclusive of the whole end hour, as in calculate_publish_time_for_index
+        self.window_start = hour_start * 60
+        self.window_end = hour_end * 60 + 59
+        window_len = self.window_end - self.window_start
+        if slots_per_day < 1:
+            raise ValueError("slots_per_day must be >= 1")
+        if (slots_per_day - 1) * min_spacing_minutes > window_len:
+            raise ValueError(
+                f"{slots_per_day} slots spaced {min_spacing_minutes} min apart "
+                f"do not fit in {hour_start}:00-{hour_end}:59"
+            )
+
+        self.name = name
+        self.start_date = start_date
+        self.tz = tz
+        self.slots_per_day = slots_per_day
+        self.min_spacing = min_spacing_minutes
+        self.blackout: Set[date] = set(blackout_dates)
+        self.seed = seed
+        self._taken_utc = taken_utc_minutes if taken_utc_minutes is not None else set()
+
+        self._days: Dict[int, List[int]] = {}      # day offset -> sorted minutes
+        self._unknown: Dict[int, int] = {}          # day offset -> slots booked without a time
+        self._capacity = _CapacityTree(self._default_capacity)
+
+    # ---- conversions ----
+
+    def _offset(self, d: date) -> int:
+        return (d - self.start_date).days
+
+    def _date(self, offset: int) -> date:
+        return self.start_date + timedelta(days=offset)
+
+    def _default_capacity(self, offset: int) -> int:
+        return 0 if self._date(offset) in self.blackout else self.slots_per_day
+
+    def _to_datetime(self, offset: int, minute: int) -> datetime:
+        d = self._date(offset)
+        return datetime(d.year, d.month, d.day, minute // 60, minute % 60, tzinfo=self.tz)
+
+    @staticmethod
+    def _utc_minute(dt: datetime) -> int:
+        return int(dt.timestamp()) // 60
+
+    def _refresh_capacity(self, offset: int) -> None:
+        booked = len(self._days.get(offset, ())) + self._unknown.get(offset, 0)
+        self._capacity.set(offset, max(0, self._default_capacity(offset) - booked))
+
+    # ---- queries ----
+
+    def next_free_date(self, not_before: Optional[date] = None) -> Optional[date]:
+        lo = max(0, self._offset(not_before)) if not_before else 0
+        offset = self._capacity.first_free(lo)
+        return self._date(offset) if offset is not None else None
+
+    def slots_on(self, d: date) -> List[datetime]:
+        offset = self._offset(d)
+        return [self._to_datetime(offset, m) for m in self._days.get(offset, [])]
+
+    # ---- booking ----
+
+    def reserve(self, dt: datetime) -> None:
+        """Record an existing booking (from state or the live channel)."""
+        local = dt.astimezone(self.tz)
+        offset = self._offset(local.date())
+        if offset < 0:
+            return
+        minute = local.hour * 60 + local.minute
+        bisect.insort(self._days.setdefault(offset, []), minute)
+        self._taken_utc.add(self._utc_minute(local))
+        self._refresh_capacity(offset)
+
+    def reserve_day(self, d: date) -> None:
+        """Record a booking whose exact time is unknown (legacy state entries)."""
+        offset = self._offset(d)
+        if offset < 0:
+            return
+        self._unknown[offset] = self._unknown.get(offset, 0) + 1
+        self._refresh_capacity(offset)
+
+    def free(self, dt: datetime) -> None:
+        local = dt.astimezone(self.tz)
+        offset = self._offset(local.date())
+        minutes = self._days.get(offset, [])
+        minute = local.hour * 60 + local.minute
+        i = bisect.bisect_left(minutes, minute)
+        if i < len(minutes) and minutes[i] == minute:
+            minutes.pop(i)
+            self._taken_utc.discard(self._utc_minute(local))
+            self._refresh_capacity(offset)
+
+    def allocate(self, not_before: Optional[date] = None) -> datetime:
+        """Book and return the earliest free slot on or after `not_before`."""
+        lo = max(0, self._offset(not_before)) if not_before else 0
+        while True:
+            offset = self._capacity.first_free(lo)
+            if offset is None:
+                raise RuntimeError(f"No free publish slot for channel {self.name}")
+            minute = self._pick_minute(offset)
+            if minute is not None:
+                dt = self._to_datetime(offset, minute)
+                self.reserve(dt)
+                return dt
+            # Spacing/collisions leave no usable minute: treat the day as full.
+            self._capacity.set(offset, 0)
+            lo = offset + 1
+
+    def _fits(self, offset: int, minute: int) -> bool:
+        minutes = self._days.get(offset, [])
+        i = bisect.bisect_left(minutes, minute)
+        if i < len(minutes) and minutes[i] - minute < max(self.min_spacing, 1):
+            return False
+        if i > 0 and minute - minutes[i - 1] < max(self.min_spacing, 1):
+            return False
+        return self._utc_minute(self._to_datetime(offset, minute)) not in self._taken_utc
+
+    def _pick_minute(self, offset: int) -> Optional[int]:
+        booked = len(self._days.get(offset, ()))
+        rng = random.Random(f"{self.seed}:{self.name}:{self._date(offset).isoformat()}:{booked}") \
+            if self.seed is not None else random.Random()
+
+        for _ in range(16):
+            minute = rng.randint(self.window_start, self.window_end)
+            if self._fits(offset, minute):
+                return minute
+
+        # Crowded day: scan the window from a random point.
+        span = self.window_end - self.window_start + 1
+        start = rng.randrange(span)
+        for step in range(span):
+            minute = self.window_start + (start + step) % span
+            if self._fits(offset, minute):
+                return minute
+        return None
+
+
+class SlotCalendar:
+    """All channels' schedules, sharing one set of booked UTC minutes."""
+
+    def __init__(self):
+        self.channels: Dict[str, ChannelSchedule] = {}
+        self._taken_utc: Set[int] = set()
+
+    def add_channel(self, name: str, channel_cfg: Dict) -> ChannelSchedule:
+        """Register a channel from a CHANNELS profile in main.py."""
+        schedule = ChannelSchedule(
+            name=name,
+            start_date=channel_cfg["schedule_start_date"],
+            tz=channel_cfg["timezone"],
+            hour_start=channel_cfg["publish_hour_start"],
+            hour_end=channel_cfg["publish_hour_end"],
+            slots_per_day=channel_cfg.get("slots_per_day", 1),
+            min_spacing_minutes=channel_cfg.get("min_slot_spacing_minutes", 0),
+            blackout_dates=channel_cfg.get("blackout_dates", ()),
+            seed=channel_cfg.get("schedule_seed"),
+            taken_utc_minutes=self._taken_utc,
+        )
+        self.channels[name] = schedule
+        return schedule
+
+    def __getitem__(self, name: str) -> ChannelSchedule:
+        return self.channels[name]
@@ -0,0 +1,126 @@
+"""
+Global upload bandwidth limiter: token bucket pacing with time-of-day windows.
+
+One BandwidthLimiter is shared by every upload in the process. Each resumable
+chunk calls acquire(chunk_bytes) before it is sent and record_sent() once the
+send returned:
+- the byte rate comes from the window covering the current local time
+  (e.g. unlimited 01:00–07:00, capped otherwise); None means unlimited
+- waiting callers are served strictly in arrival order (ticket queue), so
+  concurrent workers sending equal-sized chunks share the rate evenly
+- achieved vs configured throughput is tracked per window for the run summary,
+  from the first acquire() request to the end of the last send (timing at
+  admission alone would leave out the waiting and the send itself)
+"""
+
+import threading
+import time
+from datetime import datetime
+from datetime import time as dtime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (start "HH:MM", end "HH:MM", bytes/sec or None for unlimited)
+Window = Tuple[str, str, Optional[float]]
+
+
+def _parse_hhmm(value: str) -> dtime:
+    h, m = map(int, value.split(":"))
+    return dtime(h, m)
+
+
+def _in_window(now: dtime, start: dtime, end: dtime) -> bool:
+    if start <= end:
+        return start <= now < end
+    return now >= start or now < end  # window wraps past midnight
+
+
+class BandwidthLimiter:
+    """Thread-safe, FIFO-fair token bucket whose rate follows time windows."""
+
+    def __init__(
+        self,
+        default_bps: Optional[float],
+        windows: Optional[List[Window]] = None,
+        burst_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        local_now: Callable[[], datetime] = datetime.now,
+    ):
+        self.default_bps = default_bps
+        self.windows = [(_parse_hhmm(s), _parse_hhmm(e), bps, f"{s}-{e}") for s, e, bps in (windows or [])]
+        self.burst_seconds = burst_seconds
+        self._clock = clock
+        self._local_now = local_now
+
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self._tokens = 0.0
+        self._last_refill = clock()
+
+        # window label -> [bytes sent, first acquire request, last send end, configured bps]
+        self._stats: Dict[str, List] = {}
+
+    def current_window(self) -> Tuple[str, Optional[float]]:
+        now = self._local_now().time()
+        for start, end, bps, label in self.windows:
+            if _in_window(now, start, end):
+                return label, bps
+        return "default", self.default_bps
+
+    def acquire(self, num_bytes: int) -> str:
+        """Block until `num_bytes` may be sent under the current rate; returns the window label."""
+        with self._cond:
+            requested = self._clock()
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while ticket != self._serving:
+                self._cond.wait()
+
+            try:
+                label, rate = self.current_window()
+                if rate:
+                    self._wait_for_tokens(num_bytes, rate)
+                entry = self._stats.setdefault(label, [0, requested, None, rate])
+                entry[3] = rate
+                return label
+            finally:
+                self._serving += 1
+                self._cond.notify_all()
+
+    def record_sent(self, window: str, num_bytes: int) -> None:
+        """Count bytes acquired in `window` once they have actually been sent."""
+        with self._cond:
+            entry = self._stats[window]
+            entry[0] += num_bytes
+            entry[2] = self._clock()
+
+    def _wait_for_tokens(self, num_bytes: int, rate: float) -> None:
+        capacity = rate * self.burst_seconds
+        # Chunks larger than the bucket go through once it is full and leave it
+        # in debt, so the long-run average still matches `rate`.
+        needed = min(float(num_bytes), capacity)
+        while True:
+            now = self._clock()
+            self._tokens = min(capacity, self._tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            if self._tokens >= needed:
+                self._tokens -= num_bytes
+                return
+            # Sleep with the lock released; our turn is held by the ticket.
+            self._cond.wait(timeout=(needed - self._tokens) / rate)
+
+    def report(self) -> List[str]:
+        """Human-readable achieved vs configured throughput, one line per window."""
+        lines = []
+        with self._cond:
+            for label, (num_bytes, first, last, rate) in self._stats.items():
+                if last is None or last <= first:
+                    achieved = "n/a"
+                else:
+                    achieved = f"{num_bytes / (last - first) / (1024 * 1024):.2f} MB/s"
+                configured = f"{rate / (1024 * 1024):.2f} MB/s" if rate else "unlimited"
+                lines.append(
+                    f"{label}: {num_bytes / (1024 * 1024):.1f} MB sent, "
+                    f"achieved {achieved}, configured {configured}"
+                )
+        return lines
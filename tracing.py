@@ -0,0 +1,239 @@
+"""
+Per-video tracing spans, exported as OpenTelemetry JSON lines.
+
+When one video of a batch takes 40 minutes, the metrics say that it was slow
+but not where the time went. Each challenge of an upload run gets its own
+trace:
+
+    challenge                  (root: id, file, size, publish slot)
+    ├── queue.wait             time between getting a slot and a worker
+    ├── upload                 videos.insert
+    │   ├── upload.chunk       one per next_chunk() call (bytes, offset)
+    │   ├── upload.retry       backoff before re-sending a failed chunk
+    │   └── ...
+    ├── playlist.insert        playlistItems.insert
+    ├── schedule               videos.update
+    └── state.save
+
+Spans nest through a context variable, so code only has to open a span with
+TRACER.span() or decorate a function with @TRACER.traced(); the current span
+of the calling thread becomes the parent.
+Failed calls mark their span with status ERROR and an "exception" event.
+
+Each finished span is written as one line in the OTLP/JSON shape
+({"resourceSpans": [...]}) used by the OpenTelemetry Collector's file
+exporter, so the file can be replayed into Jaeger, Tempo or any OTLP viewer.
+Finished spans only go onto a queue; a writer thread serializes and writes
+them, so upload.chunk spans add no file I/O to the upload workers. Call
+TRACER.close() before exiting to write what is still queued.
+With no file configured, spans cost next to nothing.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+SERVICE_NAME = "youtube-uploader"
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int, start_ns: int):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def set_error(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()],
+            "events": [
+                {
+                    "timeUnixNano": str(e["time_ns"]),
+                    "name": e["name"],
+                    "attributes": [_attribute(k, v) for k, v in e["attributes"].items()],
+                }
+                for e in self.events
+            ],
+            "status": {"code": self.status, "message": self.status_message} if self.status else {},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    """Creates spans and appends finished ones to a JSON-lines file."""
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self._current: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+
+    def configure(self, path: Optional[str]) -> None:
+        """Start exporting to `path` (None disables tracing)."""
+        self.close()
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._writer = threading.Thread(target=self._write, args=(path,), name="trace-writer", daemon=True)
+            self._writer.start()
+        self.path = path
+
+    def close(self) -> None:
+        """Write the spans still queued and stop exporting."""
+        self.path = None
+        if self._writer:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        start_ns: Optional[int] = None,
+        new_trace: bool = False,
+        **attributes: Any,
+    ) -> Iterator[Any]:
+        """Open a child of the current span (or a new trace root)."""
+        if not self.enabled:
+            yield _NOOP
+            return
+        parent: Optional[Span] = None if new_trace else self._current.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            parent_id=parent.span_id if parent else None,
+            kind=kind,
+            start_ns=start_ns or time.time_ns(),
+        )
+        span.set(**attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.add_event("exception", **{"exception.type": type(e).__name__, "exception.message": str(e)})
+            span.set_error(str(e))
+            raise
+        finally:
+            self._current.reset(token)
+            span.end_ns = time.time_ns()
+            self._export(span)
+
+    def traced(self, name: str, kind: int = SPAN_KIND_INTERNAL, none_is_error: bool = True) -> Callable:
+        """Decorator: run every call in a span; a False (or None) result marks it ERROR."""
+        def decorate(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name, kind=kind) as span:
+                    value = func(*args, **kwargs)
+                    if value is False or (value is None and none_is_error):
+                        span.set_error(f"{func.__name__} failed")
+                    return value
+            return wrapper
+        return decorate
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        """Add an already finished child span, e.g. time spent waiting in a queue."""
+        if not self.enabled:
+            return
+        parent: Optional[Span] = self._current.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            parent_id=parent.span_id if parent else None,
+            kind=SPAN_KIND_INTERNAL,
+            start_ns=start_ns,
+        )
+        span.set(**attributes)
+        span.end_ns = end_ns
+        self._export(span)
+
+    def _export(self, span: Span) -> None:
+        self._queue.put(span)
+
+    def _write(self, path: str) -> None:
+        with open(path, "a", encoding="utf-8") as f:
+            while True:
+                span = self._queue.get()
+                if span is None:
+                    return
+                f.write(json.dumps({
+                    "resourceSpans": [{
+                        "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+                        "scopeSpans": [{"scope": {"name": "uploader"}, "spans": [span.to_otlp()]}],
+                    }]
+                }) + "\n")
+                if self._queue.empty():
+                    f.flush()
+
+
+TRACER = Tracer()
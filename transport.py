@@ -0,0 +1,139 @@
+"""
+Pooled, thread-safe HTTP transport for the YouTube API client.
+
+googleapiclient talks to an httplib2-style object: anything with a
+``request(uri, method, body, headers)`` method returning ``(response, content)``.
+httplib2.Http keeps one connection per host, is not safe to share between
+threads and gives no control over socket options.
+
+PooledHttp implements that interface on top of a requests session
+(google.auth AuthorizedSession), so:
+- connections come from a urllib3 pool shared by every thread
+- TLS sessions are reused across uploads and API calls (keep-alive)
+- pool size, TCP keep-alive and the socket send buffer are tunable
+"""
+
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from google.auth.transport.requests import AuthorizedSession
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT_SECONDS = 120.0
+
+# Idle seconds before the first keep-alive probe, and interval between probes.
+KEEPALIVE_IDLE_SECONDS = 60
+KEEPALIVE_INTERVAL_SECONDS = 15
+
+
+def build_socket_options(
+    keepalive: bool = True,
+    send_buffer_bytes: Optional[int] = None,
+) -> List[Tuple[int, int, int]]:
+    """Socket options applied to every new pooled connection."""
+    options = list(HTTPConnection.default_socket_options)  # TCP_NODELAY
+
+    if keepalive:
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # Probe tuning is platform specific (Linux: TCP_KEEPIDLE, macOS: TCP_KEEPALIVE)
+        idle_opt = getattr(socket, "TCP_KEEPIDLE", None) or getattr(socket, "TCP_KEEPALIVE", None)
+        if idle_opt is not None:
+            options.append((socket.IPPROTO_TCP, idle_opt, KEEPALIVE_IDLE_SECONDS))
+        if hasattr(socket, "TCP_KEEPINTVL"):
+            options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL_SECONDS))
+
+    if send_buffer_bytes:
+        options.append((socket.SOL_SOCKET, socket.SO_SNDBUF, int(send_buffer_bytes)))
+
+    return options
+
+
+class TunedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that passes custom socket options to its connection pools."""
+
+    def __init__(self, socket_options: List[Tuple[int, int, int]], **kwargs):
+        self._socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self._socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class PooledResponse(dict):
+    """
+    httplib2.Response look-alike: a dict of lower-cased headers plus
+    `status`, `reason` and `version` attributes, as googleapiclient expects.
+    """
+
+    def __init__(self, response: requests.Response):
+        super().__init__((k.lower(), v) for k, v in response.headers.items())
+        self.status = response.status_code
+        self.reason = response.reason or ""
+        self.version = 11
+        self["status"] = str(self.status)
+
+
+class PooledHttp:
+    """Thread-safe, connection-pooled stand-in for httplib2.Http."""
+
+    def __init__(
+        self,
+        credentials,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keepalive: bool = True,
+        send_buffer_bytes: Optional[int] = None,
+        timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+    ):
+        self.credentials = credentials
+        self.timeout = timeout
+        self.session = AuthorizedSession(credentials)
+
+        adapter = TunedHTTPAdapter(
+            socket_options=build_socket_options(keepalive, send_buffer_bytes),
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            # Retries are handled by googleapiclient (num_retries), not urllib3.
+            max_retries=0,
+            # Block instead of opening throw-away connections when the pool is busy.
+            pool_block=True,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(
+        self,
+        uri: str,
+        method: str = "GET",
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        redirections: int = 5,
+        connection_type: Any = None,
+    ) -> Tuple[PooledResponse, bytes]:
+        """httplib2.Http.request() compatible entry point."""
+        try:
+            response = self.session.request(
+                method,
+                uri,
+                data=body,
+                headers=headers,
+                timeout=self.timeout,
+                # Resumable uploads answer chunks with "308 Resume Incomplete";
+                # that must reach googleapiclient, not be followed.
+                allow_redirects=(method == "GET" and redirections > 0),
+            )
+        except requests.exceptions.Timeout as e:
+            # googleapiclient retries socket.timeout / ConnectionError,
+            # but not requests' own exception types.
+            raise socket.timeout(str(e)) from e
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionError(str(e)) from e
+
+        return PooledResponse(response), response.content
+
+    def close(self) -> None:
+        self.session.close()
+
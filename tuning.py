@@ -0,0 +1,164 @@
+"""
+Adaptive concurrency and chunk-size controller for upload runs.
+
+AIMD (additive increase, multiplicative decrease) over fixed intervals:
+- workers: +1 while aggregate bytes/sec keeps improving; halved when the
+  5xx/timeout rate crosses `error_threshold`; an increase that didn't pay off
+  is rolled back and the controller holds
+- chunk size: doubled while chunks finish well under `target_chunk_seconds`
+  (per-request RTT overhead dominates), halved when they take much longer
+  (a lost chunk costs too much to resend) or when errors spike
+
+Workers take an upload slot with acquire_slot() before starting a video, so a
+lowered worker count takes effect as running uploads finish. Every decision
+is logged and kept in `decisions` with the numbers behind it.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List
+
+from media import CHUNK_GRANULARITY
+
+log = logging.getLogger(__name__)
+
+
+def _align_chunk(num_bytes: int) -> int:
+    return max(CHUNK_GRANULARITY, (num_bytes // CHUNK_GRANULARITY) * CHUNK_GRANULARITY)
+
+
+class AdaptiveController:
+    """Tunes worker count and chunk size from observed throughput and errors."""
+
+    def __init__(
+        self,
+        min_workers: int = 1,
+        max_workers: int = 4,
+        initial_workers: int = 1,
+        min_chunk_bytes: int = 1024 * 1024,
+        max_chunk_bytes: int = 64 * 1024 * 1024,
+        initial_chunk_bytes: int = 8 * 1024 * 1024,
+        interval_seconds: float = 30.0,
+        error_threshold: float = 0.05,
+        target_chunk_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.workers = max(min_workers, min(max_workers, initial_workers))
+        self.min_chunk_bytes = _align_chunk(min_chunk_bytes)
+        self.max_chunk_bytes = _align_chunk(max_chunk_bytes)
+        self.chunk_bytes = _align_chunk(initial_chunk_bytes)
+        self.interval_seconds = interval_seconds
+        self.error_threshold = error_threshold
+        self.target_chunk_seconds = target_chunk_seconds
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._active = 0
+
+        self._interval_start = clock()
+        self._bytes = 0
+        self._chunks = 0
+        self._chunk_seconds = 0.0
+        self._errors = 0
+        self._last_throughput = 0.0
+        self._last_action = "start"
+
+        self.decisions: List[Dict] = []
+
+    # ---- worker slots ----
+
+    def acquire_slot(self) -> None:
+        with self._cond:
+            while self._active >= self.workers:
+                self._cond.wait()
+            self._active += 1
+
+    def release_slot(self) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    # ---- observations ----
+
+    def current_chunk_size(self) -> int:
+        with self._cond:
+            return self.chunk_bytes
+
+    def record_chunk(self, num_bytes: int, seconds: float) -> None:
+        with self._cond:
+            self._bytes += num_bytes
+            self._chunks += 1
+            self._chunk_seconds += seconds
+            self._maybe_adjust()
+
+    def record_error(self) -> None:
+        """A chunk or request failed with 5xx or a timeout."""
+        with self._cond:
+            self._errors += 1
+            self._maybe_adjust()
+
+    # ---- control loop ----
+
+    def _maybe_adjust(self) -> None:
+        now = self._clock()
+        elapsed = now - self._interval_start
+        if elapsed < self.interval_seconds:
+            return
+
+        throughput = self._bytes / elapsed
+        attempts = self._chunks + self._errors
+        error_rate = self._errors / attempts if attempts else 0.0
+        avg_chunk_seconds = self._chunk_seconds / self._chunks if self._chunks else 0.0
+
+        workers, chunk = self.workers, self.chunk_bytes
+        if error_rate > self.error_threshold:
+            workers = max(self.min_workers, workers // 2)
+            chunk = max(self.min_chunk_bytes, _align_chunk(chunk // 2))
+            action, reason = "decrease", f"error rate {error_rate:.1%} > {self.error_threshold:.1%}"
+        elif self._last_action == "increase" and throughput <= self._last_throughput * 1.05:
+            workers = max(self.min_workers, workers - 1)
+            action, reason = "rollback", (
+                f"throughput {throughput / 1e6:.2f} MB/s did not improve on "
+                f"{self._last_throughput / 1e6:.2f} MB/s"
+            )
+        elif self._chunks and workers < self.max_workers and self._last_action != "rollback":
+            workers += 1
+            action, reason = "increase", f"throughput {throughput / 1e6:.2f} MB/s, error rate {error_rate:.1%}"
+        else:
+            action, reason = "hold", f"throughput {throughput / 1e6:.2f} MB/s"
+
+        if action != "decrease" and self._chunks:
+            if avg_chunk_seconds < self.target_chunk_seconds / 2:
+                chunk = min(self.max_chunk_bytes, chunk * 2)
+                reason += f"; chunks take {avg_chunk_seconds:.1f}s → larger chunks"
+            elif avg_chunk_seconds > self.target_chunk_seconds * 4:
+                chunk = max(self.min_chunk_bytes, _align_chunk(chunk // 2))
+                reason += f"; chunks take {avg_chunk_seconds:.1f}s → smaller chunks"
+
+        decision = {
+            "action": action,
+            "reason": reason,
+            "workers": workers,
+            "chunk_bytes": chunk,
+            "throughput_bps": round(throughput),
+            "error_rate": round(error_rate, 4),
+            "avg_chunk_seconds": round(avg_chunk_seconds, 2),
+        }
+        self.decisions.append(decision)
+        if (workers, chunk) != (self.workers, self.chunk_bytes) or action != "hold":
+            log.info(
+                f"[TUNE] {action}: workers {self.workers}→{workers}, "
+                f"chunk {self.chunk_bytes // 1024} KiB→{chunk // 1024} KiB ({reason})"
+            )
+
+        self.workers, self.chunk_bytes = workers, chunk
+        # "hold" after a rollback re-enables probing in the next interval
+        self._last_action = action if action != "hold" else "steady"
+        self._last_throughput = throughput
+        self._interval_start = now
+        self._bytes = self._chunks = self._errors = 0
+        self._chunk_seconds = 0.0
+        self._cond.notify_all()
@@ -4,10 +4,23 @@ import json, os, random
 from datetime import datetime, timedelta, time, timezone
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.http import MediaFileUpload
+from fake_youtube import FakeYouTube
+from file_index import FileIndex
+from list_cache import ListCache
+from progress import ProgressTracker, status_line, terminal_sink
 
 CLIENT_SECRETS_FILE = "client_secret.json"
 TOKEN_FILE = "youtube_token.json"
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload","https://www.googleapis.com/auth/youtube"]
+LIST_CACHE_FILE = "youtube_list_cache.json"
+LIST_CACHE_TTL_SECONDS = 600
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# True = "authenticate" against the in-process fake API (fake_youtube.py), for trying the GUI offline
+USE_FAKE_YOUTUBE = False
+FAKE_YOUTUBE_STORE = "fake_youtube/gui_channel.json"
+
+list_cache = ListCache(LIST_CACHE_FILE, ttl_seconds=LIST_CACHE_TTL_SECONDS)
 
 youtube = None
 selected_channel_id = None
@@ -26,17 +39,30 @@ def get_random_time_in_range(start_t, end_t):
     picked = random.randint(start_m, end_m)
     return picked // 60, picked % 60
 
+def show_progress(snap):
+    total = snap["bytes_total"] or 1
+    progress_bar["value"] = 100 * snap["bytes_done"] / total
+    progress_label.config(text=status_line(snap))
+    # Redraw only: app.update() would also run button clicks mid-upload
+    app.update_idletasks()
+
 # ------------------------------------
 # AUTHENTICATION
 # ------------------------------------
 def authenticate_google():
     global youtube
+    if USE_FAKE_YOUTUBE:
+        youtube = FakeYouTube(playlists=["Fake Playlist"], latency_seconds=0.05, store_path=FAKE_YOUTUBE_STORE)
+        list_cache.invalidate()
+        messagebox.showinfo("Success","Using the offline fake YouTube API.")
+        return
     if not os.path.exists(CLIENT_SECRETS_FILE):
         messagebox.showerror("Missing File","client_secret.json not found!")
         return
     flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
     creds = flow.run_local_server(port=0)
     youtube = build("youtube","v3",credentials=creds)
+    list_cache.invalidate()  # cached "mine=True" listings belong to the previous account
     with open(TOKEN_FILE, "w") as f:
         f.write(creds.to_json())
     messagebox.showinfo("Success","Google Authentication Successful!")
@@ -49,7 +75,7 @@ def load_channels():
     if not youtube:
         messagebox.showerror("Error","Authenticate first!")
         return
-    response = youtube.channels().list(part="snippet", mine=True).execute()
+    response = list_cache.execute(youtube.channels().list(part="snippet", mine=True))
     channels = {item["snippet"]["title"]:item["id"] for item in response["items"]}
     channel_dropdown["values"] = list(channels.keys())
     channel_dropdown.channel_map = channels
@@ -58,7 +84,7 @@ def on_channel_select(event):
     global selected_channel_id
     title = channel_dropdown.get()
     selected_channel_id = channel_dropdown.channel_map[title]
-    response = youtube.playlists().list(part="snippet", channelId=selected_channel_id, maxResults=50).execute()
+    response = list_cache.execute(youtube.playlists().list(part="snippet", channelId=selected_channel_id, maxResults=50))
     playlists = {item["snippet"]["title"]:item["id"] for item in response["items"]}
     playlist_dropdown["values"] = list(playlists.keys())
     playlist_dropdown.playlist_map = playlists
@@ -105,15 +131,25 @@ def start_uploading():
 
     day_offset = 0
 
-    for video_id, data in metadata_json.items():
+    # One folder listing for all keys instead of an exists() call per key
+    index = FileIndex(video_folder, prefixes=[prefix_text] if prefix_enabled else [])
+    report = index.match_all(metadata_json.keys())
+    for key in report["unmatched"]:
+        print(f"⚠ No file for: {key}")
+    for key, paths in report["ambiguous"].items():
+        print(f"⚠ Several files for {key}: {', '.join(p.name for p in paths)}")
+    for key, paths in report["unconfirmed"].items():
+        print(f"⚠ Not using {', '.join(p.name for p in paths)} for {key}: only the number matches")
+    for path in report["orphans"]:
+        print(f"⚠ File without metadata: {path.name}")
+
+    sizes = [os.path.getsize(path) for path in report["matched"].values()]
+    progress = ProgressTracker(sum(sizes), len(sizes), sinks=[show_progress, terminal_sink()], interval_seconds=0.5)
 
-        filename = f"{video_id}.mp4"
-        if prefix_enabled:
-            filename = prefix_text + filename
+    for video_id, data in metadata_json.items():
 
-        file_path = os.path.join(video_folder, filename)
-        if not os.path.exists(file_path):
-            print(f"⚠ File missing: {filename}")
+        file_path = report["matched"].get(video_id)
+        if file_path is None:
             continue
 
         rh, rm = get_random_time_in_range(start_time, end_time)
@@ -123,7 +159,7 @@ def start_uploading():
             time(rh, rm)
         ).replace(tzinfo=timezone.utc)
 
-        vid = upload_video(file_path, data["title"], data["description"], selected_playlist_id)
+        vid = upload_video(str(file_path), data["title"], data["description"], selected_playlist_id, progress)
         schedule_video(vid, publish_datetime)
 
         print(f"📅 {video_id} → {rh:02d}:{rm:02d}")
@@ -134,14 +170,28 @@ def start_uploading():
 # ------------------------------------
 # YOUTUBE API CALLS
 # ------------------------------------
-def upload_video(file_path, title, description, playlist_id=None):
+def upload_video(file_path, title, description, playlist_id=None, progress=None):
+    media = MediaFileUpload(file_path, chunksize=UPLOAD_CHUNK_SIZE, resumable=True)
     request = youtube.videos().insert(
         part="snippet,status",
         body={"snippet":{"title":title,"description":description,"categoryId":"27"},
               "status":{"privacyStatus":"private"}},
-        media_body=file_path,
+        media_body=media,
     )
-    response = request.execute()
+    if progress:
+        progress.start_file(file_path, media.size())
+    response = None
+    sent = 0
+    try:
+        while response is None:
+            status, response = request.next_chunk()
+            done = status.resumable_progress if status else media.size()
+            if progress:
+                progress.advance(file_path, done - sent)
+            sent = done
+    finally:
+        if progress:
+            progress.finish_file(file_path, response is not None)
     vid = response.get("id")
 
     if playlist_id:
@@ -170,7 +220,7 @@ def schedule_video(video_id, publish_datetime):
 # ------------------------------------
 app = tk.Tk()
 app.title("YouTube Bulk Uploader PRO")
-app.geometry("700x580")
+app.geometry("700x640")
 
 tk.Button(app, text="1) Authenticate Google", command=authenticate_google).pack(pady=5)
 tk.Button(app, text="2) Load Channels", command=load_channels).pack(pady=5)
@@ -202,4 +252,7 @@ json_label = tk.Label(app, text="No JSON file"); json_label.pack()
 
 tk.Button(app, text="🚀 SCHEDULE UPLOADS", bg="green", fg="white", command=start_uploading).pack(pady=20)
 
+progress_bar = ttk.Progressbar(app, length=600, maximum=100); progress_bar.pack(pady=3)
+progress_label = tk.Label(app, text=""); progress_label.pack()
+
 app.mainloop()